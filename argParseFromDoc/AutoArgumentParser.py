@@ -1,10 +1,91 @@
 import argparse
+import os
+import re
+import sys
 from typing import List, Callable, Optional, Union
 
 from argParseFromDoc import get_parser_from_function
 
 
+# The names of the argument files written by argParseFromDoc.commandStrGenerator.spill_args
+_SPILL_FILE_NAME = re.compile(r"argParseFromDoc_[0-9a-f]{40}\.args$")
+
+
+def is_spill_file(fname: str) -> bool:
+    """
+    :param fname: The path of a file
+    :return: Whether its name is the one of an argument file written by spill_args
+    """
+    return _SPILL_FILE_NAME.match(os.path.basename(fname)) is not None
+
+
 class AutoArgumentParser(argparse.ArgumentParser):
+    def __init__(self, *args, **kwargs):
+        # The argument files written by generate_command_for_argparseFromDoc for commands that are too long for the OS
+        # are read by default, e.g. prog @argParseFromDoc_<hash>.args. Other @values are kept as they are, unless
+        # fromfile_prefix_chars is given, in which case any existing file is read, as argparse does
+        self._only_spill_files = len(args) < 8 and "fromfile_prefix_chars" not in kwargs
+        if self._only_spill_files:  # fromfile_prefix_chars is the 8th positional argument of ArgumentParser
+            kwargs["fromfile_prefix_chars"] = "@"
+        super().__init__(*args, **kwargs)
+
+    def _read_args_from_files(self, arg_strings):
+        """
+        Like argparse, but argument files are read in chunks, without loading the whole file in memory first, and
+        arguments that start with the prefix but are not existing files (e.g. an email) are kept as they are. The
+        files written by spill_args contain the arguments verbatim, so their lines are never read as nested files
+        """
+        prefix_chars = self.fromfile_prefix_chars
+        if not any(arg[:1] in prefix_chars for arg in arg_strings if arg):
+            return arg_strings
+        new_arg_strings = []
+        for arg_string in arg_strings:
+            fname = arg_string[1:]
+            if not arg_string or arg_string[0] not in prefix_chars:
+                new_arg_strings.append(arg_string)
+                continue
+            spill_file = is_spill_file(fname)
+            if (self._only_spill_files and not spill_file) or not os.path.isfile(fname):
+                new_arg_strings.append(arg_string)
+                continue
+            try:
+                file_args, has_nested_files = self._read_args_file(fname)
+            except OSError as err:
+                self.error(str(err))
+            if has_nested_files and not spill_file:
+                file_args = self._read_args_from_files(file_args)
+            new_arg_strings.extend(file_args)
+        return new_arg_strings
+
+    def _read_args_file(self, fname: str, chunk_size: int = 1 << 20):
+        default_convert = getattr(self.convert_arg_line_to_args, "__func__", None) is \
+            argparse.ArgumentParser.convert_arg_line_to_args
+        line_starts = ["\n" + prefix for prefix in self.fromfile_prefix_chars]
+        file_args = []
+        has_nested_files = False
+        pending = ""
+        with open(fname) as args_file:
+            for chunk in iter(lambda: args_file.read(chunk_size), ""):
+                text = pending + chunk
+                has_nested_files = has_nested_files or any(start in "\n" + text for start in line_starts)
+                lines = text.split("\n")
+                pending = lines.pop()
+                if default_convert:
+                    file_args.extend(lines)
+                else:
+                    for line in lines:
+                        file_args.extend(self.convert_arg_line_to_args(line))
+        if pending:
+            file_args.extend([pending] if default_convert else self.convert_arg_line_to_args(pending))
+        return file_args, has_nested_files
+
+    def parse_known_args(self, args=None, namespace=None):
+        from argParseFromDoc.listArguments import collapse_value_runs
+        args = sys.argv[1:] if args is None else list(args)
+        if self.fromfile_prefix_chars is not None:
+            args = self._read_args_from_files(args)
+        return super().parse_known_args(collapse_value_runs(self, args), namespace)
+
     def parse_args_groups(self, args=None, namespace=None):
         args = super().parse_args(args=args, namespace=namespace)
         arg_groups = {}
@@ -16,7 +97,8 @@ class AutoArgumentParser(argparse.ArgumentParser):
     def add_args_from_function(self, callable: Callable, new_group_name:Optional[str]=None,
                                args_to_ignore: List[str] = None,
                                args_to_include: List[str] = None,
-                               args_optional: List[str] = None) -> Union["AutoArgumentParser", argparse._ArgumentGroup]:
+                               args_optional: List[str] = None,
+                               cache_dir: Optional[str] = None) -> Union["AutoArgumentParser", argparse._ArgumentGroup]:
         """
 
         :param callable: the documented function to extract information from
@@ -24,6 +106,8 @@ class AutoArgumentParser(argparse.ArgumentParser):
         :param args_to_ignore: Arguments in the function callable that won't be translated to argparse arguments
         :param args_to_include: Only this names of arguments in the function callable will be translated to argparse arguments
         :param args_optional: Arguments in the function callable that are optional.
+        :param cache_dir: Directory of the on-disk spec cache. If None, the environment variable
+                          ARGPARSEFROMDOC_CACHE_DIR is used. If that is not set either, no cache is used
         :return: the parser or the new group
         """
         if new_group_name is not None:
@@ -31,21 +115,26 @@ class AutoArgumentParser(argparse.ArgumentParser):
         else:
             group = self
         get_parser_from_function(callable, args_to_ignore=args_to_ignore,
-                                 args_to_include = args_to_include, args_optional=args_optional, parser=group)
+                                 args_to_include = args_to_include, args_optional=args_optional, parser=group,
+                                 cache_dir=cache_dir)
 
         return group
 
     @staticmethod
     def parse_function_and_call(callable: Callable, args_to_ignore: List[str] = None,
-                               args_to_include: List[str] = None, args_optional: List[str] = None):
-        parse_function_and_call(callable, args_to_ignore, args_to_include, args_optional)
+                               args_to_include: List[str] = None, args_optional: List[str] = None,
+                               cache_dir: Optional[str] = None):
+        return parse_function_and_call(callable, args_to_ignore, args_to_include, args_optional, cache_dir=cache_dir)
 
 
 def parse_function_and_call(callable: Callable, args_to_ignore: List[str] = None,
-                            args_to_include: List[str] = None, args_optional: List[str] = None):
+                            args_to_include: List[str] = None, args_optional: List[str] = None,
+                            cache_dir: Optional[str] = None):
     parser = AutoArgumentParser(callable.__name__)
     parser.add_args_from_function(callable, args_to_ignore=args_to_ignore,
-                                  args_to_include=args_to_include, args_optional=args_optional)
+                                  args_to_include=args_to_include, args_optional=args_optional,
+                                  cache_dir=cache_dir)
 
     args = parser.parse_args()
-    return callable(**vars(args))
+    from argParseFromDoc.asyncExecution import call_function
+    return call_function(callable, vars(args))
@@ -1,4 +1,46 @@
 __version__ = "0.1.6"
-from argParseFromDoc.autoArgparseFunction import get_parser_from_function
-from argParseFromDoc.AutoArgumentParser import AutoArgumentParser, parse_function_and_call
-from argParseFromDoc.commandStrGenerator import generate_command_for_argparseFromDoc
\ No newline at end of file
+import sys as _sys
+import types as _types
+
+# Public names are imported on first access, so that programs only pay for the modules they actually use
+_LAZY_ATTRIBUTES = {
+    "get_parser_from_function": "argParseFromDoc.autoArgparseFunction",
+    "AutoArgumentParser": "argParseFromDoc.AutoArgumentParser",
+    "parse_function_and_call": "argParseFromDoc.AutoArgumentParser",
+    "parse_function_and_call_batch": "argParseFromDoc.batchExecution",
+    "parse_function_and_call_parallel": "argParseFromDoc.parallelExecution",
+    "generate_command_for_argparseFromDoc": "argParseFromDoc.commandStrGenerator",
+    "CommandGenerator": "argParseFromDoc.commandStrGenerator",
+    "iter_sweep_commands": "argParseFromDoc.commandStrGenerator",
+    "write_sweep_commands": "argParseFromDoc.commandStrGenerator",
+    "run_jobs": "argParseFromDoc.jobRunner",
+    "OutputFile": "argParseFromDoc.fileTypes",
+    "BinaryOutputFile": "argParseFromDoc.fileTypes",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    import importlib
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+class _Package(_types.ModuleType):
+    def __setattr__(self, name, value):
+        # The submodule AutoArgumentParser has the same name as the class it defines. Importing the submodule would
+        # bind it to the package, hiding the class, so the package keeps exporting the class instead
+        if name in _LAZY_ATTRIBUTES and isinstance(value, _types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+_sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,127 @@
+import argparse
+import sys
+
+
+def _run(argv):
+    parser = argparse.ArgumentParser(prog="python -m argParseFromDoc run",
+                                     description="Parse the arguments of a documented function from its source code "
+                                                 "and call it. The module of the function is only imported once the "
+                                                 "arguments are valid")
+    parser.add_argument("target", help="package.module:function or path/to/file.py:function")
+    parser.add_argument("function_args", nargs=argparse.REMAINDER, help="The arguments of the function")
+    args = parser.parse_args(argv)
+    from argParseFromDoc.staticSpec import parse_source_function_and_call
+    sys.argv = [args.target] + args.function_args
+    out = parse_source_function_and_call(args.target, args=args.function_args)
+    if out is not None:
+        print(out)
+
+
+def _compile(argv):
+    parser = argparse.ArgumentParser(prog="python -m argParseFromDoc compile",
+                                     description="Write a python module that builds the parser of a documented "
+                                                 "function with literal add_argument calls")
+    parser.add_argument("target", help="package.module:function or path/to/file.py:function")
+    parser.add_argument("-o", "--output", help="The python file to write. If not provided, the code is printed")
+    parser.add_argument("--check", action="store_true",
+                        help="Do not write anything. Exit with error if the --output file is missing or stale")
+    parser.add_argument("--static", action="store_true",
+                        help="Read the function from its source code instead of importing it")
+    parser.add_argument("--args_to_ignore", nargs="+", help="Arguments that won't be translated")
+    parser.add_argument("--args_to_include", nargs="+", help="Only this arguments will be translated")
+    parser.add_argument("--args_optional", nargs="+", help="Arguments that are optional")
+    args = parser.parse_args(argv)
+    from argParseFromDoc.parserCompiler import compile_target, is_compiled_module_updated
+    code = compile_target(args.target, static=args.static, args_to_ignore=args.args_to_ignore,
+                          args_to_include=args.args_to_include, args_optional=args.args_optional)
+    if args.check:
+        if args.output is None:
+            parser.error("--check requires --output")
+        if not is_compiled_module_updated(args.output, code):
+            print("%s is stale or missing. Regenerate it with: python -m argParseFromDoc compile %s -o %s" %
+                  (args.output, args.target, args.output), file=sys.stderr)
+            sys.exit(1)
+    elif args.output is None:
+        print(code, end="")
+    else:
+        with open(args.output, "w") as f:
+            f.write(code)
+
+
+def _batch(argv):
+    parser = argparse.ArgumentParser(prog="python -m argParseFromDoc batch",
+                                     description="Call a documented function once per line of an input file, in a "
+                                                 "single process. Results are written as json lines")
+    parser.add_argument("target", help="package.module:function or path/to/file.py:function")
+    parser.add_argument("-i", "--input", default="-", help="The file with one argument set per line. Default: stdin")
+    parser.add_argument("-o", "--output", default="-", help="The file where results are written. Default: stdout")
+    parser.add_argument("--format", choices=["argv", "jsonl"], default="argv",
+                        help="argv: command line arguments per line. jsonl: a json object of argument values per line")
+    parser.add_argument("--max_concurrency", type=int,
+                        help="For async functions, the number of calls running at the same time")
+    parser.add_argument("--args_to_ignore", nargs="+", help="Arguments that won't be translated")
+    parser.add_argument("--args_to_include", nargs="+", help="Only this arguments will be translated")
+    parser.add_argument("--args_optional", nargs="+", help="Arguments that are optional")
+    args = parser.parse_args(argv)
+    from argParseFromDoc.batchExecution import parse_function_and_call_batch
+    from argParseFromDoc.staticSpec import import_target
+    n_ok, n_errors = parse_function_and_call_batch(import_target(args.target), inputs=args.input,
+                                                   input_format=args.format, output=args.output,
+                                                   args_to_ignore=args.args_to_ignore,
+                                                   args_to_include=args.args_to_include,
+                                                   args_optional=args.args_optional,
+                                                   max_concurrency=args.max_concurrency)
+    print("%d calls succeeded, %d failed" % (n_ok, n_errors), file=sys.stderr)
+    if n_errors:
+        sys.exit(1)
+
+
+def _jobs(argv):
+    parser = argparse.ArgumentParser(prog="python -m argParseFromDoc jobs",
+                                     description="Run the commands of a job file, e.g. written by "
+                                                 "write_sweep_commands, in parallel and without a shell")
+    parser.add_argument("job_file", help="One command, or one json list with the command, per line. - for stdin")
+    parser.add_argument("-j", "--n_workers", type=int, help="The number of jobs running at the same time. "
+                                                            "Default: the number of cpus")
+    parser.add_argument("--timeout", type=float, help="The maximum number of seconds per attempt of a job")
+    parser.add_argument("--retries", type=int, default=0, help="The number of times failed jobs are run again")
+    parser.add_argument("--backoff", type=float, default=1.0, help="The seconds to wait before the first retry. "
+                                                                   "It doubles with every retry")
+    parser.add_argument("--log_dir", help="Directory where the stdout and stderr of each job are written")
+    parser.add_argument("--journal", help="File where finished jobs are recorded. Jobs that succeeded according to "
+                                          "it are skipped, so running the same command again resumes the run")
+    parser.add_argument("--progress_interval", type=float, default=10., help="The seconds between progress reports")
+    parser.add_argument("--preload", help="A script (path.py) or module whose jobs are run in children forked from a "
+                                          "process that imports it once, instead of in new python processes")
+    args = parser.parse_args(argv)
+    from argParseFromDoc.jobRunner import read_job_file, run_jobs
+    fork_server = None
+    if args.preload is not None:
+        from argParseFromDoc.forkServer import ForkServer
+        fork_server = ForkServer(args.preload, use_module=not args.preload.endswith(".py"))
+    try:
+        summary = run_jobs(read_job_file(args.job_file), n_workers=args.n_workers, timeout=args.timeout,
+                           retries=args.retries, backoff=args.backoff, log_dir=args.log_dir, journal=args.journal,
+                           progress_interval=args.progress_interval, fork_server=fork_server)
+    finally:
+        if fork_server is not None:
+            fork_server.close()
+    print("%d jobs succeeded, %d failed, %d skipped in %.1fs" % summary, file=sys.stderr)
+    if summary.n_failed:
+        sys.exit(1)
+
+
+_COMMANDS = {"run": _run, "compile": _compile, "batch": _batch, "jobs": _jobs}
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv or argv[0] not in _COMMANDS:
+        print("usage: python -m argParseFromDoc {%s} ..." % ",".join(_COMMANDS), file=sys.stderr)
+        sys.exit(2)
+    _COMMANDS[argv[0]](argv[1:])
+
+
+if __name__ == "__main__":
+    main()
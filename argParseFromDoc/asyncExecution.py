@@ -0,0 +1,113 @@
+import types
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional, Tuple, Union
+
+
+def call_function(callable: Callable, kwargs: dict) -> Any:
+    """
+    Call a function with keyword arguments. If it is an async function, the coroutine is run until completion in a
+    new event loop or, if an event loop is already running (e.g. in a notebook or an async service), a coroutine that
+    awaits it is returned. AtomicOutputFile arguments are committed if the function succeeds and discarded otherwise.
+
+    :param callable: The function to call
+    :param kwargs: The arguments of the function, e.g. vars(parser.parse_args())
+    :return: The result of the function, or an awaitable with it for async functions called from a running loop
+    """
+    from argParseFromDoc.fileTypes import finalize_output_files
+    try:
+        result = callable(**kwargs)
+        if isinstance(result, types.CoroutineType):
+            import asyncio  # Imported here, as it is slow to import and only async functions need it
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                result = asyncio.run(result)
+            else:  # asyncio.run cannot be used. The output files are finalized when the caller awaits it
+                return _await_and_finalize(result, kwargs)
+    except BaseException:
+        finalize_output_files(kwargs, success=False)
+        raise
+    finalize_output_files(kwargs, success=True)
+    return result
+
+
+async def _await_and_finalize(coroutine, kwargs: dict) -> Any:
+    from argParseFromDoc.fileTypes import finalize_output_files
+    try:
+        result = await coroutine
+    except BaseException:
+        finalize_output_files(kwargs, success=False)
+        raise
+    finalize_output_files(kwargs, success=True)
+    return result
+
+
+async def _call_item_async(callable: Callable, parser, index: int, item: Union[str, List[str], dict],
+                           input_format: str, args_to_ignore: Optional[List[str]],
+                           args_to_include: Optional[List[str]], args_optional: Optional[List[str]]) -> "BatchResult":
+    from argParseFromDoc.batchExecution import BatchResult, _format_error, _get_item_argv
+    from argParseFromDoc.fileTypes import finalize_output_files
+    argv = None
+    try:
+        argv = _get_item_argv(callable, item, input_format, args_to_ignore, args_to_include, args_optional)
+        kwargs = vars(parser.parse_args(argv))
+        try:
+            result = callable(**kwargs)
+            if isinstance(result, types.CoroutineType):
+                result = await result
+        except BaseException:
+            finalize_output_files(kwargs, success=False)
+            raise
+        finalize_output_files(kwargs, success=True)
+        return BatchResult(index, argv, result, None)
+    except (Exception, SystemExit) as e:
+        return BatchResult(index, argv, None, _format_error(e))
+
+
+async def iter_function_calls_async(callable: Callable, args_list: Iterable[Union[str, List[str], dict]],
+                                    max_concurrency: int = 16, input_format: str = "argv",
+                                    args_to_ignore: List[str] = None, args_to_include: List[str] = None,
+                                    args_optional: List[str] = None,
+                                    cache_dir: Optional[str] = None) -> AsyncIterator["BatchResult"]:
+    """
+    Call an async documented function once per argument set, with up to max_concurrency calls running at the same
+    time in the current event loop. Argument sets are consumed lazily and results are yielded as soon as they are
+    ready, so they may be out of order. Use BatchResult.index to match them. Errors are reported per item, as in
+    iter_function_calls. Non async functions are also accepted, but they run one at a time.
+
+    :param callable: the documented function to call
+    :param args_list: The argument sets. Each one can be a list with the argv (e.g. ["--a", "1"]), a string in
+                      input_format (e.g. "--a 1" or '{"a": 1}') or a dict with the argument values (e.g. {"a": 1})
+    :param max_concurrency: The maximum number of calls running at the same time
+    :param input_format: "argv" or "jsonl". How the string argument sets are read. See iter_function_calls
+    :param args_to_ignore: Arguments in the function callable that won't be translated to argparse arguments
+    :param args_to_include: Only this names of arguments in the function callable will be translated to argparse arguments
+    :param args_optional: Arguments in the function callable that are optional.
+    :param cache_dir: Directory of the on-disk spec cache. See get_spec_from_function
+    :return: An async generator of BatchResult, one per argument set
+    """
+    from argParseFromDoc.batchExecution import INPUT_FORMATS, _get_batch_parser
+    assert input_format in INPUT_FORMATS, "argParseFromDoc: Error, input_format should be one of %s" % (INPUT_FORMATS,)
+    assert max_concurrency >= 1, "argParseFromDoc: Error, max_concurrency should be >= 1"
+    parser = _get_batch_parser(callable, args_to_ignore, args_to_include, args_optional, cache_dir)
+    async for result in _call_items_async(callable, parser, enumerate(args_list), max_concurrency, input_format,
+                                          args_to_ignore, args_to_include, args_optional):
+        yield result
+
+
+async def _call_items_async(callable: Callable, parser, indexed_items: Iterable[Tuple[int, Any]],
+                            max_concurrency: int, input_format: str, args_to_ignore: Optional[List[str]],
+                            args_to_include: Optional[List[str]],
+                            args_optional: Optional[List[str]]) -> AsyncIterator["BatchResult"]:
+    import asyncio
+    running = set()
+    for index, item in indexed_items:
+        running.add(asyncio.ensure_future(_call_item_async(callable, parser, index, item, input_format,
+                                                           args_to_ignore, args_to_include, args_optional)))
+        if len(running) >= max_concurrency:
+            done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    while running:
+        done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            yield task.result()
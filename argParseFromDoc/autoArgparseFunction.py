@@ -1,19 +1,72 @@
 from argparse import ArgumentParser, _ArgumentGroup
-from typing import Callable, List, Union
-
-from docstring_parser import parse
-
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 # TODO: document all functions
-from argParseFromDoc.helpers import _get_type_nargs_default_required_dict, _get_type_from_str
+from argParseFromDoc.helpers import _get_type_nargs_default_required_dict, _get_type_from_str, ArgSpec, \
+    HelpWithDefault
+from argParseFromDoc.compactArrays import CompactArrayAction, CompactArrayType, get_compact_lists
+from argParseFromDoc.listArguments import ListAction
+from argParseFromDoc.specCache import get_cache_dir, get_spec_key, load_spec, save_spec, _SPEC_MEMO
 
 
 def get_parser_from_function(callable: Callable, args_to_ignore: List[str] = None, args_to_include: List[str] = None,
                              args_optional: List[str] = None,
-                             parser: Union[ArgumentParser, _ArgumentGroup] = None, *args, **kwargs):
+                             parser: Union[ArgumentParser, _ArgumentGroup] = None, *args,
+                             cache_dir: Optional[str] = None, **kwargs):
     if parser is None:
-        parser = ArgumentParser(*args, **kwargs)
+        from argParseFromDoc.AutoArgumentParser import AutoArgumentParser
+        parser = AutoArgumentParser(*args, **kwargs)
+
+    spec = get_spec_from_function(callable, args_to_ignore=args_to_ignore, args_to_include=args_to_include,
+                                  args_optional=args_optional, cache_dir=cache_dir)
+    _add_spec_to_parser(spec, parser)
+    return parser
 
+
+def get_spec_from_function(callable: Callable, args_to_ignore: List[str] = None, args_to_include: List[str] = None,
+                           args_optional: List[str] = None, cache_dir: Optional[str] = None) -> Tuple[ArgSpec, ...]:
+    """
+    Extract the arguments of a documented function, as they will be added to the parser
+
+    :param callable: the documented function to extract information from
+    :param args_to_ignore: Arguments in the function callable that won't be translated to argparse arguments
+    :param args_to_include: Only this names of arguments in the function callable will be translated to argparse arguments
+    :param args_optional: Arguments in the function callable that are optional.
+    :param cache_dir: Directory of the on-disk spec cache. If None, the environment variable
+                      ARGPARSEFROMDOC_CACHE_DIR is used. If that is not set either, no cache is used
+    :return: One ArgSpec per argument. Specs are also memoized in memory (see specCache.invalidate_spec)
+    """
+    options = (_as_key_option(args_to_ignore), _as_key_option(args_to_include), _as_key_option(args_optional),
+               get_compact_lists())
+    spec = _SPEC_MEMO.get(callable, options)
+    if spec is not None:
+        return spec
+
+    cache_dir = get_cache_dir(cache_dir)
+    key = None
+    if cache_dir is not None:
+        key = get_spec_key(callable, *options)
+        if key is not None:
+            spec = load_spec(cache_dir, key)
+
+    if spec is None:
+        spec = _extract_spec_from_function(callable, args_to_ignore, args_to_include, args_optional)
+        if key is not None:
+            save_spec(cache_dir, key, spec)
+    _SPEC_MEMO.put(callable, options, spec)
+    return spec
+
+
+def _as_key_option(names: Optional[List[str]]):
+    return None if names is None else tuple(sorted(names))
+
+
+def _extract_spec_from_function(callable: Callable, args_to_ignore: List[str] = None,
+                                args_to_include: List[str] = None,
+                                args_optional: List[str] = None) -> Tuple[ArgSpec, ...]:
+
+    from docstring_parser import parse  # Imported here, as it is not needed if the spec is cached
     assert hasattr(callable, "__doc__"), "argParseFromDoc: Error, __doc__ missing in callable %s" % callable
 
 
@@ -67,7 +120,7 @@ def get_parser_from_function(callable: Callable, args_to_ignore: List[str] = Non
             #     assert nargs==1 or nargs is None, "Error, number of arguments mismatch between documentation (%s) and signature (%s) for %s" % (
             #     "None", nargs, sig_name)
 
-            assert docstringType is None or docstringType == type_, "Error, type mismatch between documentation (%s) and signature (%s) for %s"%(docstringType , type_, sig_name)
+            assert docstringType is None or docstringType == getattr(type_, "item_type", type_), "Error, type mismatch between documentation (%s) and signature (%s) for %s"%(docstringType , type_, sig_name)
         except KeyError:
             assert False, "Error, type mismatch between documentation (%s) and signature (%s) for %s" % (
             "None", type_, sig_name)
@@ -88,31 +141,81 @@ def get_parser_from_function(callable: Callable, args_to_ignore: List[str] = Non
             typeFun, nargs, default, required = info_from_signature
             params.append((elem.arg_name, typeFun, nargs, default, elem.description, required))
 
+    spec = []
     for paramTuple in params:
         name, typeFun, nargs, default, help, required = paramTuple
-
         required = (name not in args_optional and default is None) if required == True else False
-        if hasattr(default, "get"):
-            default = default.get()
-        elif hasattr(default, "result"):
-            default = default.result()
-        if typeFun == bool:
-            assert default is not None, "Error, bool arguments need to have associated default value. %s does not" % name
-            if default is True:
-                action = "store_false"
-                varname = "NOT_" + name
-            else:
-                action = "store_true"
-                varname = name
-            help += " Action: " + action + " for variable %s" % name
-            parser.add_argument("--" + varname, help=help, action=action, dest= name)
-        elif isinstance(typeFun, tuple):
-            parser.add_argument("--" + name, choices=typeFun, help=help + " Default=%(default)s",
-                                default=default,
-                                required= required)
+        spec.append(ArgSpec(name, typeFun, nargs, default, help, required))
+    return tuple(spec)
+
+
+def _add_spec_to_parser(spec: Tuple[ArgSpec, ...], parser: Union[ArgumentParser, _ArgumentGroup]):
+    with _shared_formatter(parser):
+        for argSpec in spec:
+            option_string, params = _get_add_argument_params(argSpec)
+            parser.add_argument(option_string, **params)
+
+
+@contextmanager
+def _shared_formatter(parser: Union[ArgumentParser, _ArgumentGroup]):
+    """
+    ArgumentParser.add_argument creates a new help formatter, which queries the terminal size, for every argument just
+    to validate its metavar. Share a single formatter while the arguments of a function are added.
+    """
+    get_formatter = getattr(parser, "_get_formatter", None)
+    if get_formatter is None or "_get_formatter" in vars(parser):  # Groups do not validate metavars
+        yield
+        return
+    formatter = get_formatter()
+    parser._get_formatter = lambda: formatter
+    try:
+        yield
+    finally:
+        del parser._get_formatter
+
+
+def _get_add_argument_params(argSpec: ArgSpec) -> Tuple[str, Dict[str, Any]]:
+    """
+    Translate an ArgSpec into the arguments of parser.add_argument
+    :param argSpec: The spec of the argument
+    :return: The option string and the keyword arguments for parser.add_argument
+    """
+    name, typeFun, nargs, default, help, required = argSpec
+    if hasattr(default, "get"):
+        default = default.get()
+    elif hasattr(default, "result"):
+        default = default.result()
+    if typeFun == bool:
+        assert default is not None, "Error, bool arguments need to have associated default value. %s does not" % name
+        if default is True:
+            action = "store_false"
+            varname = "NOT_" + name
         else:
-            parser.add_argument("--" + name, type=typeFun, nargs=nargs, help=help + " Default=%(default)s",
-                                default=default,
-                                required= required)
-
-    return parser
+            action = "store_true"
+            varname = name
+        help += " Action: " + action + " for variable %s" % name
+        return "--" + varname, dict(help=help, action=action, dest= name)
+    elif isinstance(typeFun, CompactArrayType):
+        if default is not None and not isinstance(default, str):
+            default = typeFun.from_values(default)
+        return "--" + name, dict(action=CompactArrayAction, array_type=typeFun, nargs=nargs,
+                                 help=HelpWithDefault(help + " Default=%(default)s"), default=default,
+                                 required=required)
+    elif isinstance(typeFun, tuple):
+        return "--" + name, dict(choices=typeFun, help=HelpWithDefault(help + " Default=%(default)s"),
+                                 default=default,
+                                 required= required)
+    elif type(typeFun).__name__ == "PathPatternType":  # Not imported here, as most functions do not need it
+        from argParseFromDoc.pathPatterns import PathPatternAction
+        return "--" + name, dict(type=typeFun, action=PathPatternAction, nargs="+",
+                                 metavar=("PATTERN", PathPatternAction.OPTIONS_METAVAR),
+                                 help=HelpWithDefault(help + " Default=%(default)s"), default=default,
+                                 required=required)
+    elif nargs == "+" and not isinstance(default, str):
+        return "--" + name, dict(action=ListAction, item_type=typeFun, nargs=nargs,
+                                 help=HelpWithDefault(help + " Default=%(default)s"), default=default,
+                                 required=required)
+    else:
+        return "--" + name, dict(type=typeFun, nargs=nargs, help=HelpWithDefault(help + " Default=%(default)s"),
+                                 default=default,
+                                 required= required)
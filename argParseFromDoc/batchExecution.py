@@ -0,0 +1,213 @@
+import functools
+import json
+import shlex
+import sys
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple, Union
+
+from argParseFromDoc.AutoArgumentParser import AutoArgumentParser
+
+INPUT_FORMATS = ("argv", "jsonl")
+
+
+class BatchItemError(Exception):
+    """
+    Raised when one of the argument sets of a batch is not valid.
+    """
+    pass
+
+
+class _BatchArgumentParser(AutoArgumentParser):
+    """
+    An AutoArgumentParser that raises BatchItemError instead of exiting, so that one invalid argument set does not
+    stop the batch.
+    """
+    def error(self, message):
+        raise BatchItemError(message)
+
+    def exit(self, status=0, message=None):
+        raise BatchItemError(message.strip() if message else "exit requested with status %s" % status)
+
+
+class BatchResult(NamedTuple):
+    index: int
+    args: Optional[List[str]]
+    result: Any
+    error: Optional[str]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_json(self) -> str:
+        """
+        :return: A json line with the index, the result or the error of the call
+        """
+        if self.ok:
+            return json.dumps(dict(index=self.index, ok=True, result=self.result), default=str)
+        return json.dumps(dict(index=self.index, ok=False, error=self.error), default=str)
+
+
+def _read_lines(inputs: Union[str, TextIO, Iterable[str]]) -> Iterator[str]:
+    if isinstance(inputs, str):
+        if inputs == "-":
+            yield from sys.stdin
+        else:
+            with open(inputs) as f:
+                yield from f
+    else:
+        yield from inputs
+
+
+def _line_to_argv(callable: Callable, line: str, input_format: str, args_to_ignore: Optional[List[str]],
+                  args_to_include: Optional[List[str]], args_optional: Optional[List[str]]) -> List[str]:
+    if input_format == "argv":
+        return shlex.split(line)
+    return _values_to_argv(callable, json.loads(line), args_to_ignore, args_to_include, args_optional)
+
+
+def _values_to_argv(callable: Callable, values: Union[list, dict], args_to_ignore: Optional[List[str]],
+                    args_to_include: Optional[List[str]], args_optional: Optional[List[str]]) -> List[str]:
+    if isinstance(values, (list, tuple)):
+        return [str(value) for value in values]
+    if not isinstance(values, dict):
+        raise BatchItemError("argument sets should be an object with the argument values or a list with the argv")
+    generator = _get_command_generator(callable, tuple(args_to_ignore or ()),
+                                       tuple(args_to_include) if args_to_include else None, tuple(args_optional or ()))
+    return generator.get_args(**values)
+
+
+@functools.lru_cache(maxsize=32)
+def _get_command_generator(callable: Callable, args_to_ignore: Tuple[str, ...],
+                           args_to_include: Optional[Tuple[str, ...]], args_optional: Tuple[str, ...]):
+    from argParseFromDoc.commandStrGenerator import CommandGenerator
+    return CommandGenerator(callable, args_to_ignore=list(args_to_ignore),
+                            args_to_include=list(args_to_include) if args_to_include else None,
+                            args_optional=list(args_optional))
+
+
+def iter_function_calls(callable: Callable, inputs: Union[str, TextIO, Iterable[str]] = "-",
+                        input_format: str = "argv", args_to_ignore: List[str] = None,
+                        args_to_include: List[str] = None, args_optional: List[str] = None,
+                        cache_dir: Optional[str] = None) -> Iterator[BatchResult]:
+    """
+    Call a documented function once per argument set, in the current process. Argument sets are read lazily, one per
+    line, and they are validated with the same parser that parse_function_and_call would use. Errors, either
+    parsing the arguments or raised by the function, are reported in the result of the item and do not stop the batch.
+
+    :param callable: the documented function to call
+    :param inputs: A file name, "-" for stdin, an opened file or any iterable of lines
+    :param input_format: "argv" for lines with command line arguments (e.g. --a 1 --b 2 3), or "jsonl" for lines
+                         with a json object of argument values (e.g. {"a": 1, "b": [2, 3]}) or a json list with the
+                         command line arguments. Empty lines and, for "argv", lines starting with # are skipped
+    :param args_to_ignore: Arguments in the function callable that won't be translated to argparse arguments
+    :param args_to_include: Only this names of arguments in the function callable will be translated to argparse arguments
+    :param args_optional: Arguments in the function callable that are optional.
+    :param cache_dir: Directory of the on-disk spec cache. See get_spec_from_function
+    :return: A generator of BatchResult, one per argument set, in the same order
+    """
+    assert input_format in INPUT_FORMATS, "argParseFromDoc: Error, input_format should be one of %s" % (INPUT_FORMATS,)
+    parser = _get_batch_parser(callable, args_to_ignore, args_to_include, args_optional, cache_dir)
+    for index, line in _iter_lines(inputs, input_format):
+        yield _call_item(callable, parser, index, line, input_format, args_to_ignore, args_to_include,
+                         args_optional)
+
+
+def _get_batch_parser(callable: Callable, args_to_ignore: Optional[List[str]], args_to_include: Optional[List[str]],
+                      args_optional: Optional[List[str]], cache_dir: Optional[str]):
+    from argParseFromDoc.autoArgparseFunction import get_spec_from_function
+    from argParseFromDoc.fastParser import FastParser
+    spec = get_spec_from_function(callable, args_to_ignore=args_to_ignore, args_to_include=args_to_include,
+                                  args_optional=args_optional, cache_dir=cache_dir)
+    return FastParser(spec, prog=getattr(callable, "__name__", None), fallback_parser_class=_BatchArgumentParser)
+
+
+def _iter_lines(inputs: Union[str, TextIO, Iterable[str]], input_format: str) -> Iterator[Tuple[int, str]]:
+    for index, line in enumerate(_read_lines(inputs)):
+        line = line.strip()
+        if not line or (input_format == "argv" and line.startswith("#")):
+            continue
+        yield index, line
+
+
+def _get_item_argv(callable: Callable, item: Union[str, List[str], dict], input_format: str,
+                   args_to_ignore: Optional[List[str]], args_to_include: Optional[List[str]],
+                   args_optional: Optional[List[str]]) -> List[str]:
+    if isinstance(item, str):
+        return _line_to_argv(callable, item, input_format, args_to_ignore, args_to_include, args_optional)
+    return _values_to_argv(callable, item, args_to_ignore, args_to_include, args_optional)
+
+
+def _call_item(callable: Callable, parser, index: int, item: Union[str, List[str], dict], input_format: str,
+               args_to_ignore: Optional[List[str]], args_to_include: Optional[List[str]],
+               args_optional: Optional[List[str]]) -> BatchResult:
+    from argParseFromDoc.asyncExecution import call_function
+    argv = None
+    try:
+        argv = _get_item_argv(callable, item, input_format, args_to_ignore, args_to_include, args_optional)
+        return BatchResult(index, argv, call_function(callable, vars(parser.parse_args(argv))), None)
+    except (Exception, SystemExit) as e:
+        return BatchResult(index, argv, None, _format_error(e))
+
+
+def _format_error(e: BaseException) -> str:
+    return "%s: %s" % (type(e).__name__, e)
+
+
+def parse_function_and_call_batch(callable: Callable, inputs: Union[str, TextIO, Iterable[str]] = "-",
+                                  input_format: str = "argv", output: Union[str, TextIO] = "-",
+                                  args_to_ignore: List[str] = None, args_to_include: List[str] = None,
+                                  args_optional: List[str] = None, cache_dir: Optional[str] = None,
+                                  max_concurrency: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Like parse_function_and_call, but for many argument sets in the same process. See iter_function_calls. Results
+    are streamed as json lines ({"index": 0, "ok": true, "result": ...} or {"index": 1, "ok": false, "error": ...}),
+    flushed after every item.
+
+    :param callable: the documented function to call
+    :param inputs: A file name, "-" for stdin, an opened file or any iterable of lines
+    :param input_format: "argv" or "jsonl". See iter_function_calls
+    :param output: A file name, "-" for stdout or an opened file where the results are written
+    :param args_to_ignore: Arguments in the function callable that won't be translated to argparse arguments
+    :param args_to_include: Only this names of arguments in the function callable will be translated to argparse arguments
+    :param args_optional: Arguments in the function callable that are optional.
+    :param cache_dir: Directory of the on-disk spec cache. See get_spec_from_function
+    :param max_concurrency: For async functions. If provided, up to max_concurrency calls run at the same time in an
+                            event loop and results are written as soon as they are ready. See
+                            argParseFromDoc.asyncExecution.iter_function_calls_async
+    :return: The number of successful and failed items
+    """
+    out_file = sys.stdout if output == "-" else (open(output, "w") if isinstance(output, str) else output)
+    counts = [0, 0]
+    try:
+        if max_concurrency is None:
+            for item in iter_function_calls(callable, inputs, input_format=input_format,
+                                            args_to_ignore=args_to_ignore, args_to_include=args_to_include,
+                                            args_optional=args_optional, cache_dir=cache_dir):
+                _write_result(item, out_file, counts)
+        else:
+            import asyncio
+            asyncio.run(_write_results_async(callable, inputs, input_format, out_file, counts, max_concurrency,
+                                             args_to_ignore, args_to_include, args_optional, cache_dir))
+    finally:
+        if out_file is not output and out_file is not sys.stdout:
+            out_file.close()
+    return counts[0], counts[1]
+
+
+def _write_result(item: BatchResult, out_file: TextIO, counts: List[int]):
+    counts[0 if item.ok else 1] += 1
+    out_file.write(item.to_json() + "\n")
+    out_file.flush()
+
+
+async def _write_results_async(callable: Callable, inputs: Union[str, TextIO, Iterable[str]], input_format: str,
+                               out_file: TextIO, counts: List[int], max_concurrency: int,
+                               args_to_ignore: Optional[List[str]], args_to_include: Optional[List[str]],
+                               args_optional: Optional[List[str]], cache_dir: Optional[str]):
+    from argParseFromDoc.asyncExecution import _call_items_async
+    assert input_format in INPUT_FORMATS, "argParseFromDoc: Error, input_format should be one of %s" % (INPUT_FORMATS,)
+    assert max_concurrency >= 1, "argParseFromDoc: Error, max_concurrency should be >= 1"
+    parser = _get_batch_parser(callable, args_to_ignore, args_to_include, args_optional, cache_dir)
+    async for item in _call_items_async(callable, parser, _iter_lines(inputs, input_format), max_concurrency,
+                                        input_format, args_to_ignore, args_to_include, args_optional):
+        _write_result(item, out_file, counts)
@@ -0,0 +1,144 @@
+import argparse
+import os
+import sys
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional, Sequence, Union
+
+
+class _Command(NamedTuple):
+    target: Union[str, Callable]
+    help: Optional[str]
+    args_to_ignore: Optional[List[str]]
+    args_to_include: Optional[List[str]]
+    args_optional: Optional[List[str]]
+
+
+class CommandDispatcher():
+    """
+    A program with one subcommand per documented function. Commands are registered as "package.module:function"
+    strings, so listing them does not import anything, and only the module of the selected command is imported and
+    introspected. E.g.
+
+        dispatcher = CommandDispatcher("tool")
+        dispatcher.add_command("my_package.train:train", help="train a model")
+        dispatcher.add_command("my_package.evaluate:evaluate", name="eval")
+        dispatcher.run()   # tool eval --model m.pt
+    """
+
+    def __init__(self, prog: Optional[str] = None, description: Optional[str] = None, cache_dir: Optional[str] = None,
+                 static: bool = False):
+        """
+        :param prog: The name of the program
+        :param description: The description of the program displayed in the help
+        :param cache_dir: Directory of the on-disk spec cache. See get_spec_from_function
+        :param static: If True, the arguments of the selected command are parsed and validated from the source code of
+                       its function, before its module is imported. See argParseFromDoc.staticSpec
+        """
+        self.prog = prog
+        self.description = description
+        self.cache_dir = cache_dir
+        self.static = static
+        self._commands = OrderedDict()
+
+    def add_command(self, target: Union[str, Callable], name: Optional[str] = None, help: Optional[str] = None,
+                    args_to_ignore: List[str] = None, args_to_include: List[str] = None,
+                    args_optional: List[str] = None):
+        """
+        Register a command. Nothing is imported until the command is selected.
+
+        :param target: "package.module:function", "path/to/file.py:function" or the function itself
+        :param name: The name of the command. Defaults to the name of the function
+        :param help: A short description of the command, displayed when listing the commands
+        :param args_to_ignore: Arguments in the function callable that won't be translated to argparse arguments
+        :param args_to_include: Only this names of arguments in the function callable will be translated to argparse arguments
+        :param args_optional: Arguments in the function callable that are optional.
+        """
+        if name is None:
+            if isinstance(target, str):
+                from argParseFromDoc.staticSpec import split_target
+                name = split_target(target)[1].split(".")[-1]
+            else:
+                name = target.__name__
+        assert name not in self._commands, "argParseFromDoc: Error, duplicated command %s" % name
+        self._commands[name] = _Command(target, help, args_to_ignore, args_to_include, args_optional)
+
+    def list_commands(self) -> List[str]:
+        """
+        :return: The names of the registered commands
+        """
+        return list(self._commands)
+
+    def _get_main_parser(self) -> argparse.ArgumentParser:
+        width = max([len(name) for name in self._commands] + [10])
+        lines = ["commands:"]
+        for name, command in self._commands.items():
+            command_help = command.help
+            if command_help is None:
+                command_help = command.target if isinstance(command.target, str) else command.target.__name__
+            lines.append("  %-*s  %s" % (width, name, command_help))
+        parser = argparse.ArgumentParser(self.prog, description=self.description, epilog="\n".join(lines),
+                                         usage="%(prog)s [-h] <command> [<args>...]",
+                                         formatter_class=argparse.RawDescriptionHelpFormatter)
+        parser.add_argument("command", help="The command to run. See the list below")
+        parser.add_argument("args", nargs=argparse.REMAINDER, help="The arguments of the command")
+        return parser
+
+    def _get_command_prog(self, name: str) -> str:
+        prog = self.prog if self.prog is not None else os.path.basename(sys.argv[0])
+        return "%s %s" % (prog, name)
+
+    def get_parser(self, name: str):
+        """
+        Build the parser of a command. The module of the command is imported.
+        :param name: The name of the command
+        :return: An AutoArgumentParser
+        """
+        from argParseFromDoc.AutoArgumentParser import AutoArgumentParser
+        command = self._commands[name]
+        parser = AutoArgumentParser(self._get_command_prog(name))
+        parser.add_args_from_function(self.get_function(name), args_to_ignore=command.args_to_ignore,
+                                      args_to_include=command.args_to_include, args_optional=command.args_optional,
+                                      cache_dir=self.cache_dir)
+        return parser
+
+    def get_function(self, name: str) -> Callable:
+        """
+        Import the function of a command
+        :param name: The name of the command
+        :return: The function
+        """
+        target = self._commands[name].target
+        if isinstance(target, str):
+            from argParseFromDoc.staticSpec import import_target
+            target = import_target(target)
+        return target
+
+    def _parse_command_args(self, name: str, args: Sequence[str]) -> argparse.Namespace:
+        command = self._commands[name]
+        if self.static and isinstance(command.target, str):
+            from argParseFromDoc.AutoArgumentParser import AutoArgumentParser
+            from argParseFromDoc.autoArgparseFunction import _add_spec_to_parser
+            from argParseFromDoc.staticSpec import get_spec_from_source
+            spec = get_spec_from_source(command.target, args_to_ignore=command.args_to_ignore,
+                                        args_to_include=command.args_to_include, args_optional=command.args_optional)
+            parser = AutoArgumentParser(self._get_command_prog(name))
+            _add_spec_to_parser(spec, parser)
+        else:
+            parser = self.get_parser(name)
+        return parser.parse_args(args)
+
+    def run(self, args: Optional[Sequence[str]] = None):
+        """
+        Parse the command line, import the selected command and call it
+        :param args: The command line arguments. If None, sys.argv[1:] is used
+        :return: The result of the command
+        """
+        if args is None:
+            args = sys.argv[1:]
+        main_parser = self._get_main_parser()
+        parsed = main_parser.parse_args(args)
+        if parsed.command not in self._commands:
+            main_parser.error("unknown command '%s'. Choose from: %s" % (parsed.command, ", ".join(self._commands)))
+        function_args = self._parse_command_args(parsed.command, parsed.args)
+        from argParseFromDoc.asyncExecution import call_function
+        return call_function(self.get_function(parsed.command), vars(function_args))
@@ -1,5 +1,8 @@
-from typing import Any, Dict, List, Union, get_type_hints, TextIO, BinaryIO, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Union, get_type_hints, TextIO, BinaryIO, Optional
+import hashlib
 import inspect
+import os
+import shlex
 from pathlib import Path
 
 
@@ -76,11 +79,81 @@ def generate_args_for_argparseFromDoc(fun, **kwargs) -> List[str]:
     return cmd_args
 
 
+# Linux limit for the length of a single argument, such as the command string of sh -c
+_MAX_ARG_STRLEN = 131072
+
+
+def get_max_command_length() -> int:
+    """
+    The maximum length of a command in this system: the limit of the OS (ARG_MAX) minus the size of the environment,
+    which shares it, and a safety margin. It is also below the limit of a single argument, so that the command can
+    be run with sh -c.
+
+    Returns:
+        int: The maximum number of characters
+    """
+    try:
+        arg_max = os.sysconf("SC_ARG_MAX")
+    except (AttributeError, ValueError, OSError):
+        arg_max = 32767  # Windows
+    env_size = sum(len(key) + len(value) + 2 + 8 for key, value in os.environ.items())  # + NUL, '=' and pointer
+    return max(4096, min(arg_max - env_size - 4096, _MAX_ARG_STRLEN - 1))
+
+
+DEFAULT_SPILL_DIR = "argParseFromDoc_args"
+
+
+def _has_content(fname: str, content: str) -> bool:
+    import stat
+    try:
+        st = os.lstat(fname)
+        if not stat.S_ISREG(st.st_mode) or (hasattr(os, "getuid") and st.st_uid != os.getuid()):
+            return False
+        with open(fname) as f:
+            return f.read() == content
+    except (OSError, UnicodeDecodeError):
+        return False
+
+
+def spill_args(args: List[str], spill_dir: Union[str, Path, None] = None) -> str:
+    """
+    Write command line arguments to an argument file, one per line, which parsers created by argParseFromDoc read
+    when they receive @file (see AutoArgumentParser). The file name is a hash of the arguments, so the same
+    arguments are only written once: an existing file is only reused if it is a regular file of the current user with
+    exactly these arguments, otherwise it is atomically replaced. The files are not removed, as the commands may run
+    later, possibly on other machines, so spill_dir should be visible from wherever the commands run.
+
+    Args:
+        args: The arguments. They cannot contain new lines
+        spill_dir: The directory of the file. It is created, only accessible by the current user, if it does not
+            exist. Defaults to DEFAULT_SPILL_DIR in the current directory, rather than the temporary directory of
+            the system, which is shared with other users and local to each machine
+
+    Returns:
+        str: The argument that replaces args, i.e. "@" followed by the path of the file
+    """
+    if any("\n" in arg for arg in args):
+        raise ValueError("argParseFromDoc: Error, arguments with new lines cannot be written to an argument file")
+    content = "".join(arg + "\n" for arg in args)
+    from argParseFromDoc.fileTypes import AtomicOutputFile
+    spill_dir = os.path.abspath(spill_dir if spill_dir is not None else DEFAULT_SPILL_DIR)
+    os.makedirs(spill_dir, mode=0o700, exist_ok=True)
+    # AutoArgumentParser only reads @files with this name by default. See is_spill_file
+    name = "argParseFromDoc_%s.args" % hashlib.sha1(content.encode("utf-8", "surrogateescape")).hexdigest()
+    fname = os.path.join(spill_dir, name)
+    if not _has_content(fname, content):
+        with AtomicOutputFile(fname, "w") as f:
+            f.write(content)
+    return "@" + fname
+
+
 def generate_command_for_argparseFromDoc(
         path: Union[str, Path],
         fun,
         use_module: bool = False,
         python_executable: str = "python",
+        max_length: Optional[int] = None,
+        spill_dir: Union[str, Path, None] = None,
         **kwargs
 ) -> str:
     """
@@ -91,6 +164,9 @@ def generate_command_for_argparseFromDoc(
         fun: The function to generate arguments for
         use_module: If True, use -m to run as module instead of as script
         python_executable: Python executable to use (default: "python")
+        max_length: If the command is longer, the arguments are written to an argument file, and the command
+            receives @file instead (see spill_args). Defaults to get_max_command_length()
+        spill_dir: The directory of the argument files. See spill_args
         **kwargs: The arguments to pass to the function
 
     Returns:
@@ -108,6 +184,317 @@ def generate_command_for_argparseFromDoc(
     args = generate_args_for_argparseFromDoc(fun, **kwargs)
 
     if use_module:
-        return f"{python_executable} -m {path} {' '.join(args)}"
+        command = f"{python_executable} -m {path} {' '.join(args)}"
+    else:
+        command = f"{python_executable} {path} {' '.join(args)}"
+    if len(command) > (max_length if max_length is not None else get_max_command_length()):
+        prefix = command[:len(command) - len(' '.join(args))]
+        command = prefix + shlex.quote(spill_args(args, spill_dir))
+    return command
+
+
+_MISSING = object()
+
+
+def _encode_scalar(cmd_args: List[str], option: str, value: Any):
+    cmd_args += (option, str(value))
+
+
+def _encode_list(cmd_args: List[str], option: str, value: Any):
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"Argument '{option[2:]}' should be a list")
+    cmd_args.append(option)
+    cmd_args += map(str, value)
+
+
+def _encode_file(cmd_args: List[str], option: str, value: Any):
+    cmd_args += (option, value.name if hasattr(value, 'name') else str(value))
+
+
+def _get_bool_encoder(name: str, default_value: Any) -> Callable:
+    flag = f'--NOT_{name}' if default_value else f'--{name}'
+
+    def _encode_bool(cmd_args: List[str], option: str, value: Any):
+        if value != default_value:  # Only add flag if it differs from default
+            cmd_args.append(flag)
+    return _encode_bool
+
+
+class CommandGenerator():
+    """
+    Like generate_args_for_argparseFromDoc and generate_command_for_argparseFromDoc, but the signature of the
+    function is only inspected once, when the generator is created. Each parameter gets a precomputed encoder for its
+    kind of value (bool, list, file or scalar), so that millions of commands can be generated in a tight loop.
+
+    Examples:
+        generator = CommandGenerator(add, path='script.py')
+        generator.get_args(a=5, b=["hello", "world"])
+        # Returns: ['--a', '5', '--b', 'hello', 'world']
+        generator.get_command(a=5, b=["hello world"])
+        # Returns: "python script.py --a 5 --b 'hello world'"
+    """
+
+    def __init__(self, fun, path: Union[str, Path, None] = None, use_module: bool = False,
+                 python_executable: str = "python", args_to_ignore: Optional[List[str]] = None,
+                 args_to_include: Optional[List[str]] = None, args_optional: Optional[List[str]] = None,
+                 max_length: Optional[int] = None, spill_dir: Union[str, Path, None] = None):
+        """
+        Args:
+            fun: The function to generate arguments for
+            path: Path to the Python script or module name. Only needed for get_command
+            use_module: If True, use -m to run as module instead of as script
+            python_executable: Python executable to use (default: "python")
+            args_to_ignore: Arguments of fun that are not passed
+            args_to_include: If provided, only these arguments of fun are passed
+            args_optional: Arguments of fun that are optional
+            max_length: Longer commands get their arguments from an argument file. See
+                generate_command_for_argparseFromDoc
+            spill_dir: The directory of the argument files. See spill_args
+        """
+        self.fun = fun
+        self._prefix = None
+        if path is not None:
+            self._prefix = [python_executable] + (["-m"] if use_module else []) + [str(path)]
+        self._command_prefix = " ".join(map(shlex.quote, self._prefix)) + " " if self._prefix else None
+        self._max_length = max_length if max_length is not None else get_max_command_length()
+        self._spill_dir = spill_dir
+        self._encoders = self._get_encoders(fun, args_to_ignore or [], args_to_include, args_optional or [])
+
+    @staticmethod
+    def _get_encoders(fun, args_to_ignore: List[str], args_to_include: Optional[List[str]],
+                      args_optional: List[str]) -> List[tuple]:
+        type_hints = get_type_hints(fun)
+        encoders = []
+        for name, param in inspect.signature(fun).parameters.items():
+            if name == 'self' or name in args_to_ignore or (args_to_include and name not in args_to_include):
+                continue
+            param_type = type_hints.get(name)
+            is_optional = (
+                param.default != inspect.Parameter.empty or
+                name in args_optional or
+                str(param_type).startswith('typing.Optional')
+            )
+            inner_type = _get_inner_type(param_type)
+            if inner_type == 'bool' or inner_type == "<class 'bool'>":
+                default_value = param.default if param.default != inspect.Parameter.empty else False
+                encode = _get_bool_encoder(name, default_value)
+            elif inner_type.startswith('typing.List'):
+                encode = _encode_list
+            elif param_type in (TextIO, BinaryIO):
+                encode = _encode_file
+            else:
+                encode = _encode_scalar
+            encoders.append((name, f'--{name}', is_optional, encode))
+        return encoders
+
+    def get_args(self, **kwargs) -> List[str]:
+        """
+        Args:
+            **kwargs: The arguments to pass to the function
+
+        Returns:
+            List[str]: The command line arguments, as generate_args_for_argparseFromDoc
+        """
+        cmd_args = []
+        get_value = kwargs.get
+        for name, option, is_optional, encode in self._encoders:
+            value = get_value(name, _MISSING)
+            if value is _MISSING:
+                if not is_optional:
+                    raise ValueError(f"Required argument '{name}' not provided")
+                continue
+            if value is None and is_optional:
+                continue
+            encode(cmd_args, option, value)
+        return cmd_args
+
+    def get_command(self, **kwargs) -> str:
+        """
+        Args:
+            **kwargs: The arguments to pass to the function
+
+        Returns:
+            str: The complete command string, with every argument quoted for the shell. If it would be longer than
+            max_length, the arguments are read from an argument file
+        """
+        if self._prefix is None:
+            raise ValueError("argParseFromDoc: Error, the CommandGenerator needs a path to generate commands")
+        return self._to_command(self.get_args(**kwargs))
+
+    def get_argv(self, **kwargs) -> List[str]:
+        """
+        Args:
+            **kwargs: The arguments to pass to the function
+
+        Returns:
+            List[str]: The complete command, e.g. for subprocess.run or run_jobs. If it would be longer than
+            max_length, the arguments are read from an argument file
+        """
+        if self._prefix is None:
+            raise ValueError("argParseFromDoc: Error, the CommandGenerator needs a path to generate commands")
+        args = self.get_args(**kwargs)
+        if sum(map(len, args)) + len(args) + len(self._command_prefix) > self._max_length:
+            args = [spill_args(args, self._spill_dir)]
+        return self._prefix + args
+
+    def _to_command(self, args: List[str]) -> str:
+        command = self._command_prefix + " ".join(map(shlex.quote, args))
+        if len(command) > self._max_length:
+            command = self._command_prefix + shlex.quote(spill_args(args, self._spill_dir))
+        return command
+
+
+def _iter_product(values_list: List[Iterable]) -> Iterator[tuple]:
+    # Like itertools.product, which would copy every range or sequence of values into a tuple
+    if not values_list:
+        yield ()
+        return
+    for head in values_list[0]:
+        for tail in _iter_product(values_list[1:]):
+            yield (head,) + tail
+
+
+def iter_sweep_kwargs(base: Optional[Dict[str, Any]] = None, product: Optional[Dict[str, Iterable]] = None,
+                      zipped: Optional[Dict[str, Iterable]] = None,
+                      overrides: Optional[Iterable[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily expand a parameter sweep into the keyword arguments of every point. Each point is base, updated with one
+    combination of the product values, one position of the zipped values and one of the overrides, in this order. A
+    name cannot be both in product and in zipped.
+    Points are generated one at a time, so sweeps with millions of points are never held in memory.
+
+    Args:
+        base: The values shared by all points
+        product: Every combination of these values is used, e.g. dict(lr=[0.1, 0.01], seed=range(3)) gives 6 points
+        zipped: These values are iterated together, e.g. dict(a=[1, 2], b=[3, 4]) gives a=1,b=3 and a=2,b=4. They can
+            be generators only if there are no overrides, as they are iterated again for every override
+        overrides: Dictionaries of values applied on top of the rest, e.g. read from a file. It can be a generator
+
+    Returns:
+        Iterator[Dict[str, Any]]: The keyword arguments of each point
+    """
+    base = dict(base or {})
+    product_names = list(product or {})
+    # Iterators are the only values that need to be stored, as they are iterated many times. Ranges, lists... are not
+    product_values = [tuple(values) if iter(values) is values else values for values in (product or {}).values()]
+    zipped_names = list(zipped or {})
+    zipped_values = list((zipped or {}).values())
+    repeated = set(product_names).intersection(zipped_names)
+    if repeated:
+        raise ValueError(f"argParseFromDoc: Error, {sorted(repeated)} cannot be both in product and in zipped")
+    sizes = {len(values) for values in zipped_values if hasattr(values, '__len__')}
+    if len(sizes) > 1:
+        raise ValueError(f"argParseFromDoc: Error, the zipped values have different lengths {sorted(sizes)}")
+    if overrides is not None and any(iter(values) is values for values in zipped_values):
+        raise ValueError("argParseFromDoc: Error, zipped values cannot be iterators if there are overrides")
+
+    for override in ([{}] if overrides is None else overrides):
+        for zipped_point in (zip(*zipped_values) if zipped_values else [()]):
+            kwargs = dict(base)
+            kwargs.update(zip(zipped_names, zipped_point))
+            for product_point in _iter_product(product_values):
+                point = dict(kwargs)
+                point.update(zip(product_names, product_point))
+                point.update(override)
+                yield point
+
+
+def iter_sweep_commands(fun, path: Union[str, Path, None] = None, base: Optional[Dict[str, Any]] = None,
+                        product: Optional[Dict[str, Iterable]] = None, zipped: Optional[Dict[str, Iterable]] = None,
+                        overrides: Optional[Iterable[Dict[str, Any]]] = None, as_argv: bool = False,
+                        validate: bool = True, use_module: bool = False, python_executable: str = "python",
+                        args_to_ignore: Optional[List[str]] = None, args_to_include: Optional[List[str]] = None,
+                        args_optional: Optional[List[str]] = None, max_length: Optional[int] = None,
+                        spill_dir: Union[str, Path, None] = None) -> Iterator[Union[str, List[str]]]:
+    """
+    Lazily generate the commands of a parameter sweep. See iter_sweep_kwargs for the sweep definition.
+    The names of base, product and zipped are checked against the signature of fun when the generator is created,
+    and every point is checked as it is generated.
+
+    Args:
+        fun: The function to generate arguments for
+        path: Path to the Python script or module name. Not needed if as_argv is True
+        base, product, zipped, overrides: The sweep. See iter_sweep_kwargs
+        as_argv: If True, yield the argument lists of fun instead of shell quoted commands
+        validate: If True, the arguments of every point are parsed with the parser of fun, so invalid values (e.g.
+            a str for an int, a missing required argument or a value not in a Literal) raise a ValueError. File
+            arguments must then exist
+        use_module: If True, use -m to run as module instead of as script
+        python_executable: Python executable to use (default: "python")
+        args_to_ignore, args_to_include, args_optional: As in get_parser_from_function
+        max_length, spill_dir: Commands longer than max_length get their arguments from an argument file. See
+            generate_command_for_argparseFromDoc
+
+    Returns:
+        Iterator[Union[str, List[str]]]: The commands or argument lists of each point
+    """
+    if not as_argv and path is None:
+        raise ValueError("argParseFromDoc: Error, a path is needed to generate commands")
+    generator = CommandGenerator(fun, path=path, use_module=use_module, python_executable=python_executable,
+                                 args_to_ignore=args_to_ignore, args_to_include=args_to_include,
+                                 args_optional=args_optional, max_length=max_length, spill_dir=spill_dir)
+    known_names = {encoder[0] for encoder in generator._encoders}
+    unknown_names = sorted((set(base or {}) | set(product or {}) | set(zipped or {})) - known_names)
+    if unknown_names:
+        raise ValueError(f"argParseFromDoc: Error, {unknown_names} are not arguments of {fun.__name__}")
+    parser = None
+    if validate:
+        from argParseFromDoc.batchExecution import _get_batch_parser
+        parser = _get_batch_parser(fun, args_to_ignore, args_to_include, args_optional, None)
+    return _iter_sweep_commands(generator, iter_sweep_kwargs(base, product, zipped, overrides), known_names, parser,
+                                as_argv)
+
+
+def _iter_sweep_commands(generator: CommandGenerator, points: Iterator[Dict[str, Any]], known_names: set, parser,
+                         as_argv: bool) -> Iterator[Union[str, List[str]]]:
+    from argParseFromDoc.batchExecution import BatchItemError
+    for index, point in enumerate(points):
+        try:
+            if not known_names.issuperset(point):
+                raise ValueError(f"{sorted(set(point) - known_names)} are not arguments of {generator.fun.__name__}")
+            argv = generator.get_args(**point)
+            if parser is not None:
+                parser.parse_args(argv)
+        except (ValueError, BatchItemError) as e:
+            raise ValueError(f"argParseFromDoc: Error, sweep point {index} {point} is not valid: {e}") from e
+        yield argv if as_argv else generator._to_command(argv)
+
+
+def write_sweep_commands(job_file: Union[str, Path, TextIO], fun, path: Union[str, Path, None] = None,
+                         **kwargs) -> int:
+    """
+    Write the commands of a parameter sweep to a job file, one per line, or, with as_argv=True, one json list of
+    arguments per line (the argv input format of parse_function_and_call_batch reads the former, and the jsonl
+    format the latter). A file name is written atomically: if a point is not valid, no job file is left behind.
+
+    Args:
+        job_file: A file name, "-" for stdout or an opened file
+        fun: The function to generate arguments for
+        path: Path to the Python script or module name
+        **kwargs: The sweep and the options of iter_sweep_commands. For a job file name, spill_dir defaults to the
+            directory job_file + ".args", next to it
+
+    Returns:
+        int: The number of commands written
+    """
+    import json
+    from argParseFromDoc.fileTypes import AtomicOutputFileType
+    if isinstance(job_file, (str, Path)) and str(job_file) != "-":
+        kwargs.setdefault("spill_dir", str(job_file) + ".args")
+    commands = iter_sweep_commands(fun, path, **kwargs)
+    as_argv = kwargs.get("as_argv", False)
+    out_file = AtomicOutputFileType("w")(str(job_file)) if isinstance(job_file, (str, Path)) else job_file
+    n_commands = 0
+    try:
+        for command in commands:
+            out_file.write((json.dumps(command) if as_argv else command) + "\n")
+            n_commands += 1
+    except BaseException:
+        if hasattr(out_file, "discard"):
+            out_file.discard()
+        raise
+    if hasattr(out_file, "commit"):
+        out_file.commit()
     else:
-        return f"{python_executable} {path} {' '.join(args)}"
\ No newline at end of file
+        out_file.flush()
+    return n_commands
@@ -0,0 +1,144 @@
+import argparse
+import array
+from typing import Any, Optional, Sequence
+
+from argParseFromDoc.listArguments import expand_values
+
+_ARRAY_INT_TYPECODES = "bBhHiIlLqQ"
+_ARRAY_FLOAT_TYPECODES = "fd"
+_PYTHON_TYPE_TO_TYPECODE = {int: "q", float: "d"}
+_PYTHON_TYPE_TO_DTYPE = {int: "int64", float: "float64"}
+CONTAINERS = ("array", "ndarray")
+
+_COMPACT_LISTS = None
+
+
+def set_compact_lists(container: Optional[str] = "array"):
+    """
+    Opt in to compact values for List[int] and List[float] arguments: they will be received as an array.array
+    ("array") or a numpy array ("ndarray") instead of a list. Only functions whose spec is extracted afterwards are
+    affected.
+
+    :param container: "array", "ndarray" or None to receive lists again
+    """
+    global _COMPACT_LISTS
+    assert container is None or container in CONTAINERS, \
+        "argParseFromDoc: Error, container should be one of %s or None" % (CONTAINERS,)
+    _COMPACT_LISTS = container
+
+
+def get_compact_lists() -> Optional[str]:
+    """
+    :return: The container used for List[int] and List[float] arguments, or None if they are received as lists
+    """
+    return _COMPACT_LISTS
+
+
+class CompactArrayType():
+    """
+    The type of a list argument whose values are converted all at once into a compact contiguous buffer, an
+    array.array or a numpy array, instead of a list of python objects.
+    """
+
+    def __init__(self, container: str, code: str):
+        """
+        :param container: "array" for array.array or "ndarray" for numpy arrays
+        :param code: The array.array typecode (e.g. "q") or the numpy dtype name (e.g. "int64")
+        """
+        assert container in CONTAINERS, "argParseFromDoc: Error, container should be one of %s" % (CONTAINERS,)
+        self.container = container
+        self.code = code
+        self.item_type = self._get_item_type()
+
+    def _get_item_type(self) -> type:
+        if self.container == "array":
+            if self.code in _ARRAY_INT_TYPECODES:
+                return int
+            elif self.code in _ARRAY_FLOAT_TYPECODES:
+                return float
+        elif self.code.startswith(("int", "uint")):
+            return int
+        elif self.code.startswith("float"):
+            return float
+        raise ValueError("argParseFromDoc: Error, only int and float arrays are supported, not %s" % self)
+
+    def __call__(self, values: Sequence[str]):
+        """
+        Convert the command line strings of an argument
+        :param values: The strings
+        :return: The array
+        """
+        if self.container == "array":
+            return array.array(self.code, map(self.item_type, values))
+        import numpy  # Imported here, as only ndarray arguments need it
+        # Each value goes through int() or float(), so that empty values or values with several numbers raise, and
+        # out of range integers raise instead of wrapping around
+        return numpy.fromiter(map(self.item_type, values), dtype=self.code, count=len(values))
+
+    def from_values(self, values: Sequence[Any]):
+        """
+        Convert python values, e.g. the default of an argument
+        :param values: The values
+        :return: The array
+        """
+        if self.container == "array":
+            return array.array(self.code, values)
+        import numpy
+        return numpy.asarray(values, dtype=self.code)
+
+    def __repr__(self):
+        return "%s(%r, %r)" % (type(self).__name__, self.container, self.code)
+
+    def __eq__(self, other):
+        return isinstance(other, CompactArrayType) and (self.container, self.code) == (other.container, other.code)
+
+    def __hash__(self):
+        return hash((self.container, self.code))
+
+
+class CompactArrayAction(argparse.Action):
+    """
+    Stores all the values of a nargs="+" argument as a single array, see CompactArrayType.
+    """
+
+    def __init__(self, option_strings, dest, array_type: CompactArrayType = None, **kwargs):
+        super().__init__(option_strings, dest, **kwargs)
+        self.array_type = array_type
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        try:
+            setattr(namespace, self.dest, self.array_type(expand_values(values)))
+        except (ValueError, OverflowError) as e:
+            raise argparse.ArgumentError(self, "invalid %s values: %s" % (self.array_type.code, e))
+
+
+def get_compact_array_type(hintType: Any, default: Any = None) -> Optional[CompactArrayType]:
+    """
+    Check whether a type hint is a compact array
+    :param hintType: The type hint. array.array, array.array[int] (python>=3.12), numpy.ndarray[Any, numpy.dtype[X]],
+                     numpy.typing.NDArray[X] or, if set_compact_lists was used, List[int] or List[float]
+    :param default: The default value of the argument. The typecode of an array.array default is used for
+                    array.array hints, which are float ("d") otherwise
+    :return: The CompactArrayType or None if hintType is not a compact array
+    """
+    origin = getattr(hintType, "__origin__", None)
+    args = getattr(hintType, "__args__", ())
+    if hintType is array.array:
+        return CompactArrayType("array", default.typecode if isinstance(default, array.array) else "d")
+    if origin is array.array:
+        assert len(args) == 1 and args[0] in _PYTHON_TYPE_TO_TYPECODE, \
+            "argParseFromDoc: Error, only array.array[int] or array.array[float] are supported, not %s" % hintType
+        return CompactArrayType("array", _PYTHON_TYPE_TO_TYPECODE[args[0]])
+    if getattr(origin, "__module__", None) == "numpy" and getattr(origin, "__name__", None) == "ndarray":
+        # Both numpy.ndarray[shape, numpy.dtype[X]] and numpy.typing.NDArray[X]. numpy itself is not imported
+        dtype_args = getattr(args[-1], "__args__", ()) if args else ()
+        scalar_name = getattr(dtype_args[0], "__name__", None) if len(dtype_args) == 1 else None
+        assert scalar_name is not None, \
+            "argParseFromDoc: Error, the dtype of %s should be given, e.g. numpy.typing.NDArray[numpy.int64]" % hintType
+        return CompactArrayType("ndarray", scalar_name)
+    if _COMPACT_LISTS is not None and getattr(hintType, "_name", None) == "List" and len(args) == 1 \
+            and args[0] in _PYTHON_TYPE_TO_TYPECODE:
+        if _COMPACT_LISTS == "array":
+            return CompactArrayType("array", _PYTHON_TYPE_TO_TYPECODE[args[0]])
+        return CompactArrayType("ndarray", _PYTHON_TYPE_TO_DTYPE[args[0]])
+    return None
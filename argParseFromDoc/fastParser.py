@@ -0,0 +1,204 @@
+import argparse
+import re
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from argParseFromDoc.helpers import ArgSpec
+from argParseFromDoc.listArguments import _find_run_end
+
+_NEGATIVE_NUMBER_MATCHER = re.compile(r'^-\d+$|^-\d*\.\d+$')  # Same rule as argparse
+
+_FLAG, _SINGLE, _MULTIPLE = range(3)
+
+
+class _FallbackRequired(Exception):
+    """
+    Raised internally when the fast path cannot handle the command line.
+    """
+    pass
+
+
+class FastParser():
+    """
+    A minimal command line parser compiled from the spec of a documented function. It accepts the same command lines
+    as the parser built by get_parser_from_function (`--name value`, `--name v1 v2 ...` for lists, `--name`/`--NOT_name`
+    for booleans and `--name=value`) and returns the same Namespace, but it is much faster to run. Anything that it
+    does not handle itself, such as `--help`, abbreviated options or invalid arguments, is delegated to a full
+    argparse parser, so help messages and errors are exactly the same.
+    """
+
+    def __init__(self, spec: Tuple[ArgSpec, ...], prog: Optional[str] = None,
+                 fallback_parser_class: Optional[type] = None):
+        """
+        :param spec: The spec, as returned by get_spec_from_function
+        :param prog: The name of the program, used by the argparse fallback
+        :param fallback_parser_class: The argparse.ArgumentParser subclass used as fallback. Defaults to
+                                      AutoArgumentParser
+        """
+        from argParseFromDoc.autoArgparseFunction import _get_add_argument_params
+        self.spec = spec
+        self.prog = prog
+        self.fallback_parser_class = fallback_parser_class
+        self._fallback_parser = None
+        self._options = {}
+        self._defaults = {}
+        self._required = []
+        self._str_defaults = []
+        self._array_types = {}
+        self._combiners = {}
+        for argSpec in spec:
+            option_string, params = _get_add_argument_params(argSpec)
+            dest = argSpec.name
+            action = params.get("action")
+            if action in ("store_true", "store_false"):
+                self._options[option_string] = (dest, _FLAG, action == "store_true", None)
+                self._defaults[dest] = action == "store_false"
+                continue
+            if "array_type" in params:
+                self._array_types[dest] = params["array_type"]  # Converted all at once after parsing
+            combine = getattr(params.get("action"), "combine", None)
+            if combine is not None:
+                self._combiners[dest] = combine  # E.g. the options of an Iterator[Path] argument
+            conv = params.get("type", params.get("item_type"))
+            choices = params.get("choices")
+            kind = _MULTIPLE if params.get("nargs") == "+" else _SINGLE
+            self._options[option_string] = (dest, kind, conv, choices)
+            default = params.get("default")
+            self._defaults[dest] = default
+            if isinstance(default, str) and conv is not None:
+                self._str_defaults.append((dest, conv))  # argparse converts string defaults when they are used
+            if params.get("required"):
+                self._required.append(dest)
+
+    def _get_fallback_parser(self) -> argparse.ArgumentParser:
+        if self._fallback_parser is None:
+            from argParseFromDoc.AutoArgumentParser import AutoArgumentParser
+            from argParseFromDoc.autoArgparseFunction import _add_spec_to_parser
+            parser_class = self.fallback_parser_class if self.fallback_parser_class is not None else AutoArgumentParser
+            self._fallback_parser = parser_class(self.prog)
+            _add_spec_to_parser(self.spec, self._fallback_parser)
+        return self._fallback_parser
+
+    @staticmethod
+    def _is_value(arg: str) -> bool:
+        return not arg.startswith("-") or arg == "-" or _NEGATIVE_NUMBER_MATCHER.match(arg) is not None
+
+    def _convert(self, conv: Optional[Callable], choices, value: str):
+        if conv is not None:
+            try:
+                value = conv(value)
+            except Exception:
+                raise _FallbackRequired()
+        if choices is not None and value not in choices:
+            raise _FallbackRequired()
+        return value
+
+    def _convert_all(self, conv: Optional[Callable], choices, values: List[str]) -> list:
+        if choices is not None:
+            return [self._convert(conv, choices, value) for value in values]
+        if conv is None or conv is str:
+            return values
+        try:
+            return list(map(conv, values))
+        except Exception:
+            raise _FallbackRequired()
+
+    def _parse(self, args: Sequence[str]) -> dict:
+        values = dict(self._defaults)
+        seen = set()
+        options = self._options
+        is_value = self._is_value
+        i = 0
+        n_args = len(args)
+        while i < n_args:
+            arg = args[i]
+            i += 1
+            option = options.get(arg)
+            inline_value = None
+            if option is None:
+                option_string, eq, inline_value = arg.partition("=")
+                option = options.get(option_string) if eq and arg.startswith("--") else None
+                if option is None:
+                    raise _FallbackRequired()
+            dest, kind, conv, choices = option
+            if kind == _FLAG:
+                if inline_value is not None:
+                    raise _FallbackRequired()
+                values[dest] = conv
+            elif inline_value is not None:
+                value = self._convert(conv, choices, inline_value)
+                values[dest] = value if kind == _SINGLE else [value]
+            elif kind == _SINGLE:
+                if i >= n_args or not is_value(args[i]):
+                    raise _FallbackRequired()
+                values[dest] = self._convert(conv, choices, args[i])
+                i += 1
+            else:
+                start = i
+                i = _find_run_end(args, start, is_value)
+                if i == start:
+                    raise _FallbackRequired()
+                values[dest] = self._convert_all(conv, choices, args[start:i])
+            seen.add(dest)
+        for dest in self._required:
+            if dest not in seen:
+                raise _FallbackRequired()
+        for dest, array_type in self._array_types.items():
+            if dest in seen:
+                try:
+                    values[dest] = array_type(values[dest])
+                except (ValueError, OverflowError):
+                    raise _FallbackRequired()
+        for dest, combine in self._combiners.items():
+            if dest in seen:
+                try:
+                    values[dest] = combine(values[dest])
+                except argparse.ArgumentTypeError:
+                    raise _FallbackRequired()
+        for dest, conv in self._str_defaults:
+            if dest not in seen:
+                values[dest] = self._convert(conv, None, values[dest])
+        return values
+
+    def parse_args(self, args: Optional[Sequence[str]] = None,
+                   namespace: Optional[argparse.Namespace] = None) -> argparse.Namespace:
+        """
+        Parse the command line arguments
+        :param args: The command line arguments. If None, sys.argv[1:] is used
+        :param namespace: An object to take the attributes. A new Namespace is created by default
+        :return: The namespace with one attribute per argument of the function
+        """
+        if args is None:
+            import sys
+            args = sys.argv[1:]
+        try:
+            if any(arg[:1] == "@" for arg in args):  # Argument files are read by the fallback parser
+                raise _FallbackRequired()
+            values = self._parse(args)
+        except _FallbackRequired:
+            return self._get_fallback_parser().parse_args(args, namespace=namespace)
+        if namespace is None:
+            return argparse.Namespace(**values)
+        for dest, value in values.items():
+            setattr(namespace, dest, value)
+        return namespace
+
+
+def get_fast_parser_from_function(callable: Callable, args_to_ignore: List[str] = None,
+                                  args_to_include: List[str] = None, args_optional: List[str] = None,
+                                  prog: Optional[str] = None, cache_dir: Optional[str] = None) -> FastParser:
+    """
+    Build a FastParser for a documented function. Use it instead of get_parser_from_function when the same
+    function arguments need to be parsed many times in the same process.
+
+    :param callable: the documented function to extract information from
+    :param args_to_ignore: Arguments in the function callable that won't be translated to argparse arguments
+    :param args_to_include: Only this names of arguments in the function callable will be translated to argparse arguments
+    :param args_optional: Arguments in the function callable that are optional.
+    :param prog: The name of the program, used in help and error messages. Defaults to the name of the callable
+    :param cache_dir: Directory of the on-disk spec cache. See get_spec_from_function
+    :return: The parser
+    """
+    from argParseFromDoc.autoArgparseFunction import get_spec_from_function
+    spec = get_spec_from_function(callable, args_to_ignore=args_to_ignore, args_to_include=args_to_include,
+                                  args_optional=args_optional, cache_dir=cache_dir)
+    return FastParser(spec, prog=prog if prog is not None else getattr(callable, "__name__", None))
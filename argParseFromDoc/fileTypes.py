@@ -0,0 +1,682 @@
+import argparse
+import atexit
+import io
+import os
+import re
+import sys
+import threading
+import typing
+from collections import OrderedDict
+from typing import Optional
+
+DEFAULT_MAX_OPEN_FILES = 256
+
+_max_open_files = None
+
+
+def get_max_open_files() -> int:
+    """
+    :return: The maximum number of LazyFile objects that are open at the same time. Defaults to DEFAULT_MAX_OPEN_FILES
+             or a quarter of the file descriptor limit of the process, whichever is smaller
+    """
+    global _max_open_files
+    if _max_open_files is None:
+        max_open_files = DEFAULT_MAX_OPEN_FILES
+        try:
+            import resource
+            soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+            if soft_limit != resource.RLIM_INFINITY:
+                max_open_files = max(1, min(max_open_files, soft_limit // 4))
+        except (ImportError, OSError, ValueError):
+            pass
+        _max_open_files = max_open_files
+    return _max_open_files
+
+
+def set_max_open_files(max_open_files: int):
+    """
+    Set the budget of LazyFile objects open at the same time. When it is exceeded, the least recently used ones are
+    closed, and they will be reopened where they were on their next use.
+    :param max_open_files: The budget
+    """
+    global _max_open_files
+    assert max_open_files >= 1, "argParseFromDoc: Error, max_open_files should be >= 1"
+    _max_open_files = max_open_files
+    _OPEN_FILES.shrink()
+
+
+class _OpenFiles():
+    """
+    The LazyFile objects that are currently open, from least to most recently used.
+    """
+
+    def __init__(self):
+        self._files = OrderedDict()
+        self._lock = threading.Lock()
+
+    def touch(self, lazy_file: "LazyFile"):
+        with self._lock:
+            if lazy_file in self._files:
+                self._files.move_to_end(lazy_file)
+                return
+            self._files[lazy_file] = None
+        self.shrink()
+
+    def discard(self, lazy_file: "LazyFile"):
+        with self._lock:
+            self._files.pop(lazy_file, None)
+
+    def shrink(self):
+        to_suspend = []
+        with self._lock:
+            n_extra = len(self._files) - get_max_open_files()
+            for lazy_file in self._files:
+                if n_extra <= 0:
+                    break
+                if not lazy_file._n_iterators:  # Files being iterated cannot be reopened at the same position
+                    to_suspend.append(lazy_file)
+                    n_extra -= 1
+            for lazy_file in to_suspend:
+                del self._files[lazy_file]
+        not_suspended = [lazy_file for lazy_file in to_suspend if not lazy_file._suspend()]
+        if not_suspended:
+            with self._lock:
+                for lazy_file in not_suspended:
+                    self._files[lazy_file] = None
+
+    def __len__(self):
+        return len(self._files)
+
+
+_OPEN_FILES = _OpenFiles()
+
+# Full stream headers, so that text files starting with e.g. "BZh" are not taken for compressed files. A bz2 stream
+# starts with BZh, the block size and either the magic of a block or, for empty streams, the end of stream magic
+_MAGIC_NUMBERS = ((re.compile(b"\x1f\x8b\x08"), "gzip"),
+                  (re.compile(b"BZh[1-9](1AY&SY|\x17rE8P\x90)"), "bz2"),
+                  (re.compile(b"\xfd7zXZ\x00"), "xz"))
+_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+_MAX_MAGIC_LEN = 10
+
+
+def get_compression(name: str, header: Optional[bytes] = None) -> Optional[str]:
+    """
+    Detect the compression of a file from its first bytes or, if they are not provided, from its suffix
+    :param name: The path of the file
+    :param header: The first bytes of the file, for files to be read
+    :return: "gzip", "bz2", "xz" or None if it is not compressed
+    """
+    if header is not None:
+        for magic, compression in _MAGIC_NUMBERS:
+            if magic.match(header):
+                return compression
+        return None
+    return _SUFFIXES.get(os.path.splitext(name)[1].lower())
+
+
+def open_file(name, mode: str = "r", bufsize: int = -1, encoding: Optional[str] = None,
+              errors: Optional[str] = None, compression: Optional[str] = None):
+    """
+    Like open(), but gzip, bz2 and xz files are transparently (de)compressed as they are read or written
+    :param name: The path of the file, or a binary file object for compressed files
+    :param mode: The mode, as in open()
+    :param bufsize: The buffering, as in open(). Ignored for compressed files
+    :param encoding: The encoding, as in open()
+    :param errors: The error handling of the encoding, as in open()
+    :param compression: "gzip", "bz2", "xz" or None. See get_compression
+    :return: The file object
+    """
+    if compression is None:
+        return open(name, mode, bufsize, encoding, errors)
+    import importlib
+    module = importlib.import_module({"gzip": "gzip", "bz2": "bz2", "xz": "lzma"}[compression])
+    if "b" not in mode and "t" not in mode:
+        mode += "t"
+    return module.open(name, mode, encoding=encoding, errors=errors)
+
+
+def _sniff_compression(name: str) -> Optional[str]:
+    """
+    The compression of a file to be read, from its first bytes. Only regular files are sniffed: pipes, such as named
+    pipes or process substitutions, cannot be read twice, so their compression is detected from their suffix
+    """
+    import stat
+    try:
+        if not stat.S_ISREG(os.stat(name).st_mode):
+            if not os.access(name, os.R_OK):
+                raise PermissionError("Permission denied")
+            return get_compression(name)
+        with open(name, "rb", 0) as f:
+            return get_compression(name, f.read(_MAX_MAGIC_LEN))
+    except OSError as e:
+        raise argparse.ArgumentTypeError("can't open '%s': %s" % (name, e))
+
+
+def _get_stdin(binary: bool, decompress: bool):
+    """
+    stdin, decompressed if it starts with the magic number of a compression format. Interactive terminals are never
+    peeked, so that parsing does not wait for input
+    """
+    stdin = sys.stdin
+    buffer = getattr(stdin, "buffer", None)
+    if decompress and buffer is not None and hasattr(buffer, "peek") and not stdin.isatty():
+        compression = get_compression("-", buffer.peek(_MAX_MAGIC_LEN)[:_MAX_MAGIC_LEN])
+        if compression is not None:
+            return open_file(buffer, "rb" if binary else "r", compression=compression)
+    return buffer if binary else stdin
+
+
+class LazyFile():
+    """
+    A file that is only opened when it is first used, e.g. on the first read, write or iteration. At most
+    get_max_open_files() of them are open at the same time: the least recently used ones are closed and transparently
+    reopened, at the same position, when they are used again. Files opened for writing are reopened for appending.
+    """
+
+    def __init__(self, name: str, mode: str = "r", bufsize: int = -1, encoding: Optional[str] = None,
+                 errors: Optional[str] = None, compression: Optional[str] = None):
+        """
+        :param name: The path of the file
+        :param mode: The mode, as in open()
+        :param bufsize: The buffering, as in open()
+        :param encoding: The encoding, as in open()
+        :param errors: The error handling of the encoding, as in open()
+        :param compression: "gzip", "bz2", "xz" or None. See get_compression
+        """
+        self.name = name
+        self.mode = mode
+        self.compression = compression
+        self._bufsize = bufsize
+        self._encoding = encoding
+        self._errors = errors
+        self._file = None
+        self._position = None
+        self._closed = False
+        self._n_iterators = 0
+
+    def _get_file(self):
+        if self._file is None:
+            if self._closed:
+                raise ValueError("I/O operation on closed file %s" % self.name)
+            mode = self.mode
+            if self._position is not None and mode[0] in "wx":
+                mode = "a" + mode[1:]  # Reopening must not truncate what was already written
+            self._file = open_file(self.name, mode, self._bufsize, self._encoding, self._errors, self.compression)
+            if self._position is not None and mode[0] not in "a":
+                self._file.seek(self._position)
+        _OPEN_FILES.touch(self)
+        return self._file
+
+    def _suspend(self) -> bool:
+        file = self._file
+        if file is None:
+            return True
+        try:
+            position = file.tell()
+        except (OSError, ValueError):
+            return False  # It stays open, as it could not be reopened at the same position
+        self._position = position
+        self._file = None
+        file.close()
+        return True
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def is_open(self) -> bool:
+        """
+        :return: Whether the file is currently open in the operating system
+        """
+        return self._file is not None
+
+    def close(self):
+        self._closed = True
+        _OPEN_FILES.discard(self)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._get_file(), name)
+
+    def __next__(self):
+        # readline, unlike next, keeps tell() working on text files, so the file can be reopened at the same position
+        line = self._get_file().readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def __iter__(self):
+        file = self._get_file()
+        self._n_iterators += 1
+        try:
+            yield from file
+        finally:
+            self._n_iterators -= 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return "<%s name=%r mode=%r>" % (type(self).__name__, self.name, self.mode)
+
+
+class LazyFileType():
+    """
+    Like argparse.FileType, but the files are LazyFile objects that are only opened when used, so functions can
+    receive very large lists of files. As with argparse.FileType, "-" means stdin or stdout, and files to be read must
+    exist when the arguments are parsed. gzip, bz2 and xz files are transparently decompressed when read (detected by
+    their first bytes, or by their suffix for named pipes) and compressed when written (detected by their .gz, .bz2 or
+    .xz suffix).
+    """
+
+    def __init__(self, mode: str = "r", bufsize: int = -1, encoding: Optional[str] = None,
+                 errors: Optional[str] = None, decompress: bool = True):
+        self._mode = mode
+        self._bufsize = bufsize
+        self._encoding = encoding
+        self._errors = errors
+        self._decompress = decompress
+
+    def __call__(self, string: str):
+        if string == "-":
+            if "r" in self._mode:
+                return _get_stdin("b" in self._mode, self._decompress)
+            elif any(c in self._mode for c in "wax"):
+                return sys.stdout.buffer if "b" in self._mode else sys.stdout
+            raise ValueError("argument \"-\" with mode %r" % self._mode)
+        compression = None
+        if "r" in self._mode and "+" not in self._mode:
+            sniffed = _sniff_compression(string)
+            if self._decompress:
+                compression = sniffed
+        elif self._decompress and "+" not in self._mode:
+            compression = get_compression(string)
+        return LazyFile(string, self._mode, self._bufsize, self._encoding, self._errors, compression)
+
+    def _get_args(self):
+        return (self._mode, self._bufsize, self._encoding, self._errors, self._decompress)
+
+    def __repr__(self):
+        args = [repr(self._mode)]
+        if self._bufsize != -1:
+            args.append("bufsize=%r" % self._bufsize)
+        if self._encoding is not None:
+            args.append("encoding=%r" % self._encoding)
+        if self._errors is not None:
+            args.append("errors=%r" % self._errors)
+        if not self._decompress:
+            args.append("decompress=False")
+        return "%s(%s)" % (type(self).__name__, ", ".join(args))
+
+    def __eq__(self, other):
+        return isinstance(other, LazyFileType) and self._get_args() == other._get_args()
+
+    def __hash__(self):
+        return hash(self._get_args())
+
+
+class MappedFileType():
+    """
+    Map a file read-only into memory, for mmap.mmap and memoryview arguments, so that large binary inputs can be
+    processed without reading them into bytes objects. Inputs that cannot be mapped, such as "-" (stdin) or other
+    pipes, are read into an anonymous memory map, or into a memoryview of bytes. Empty inputs, which cannot be mapped
+    either, are an empty bytes object (or memoryview).
+    """
+
+    def __init__(self, kind: str = "mmap"):
+        """
+        :param kind: "mmap" or "memoryview"
+        """
+        assert kind in ("mmap", "memoryview"), "argParseFromDoc: Error, kind should be mmap or memoryview"
+        self._kind = kind
+
+    def __call__(self, string: str):
+        import mmap
+        import stat
+        if string == "-":
+            return self._from_bytes(sys.stdin.buffer.read())
+        try:
+            with open(string, "rb") as f:
+                st = os.fstat(f.fileno())
+                if not stat.S_ISREG(st.st_mode) or st.st_size == 0:
+                    return self._from_bytes(f.read())
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError as e:
+            raise argparse.ArgumentTypeError("can't open '%s': %s" % (string, e))
+        return mapped if self._kind == "mmap" else memoryview(mapped)
+
+    def _from_bytes(self, data: bytes):
+        if self._kind == "memoryview":
+            return memoryview(data)
+        if not data:
+            return data
+        import mmap
+        mapped = mmap.mmap(-1, len(data))
+        mapped.write(data)
+        mapped.seek(0)
+        return mapped
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, self._kind)
+
+    def __eq__(self, other):
+        return isinstance(other, MappedFileType) and self._kind == other._kind
+
+    def __hash__(self):
+        return hash(self._kind)
+
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def _iter_file(name: str, kind: str, chunk_size: int, encoding: Optional[str], compression: Optional[str]):
+    if name == "-":
+        f = _get_stdin(kind == "chunks", decompress=True)
+    else:
+        f = open_file(name, "r" if kind == "lines" else "rb", encoding=encoding, compression=compression)
+    try:
+        if kind == "lines":
+            yield from f
+        else:
+            read = f.read
+            chunk = read(chunk_size)
+            while chunk:
+                yield chunk
+                chunk = read(chunk_size)
+    finally:
+        if name != "-":
+            f.close()
+
+
+class FileIteratorType():
+    """
+    For Iterator[str] and Iterator[bytes] arguments: a lazy generator over the lines (with their line endings) or the
+    chunks of chunk_size bytes of a file, or of stdin for "-". The file is only opened when the iteration starts and
+    closed when it finishes, so memory stays flat for arbitrarily large inputs. gzip, bz2 and xz inputs are
+    decompressed on the fly.
+    """
+
+    def __init__(self, kind: str = "lines", chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: Optional[str] = None):
+        """
+        :param kind: "lines" or "chunks"
+        :param chunk_size: The size in bytes of the chunks
+        :param encoding: The encoding of the lines, as in open()
+        """
+        assert kind in ("lines", "chunks"), "argParseFromDoc: Error, kind should be lines or chunks"
+        self._kind = kind
+        self._chunk_size = chunk_size
+        self._encoding = encoding
+
+    def __call__(self, string: str):
+        compression = None
+        if string != "-":
+            compression = _sniff_compression(string)
+        return _iter_file(string, self._kind, self._chunk_size, self._encoding, compression)
+
+    def _get_args(self):
+        return (self._kind, self._chunk_size, self._encoding)
+
+    def __repr__(self):
+        args = [repr(self._kind)]
+        if self._chunk_size != DEFAULT_CHUNK_SIZE:
+            args.append("chunk_size=%r" % self._chunk_size)
+        if self._encoding is not None:
+            args.append("encoding=%r" % self._encoding)
+        return "%s(%s)" % (type(self).__name__, ", ".join(args))
+
+    def __eq__(self, other):
+        return isinstance(other, FileIteratorType) and self._get_args() == other._get_args()
+
+    def __hash__(self):
+        return hash(self._get_args())
+
+
+class NumpyFileType():
+    """
+    For numpy.ndarray arguments: the argument is the path of a .npy file, which is memory mapped (or loaded, see
+    mmap_mode) or of a .npz file, which is received as a numpy NpzFile, whose arrays are only read when they are
+    accessed by key. "-" reads a .npy or .npz file from stdin. numpy is only imported when an argument is converted.
+    """
+
+    def __init__(self, mmap_mode: Optional[str] = "r"):
+        """
+        :param mmap_mode: The mmap_mode of numpy.load for .npy files, or None to load them in memory
+        """
+        self._mmap_mode = mmap_mode
+
+    def __call__(self, string: str):
+        import numpy  # Imported here, as only ndarray arguments need it
+        try:
+            if string == "-":
+                return numpy.load(io.BytesIO(sys.stdin.buffer.read()), allow_pickle=False)
+            return numpy.load(string, mmap_mode=self._mmap_mode, allow_pickle=False)
+        except (OSError, ValueError) as e:
+            raise argparse.ArgumentTypeError("can't open '%s': %s" % (string, e))
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__, "" if self._mmap_mode == "r" else "mmap_mode=%r" % self._mmap_mode)
+
+    def __eq__(self, other):
+        return isinstance(other, NumpyFileType) and self._mmap_mode == other._mmap_mode
+
+    def __hash__(self):
+        return hash(self._mmap_mode)
+
+
+DEFAULT_OUTPUT_BUFFER_SIZE = 1 << 20
+_OUTPUT_BUFFER_SIZE = DEFAULT_OUTPUT_BUFFER_SIZE
+
+
+def set_output_buffer_size(bufsize: int):
+    """
+    Set the size of the write buffer of the OutputFile and BinaryOutputFile arguments
+    :param bufsize: The size in bytes
+    """
+    global _OUTPUT_BUFFER_SIZE
+    assert bufsize > 0, "argParseFromDoc: Error, bufsize should be > 0"
+    _OUTPUT_BUFFER_SIZE = bufsize
+
+
+class OutputFile(typing.TextIO):
+    """
+    Annotation for text output files, e.g. def fun(out: OutputFile). The function receives an AtomicOutputFile
+    """
+    pass
+
+
+class BinaryOutputFile(typing.BinaryIO):
+    """
+    Annotation for binary output files, e.g. def fun(out: BinaryOutputFile). The function receives an
+    AtomicOutputFile
+    """
+    pass
+
+
+# The AtomicOutputFile objects with a temporary file that were not committed or discarded yet
+_PENDING_OUTPUT_FILES = set()
+
+
+def _finalize_pending_output_files():
+    """
+    At exit, commit the AtomicOutputFile objects that were not committed, e.g. when the function was called directly
+    with the arguments of a parser, or discard them if the program ended with an uncaught exception
+    """
+    success = getattr(sys, "last_value", None) is None
+    for output_file in list(_PENDING_OUTPUT_FILES):
+        if success:
+            output_file.commit()
+        else:
+            output_file.discard()
+
+
+atexit.register(_finalize_pending_output_files)
+
+
+class AtomicOutputFile():
+    """
+    An output file that is written to a temporary file in the same directory, with a large buffer, and renamed to its
+    final name only when it is committed, so readers never see partial outputs. parse_function_and_call and the other
+    entry points commit it when the function returns and discard it when the function raises. It can also be used as
+    a context manager, and close() commits it. Files that are still pending when the interpreter exits are committed,
+    or discarded if the program ended with an uncaught exception, but code that calls the function itself with the
+    parsed arguments should call close() or commit() when it is done. Files ending with .gz, .bz2 or .xz are
+    compressed.
+    """
+
+    def __init__(self, name: str, mode: str = "w", bufsize: Optional[int] = None, encoding: Optional[str] = None,
+                 errors: Optional[str] = None):
+        """
+        :param name: The final path of the file
+        :param mode: "w" or "wb"
+        :param bufsize: The size of the write buffer. See set_output_buffer_size
+        :param encoding: The encoding, as in open()
+        :param errors: The error handling of the encoding, as in open()
+        """
+        self.name = name
+        self.mode = mode
+        self._bufsize = bufsize if bufsize is not None else _OUTPUT_BUFFER_SIZE
+        self._encoding = encoding
+        self._errors = errors
+        self._file = None
+        self._tmp_name = None
+        self._done = False
+
+    def _get_file(self):
+        if self._file is None:
+            if self._done:
+                raise ValueError("I/O operation on closed file %s" % self.name)
+            import secrets
+            dirname, basename = os.path.split(self.name)
+            self._tmp_name = os.path.join(dirname, ".%s.%s.tmp" % (basename, secrets.token_hex(4)))
+            # os.open applies the umask, as open() does for the final file
+            fd = os.open(self._tmp_name, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+            raw = open(fd, "wb", buffering=self._bufsize)
+            compression = get_compression(self.name)
+            if compression is not None:
+                self._file = open_file(raw, self.mode, compression=compression, encoding=self._encoding,
+                                       errors=self._errors)
+                self._raw = raw
+            else:
+                self._file = raw if "b" in self.mode else \
+                    io.TextIOWrapper(raw, encoding=self._encoding, errors=self._errors, write_through=False)
+                self._raw = None
+            _PENDING_OUTPUT_FILES.add(self)
+        return self._file
+
+    def commit(self):
+        """
+        Flush the file and rename it to its final name. Files that were never written are created empty
+        """
+        if self._done:
+            return
+        self._get_file()
+        self._close_files()
+        self._done = True
+        _PENDING_OUTPUT_FILES.discard(self)
+        os.replace(self._tmp_name, self.name)
+
+    def discard(self):
+        """
+        Remove the temporary file. The final file is left untouched
+        """
+        if self._done:
+            return
+        self._done = True
+        _PENDING_OUTPUT_FILES.discard(self)
+        if self._file is not None:
+            try:
+                self._close_files()
+            finally:
+                os.unlink(self._tmp_name)
+
+    def _close_files(self):
+        self._file.close()
+        if self._raw is not None:
+            self._raw.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._done
+
+    def close(self):
+        self.commit()
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._get_file(), name)
+
+    def __iter__(self):
+        return iter(self._get_file())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    def __repr__(self):
+        return "<%s name=%r mode=%r>" % (type(self).__name__, self.name, self.mode)
+
+
+class AtomicOutputFileType():
+    """
+    For OutputFile and BinaryOutputFile arguments. See AtomicOutputFile. "-" means stdout.
+    """
+
+    def __init__(self, mode: str = "w", bufsize: Optional[int] = None, encoding: Optional[str] = None,
+                 errors: Optional[str] = None):
+        self._mode = mode
+        self._bufsize = bufsize
+        self._encoding = encoding
+        self._errors = errors
+
+    def __call__(self, string: str):
+        if string == "-":
+            return sys.stdout.buffer if "b" in self._mode else sys.stdout
+        dirname = os.path.dirname(string) or "."
+        if not os.path.isdir(dirname):
+            raise argparse.ArgumentTypeError("can't open '%s': directory %s does not exist" % (string, dirname))
+        return AtomicOutputFile(string, self._mode, self._bufsize, self._encoding, self._errors)
+
+    def _get_args(self):
+        return (self._mode, self._bufsize, self._encoding, self._errors)
+
+    def __repr__(self):
+        args = [repr(self._mode)]
+        for name, value in zip(["bufsize", "encoding", "errors"], self._get_args()[1:]):
+            if value is not None:
+                args.append("%s=%r" % (name, value))
+        return "%s(%s)" % (type(self).__name__, ", ".join(args))
+
+    def __eq__(self, other):
+        return isinstance(other, AtomicOutputFileType) and self._get_args() == other._get_args()
+
+    def __hash__(self):
+        return hash(self._get_args())
+
+
+def finalize_output_files(kwargs: dict, success: bool):
+    """
+    Commit or discard the AtomicOutputFile arguments of a function call
+    :param kwargs: The arguments of the function
+    :param success: True to commit the files, False to discard them
+    """
+    for value in kwargs.values():
+        for output_file in (value if isinstance(value, list) else (value,)):
+            if isinstance(output_file, AtomicOutputFile):
+                if success:
+                    output_file.commit()
+                else:
+                    output_file.discard()
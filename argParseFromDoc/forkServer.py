@@ -0,0 +1,243 @@
+"""
+A fork server: a process that imports a script or a module once, and then runs each job in a forked child, as
+"python script.py args" or "python -m module args" would, but without paying the start up and import time per job.
+See ForkServer. The server process is started with: python -m argParseFromDoc.forkServer (path.py | -m module)
+"""
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+_READY = {"ready": True}
+
+
+def _get_exit_code(code) -> int:
+    # As the interpreter does for SystemExit
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _run_target(target: str, use_module: bool, args: List[str]):
+    import runpy
+    sys.argv = [target] + args
+    if use_module:
+        # Otherwise runpy warns that the preloaded module was already imported. Its imports stay preloaded
+        sys.modules.pop(target, None)
+        runpy.run_module(target, run_name="__main__", alter_sys=True)
+    else:
+        runpy.run_path(target, run_name="__main__")
+
+
+def _preload(target: str, use_module: bool):
+    # The modules of parse_function_and_call are imported lazily by the scripts, so they are preloaded too
+    import argParseFromDoc.AutoArgumentParser
+    import argParseFromDoc.autoArgparseFunction
+    if use_module:
+        import importlib
+        importlib.import_module(target)
+    else:
+        # The imports of the script are cached in sys.modules. Its __main__ block is not run
+        sys.path.insert(0, os.path.dirname(os.path.abspath(target)))
+        import runpy
+        runpy.run_path(target, run_name="__argParseFromDoc_preload__")
+
+
+def _redirect(fd: int, path: Optional[str]):
+    target_fd = os.open(path if path else os.devnull, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    os.dup2(target_fd, fd)
+    os.close(target_fd)
+
+
+def _fork_job(target: str, use_module: bool, request: dict, fds_to_close: Tuple[int, ...]) -> int:
+    pid = os.fork()
+    if pid != 0:
+        return pid
+    code = 1
+    try:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for fd in fds_to_close:
+            os.close(fd)
+        _redirect(1, request.get("stdout"))
+        _redirect(2, request.get("stderr"))
+        try:
+            _run_target(target, use_module, request["args"])
+            code = 0
+        except SystemExit as e:
+            code = _get_exit_code(e.code)
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def _serve(target: str, use_module: bool):
+    # The protocol uses the original stdin and stdout. The jobs get /dev/null as stdin, and stdout goes to stderr
+    requests_fd, results_fd = os.dup(0), os.dup(1)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    os.dup2(2, 1)
+    _preload(target, use_module)
+    os.write(results_fd, (json.dumps(_READY) + "\n").encode())
+
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_r, False)
+    os.set_blocking(wake_w, False)
+    signal.set_wakeup_fd(wake_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    fds_to_close = (requests_fd, results_fd, wake_r, wake_w)
+
+    children = {}  # pid -> job id
+    buffer = b""
+    eof = False
+    while not eof or children:
+        readable = select.select([wake_r] if eof else [requests_fd, wake_r], [], [], 1.0)[0]
+        if wake_r in readable:
+            while True:
+                try:
+                    if not os.read(wake_r, 4096):
+                        break
+                except BlockingIOError:
+                    break
+        while children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            job_id = children.pop(pid, None)
+            if job_id is not None:
+                result = dict(id=job_id, returncode=os.waitstatus_to_exitcode(status))
+                os.write(results_fd, (json.dumps(result) + "\n").encode())
+        if requests_fd in readable:
+            data = os.read(requests_fd, 1 << 16)
+            eof = not data
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                request = json.loads(line)
+                if "kill" in request:
+                    for pid, job_id in children.items():
+                        if job_id == request["kill"]:
+                            os.kill(pid, signal.SIGKILL)
+                else:
+                    children[_fork_job(target, use_module, request, fds_to_close)] = request["id"]
+
+
+class ForkServer():
+    """
+    Runs the commands of a python script or module, as generated by CommandGenerator or iter_sweep_commands, in
+    children forked from a server process that has already imported it. Each job goes through the same code path as
+    "python script.py args" (usually parse_function_and_call), in its own process, but the interpreter start up and the
+    imports of the script are only paid once. Only for platforms with os.fork (i.e. not Windows). As with any fork,
+    the script should not start threads or open connections at import time.
+    """
+
+    def __init__(self, target: str, use_module: bool = False, python_executable: str = sys.executable):
+        """
+        :param target: The path of the script or, if use_module, the name of the module
+        :param use_module: If True, the jobs are run as python -m target
+        :param python_executable: The python executable of the server process
+        """
+        assert hasattr(os, "fork"), "argParseFromDoc: Error, a ForkServer needs os.fork, which is not available"
+        self.target = target
+        self.use_module = use_module
+        self._lock = threading.Lock()
+        self._results: Dict[int, list] = {}
+        self._next_id = 0
+        command = [python_executable, "-m", "argParseFromDoc.forkServer"] + (["-m"] if use_module else []) + [target]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        ready = self._process.stdout.readline()
+        if not ready or json.loads(ready) != _READY:
+            self._process.wait()
+            raise RuntimeError("argParseFromDoc: Error, the fork server could not import %s" % target)
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+
+    def _read_results(self):
+        for line in self._process.stdout:
+            result = json.loads(line)
+            with self._lock:
+                event_result = self._results[result["id"]]
+            event_result[1] = result["returncode"]
+            event_result[0].set()
+        with self._lock:  # The server died. Release the jobs that are waiting
+            for event_result in self._results.values():
+                event_result[0].set()
+
+    def get_function_args(self, argv: List[str]) -> Optional[List[str]]:
+        """
+        :param argv: A command, e.g. ["python", "script.py", "--a", "1"]
+        :return: The arguments after the script (e.g. ["--a", "1"]), or None if the command does not run the target of
+                 this server
+        """
+        if self.use_module:
+            return argv[3:] if argv[1:3] == ["-m", self.target] else None
+        return argv[2:] if len(argv) >= 2 and os.path.abspath(argv[1]) == os.path.abspath(self.target) else None
+
+    def _send(self, request: dict):
+        with self._lock:
+            self._process.stdin.write((json.dumps(request) + "\n").encode())
+            self._process.stdin.flush()
+
+    def run(self, args: List[str], stdout: Optional[str] = None, stderr: Optional[str] = None,
+            timeout: Optional[float] = None) -> int:
+        """
+        Run a job. It can be called from several threads at the same time
+
+        :param args: The arguments of the script, e.g. ["--a", "1"]
+        :param stdout: The file where the stdout of the job is written, or None to discard it
+        :param stderr: The file where the stderr of the job is written, or None to discard it
+        :param timeout: If the job takes longer, it is killed and subprocess.TimeoutExpired is raised
+        :return: The exit code of the job, negative if it was killed by a signal, as subprocess does
+        """
+        event_result = [threading.Event(), None]
+        with self._lock:
+            job_id = self._next_id
+            self._next_id += 1
+            self._results[job_id] = event_result
+        try:
+            self._send(dict(id=job_id, args=[str(arg) for arg in args], stdout=stdout, stderr=stderr))
+            if not event_result[0].wait(timeout):
+                self._send(dict(kill=job_id))
+                event_result[0].wait()
+                raise subprocess.TimeoutExpired([self.target] + list(args), timeout)
+        finally:
+            with self._lock:
+                del self._results[job_id]
+        if event_result[1] is None:
+            raise RuntimeError("argParseFromDoc: Error, the fork server of %s died" % self.target)
+        return event_result[1]
+
+    def close(self):
+        """
+        Stop the server, after the running jobs finish
+        """
+        if self._process.poll() is None:
+            self._process.stdin.close()
+            self._process.wait()
+        self._process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+if __name__ == "__main__":
+    _use_module = sys.argv[1] == "-m"
+    _serve(sys.argv[-1], _use_module)
@@ -1,9 +1,44 @@
-import argparse
-import inspect
 import typing
 from collections import OrderedDict
 
-from typing import Callable, List, Optional, _GenericAlias
+from typing import Any, Callable, List, NamedTuple, Optional, _GenericAlias
+
+
+class ArgSpec(NamedTuple):
+    """
+    Everything needed to add one argument of a documented function to a parser, without introspecting it again.
+    """
+    name: str
+    typeFun: Any
+    nargs: Optional[str]
+    default: Any
+    help: str
+    required: bool
+
+
+MAX_HELP_DEFAULT_ITEMS = 10
+
+
+class HelpWithDefault(str):
+    """
+    A help string with a %(default)s placeholder. The default value is only formatted when the help is displayed,
+    and long lists, tuples or sets are truncated to MAX_HELP_DEFAULT_ITEMS items.
+    """
+    def __mod__(self, params):
+        default = params.get("default") if isinstance(params, dict) else None
+        if isinstance(default, (list, tuple, set, frozenset)) and len(default) > MAX_HELP_DEFAULT_ITEMS:
+            params = dict(params, default=_truncated_repr(default))
+        return str.__mod__(self, params)
+
+
+def _truncated_repr(values) -> str:
+    brackets = {list: "[]", tuple: "()"}.get(type(values), "{}")
+    items = []
+    for i, value in enumerate(values):
+        if i == MAX_HELP_DEFAULT_ITEMS:
+            break
+        items.append(repr(value))
+    return "%s%s, ...%s (%d items)" % (brackets[0], ", ".join(items), brackets[1], len(values))
 
 
 def _get_type_nargs_default_required_dict(callable: Callable, args_to_ignore: List[str], args_to_include: Optional[List[str]] = None):
@@ -14,6 +49,7 @@ def _get_type_nargs_default_required_dict(callable: Callable, args_to_ignore: Li
     :param args_to_include: If provided, only the arguments in this list will be considered
     :return:
     """
+    import inspect  # Imported here, as it is not needed if the spec is cached
     signature = inspect.signature(callable)
     name_to_type_nargs_default_required = OrderedDict()
     n_args = len(signature.parameters.items())
@@ -63,6 +99,16 @@ def fromTypeToTypeFun(typeHint):
                 assert valid, "Error, Union[XXX,None] is a valid option, but None was not present"
                 required = False
 
+    from argParseFromDoc.compactArrays import get_compact_array_type
+    compact_array_type = get_compact_array_type(hintType, typeHint.default)
+    if compact_array_type is not None:
+        return compact_array_type, "+", required
+
+    if getattr(hintType, "__module__", None) == "numpy" and getattr(hintType, "__name__", None) == "ndarray":
+        # A bare numpy.ndarray is loaded from a .npy/.npz file. numpy itself is not imported
+        from argParseFromDoc.fileTypes import NumpyFileType
+        return NumpyFileType(), nargs, required
+
     if isinstance(hintType, _GenericAlias):
         complex_type = hintType._name
         if complex_type == "Literal" or complex_type is None: #Union type, or Literal type, depending on the version
@@ -71,6 +117,9 @@ def fromTypeToTypeFun(typeHint):
                 return _type, nargs, required
             raise ValueError("Error, only Optional, Union and Literal type hints supported")
 
+    file_iterator_type = _get_file_iterator_type(hintType)
+    if file_iterator_type is not None:
+        return file_iterator_type, nargs, required
 
     if isinstance(hintType, _GenericAlias):
         complex_type = hintType._name
@@ -90,6 +139,28 @@ def fromTypeToTypeFun(typeHint):
     return _type, nargs, required
 
 
+def _get_file_iterator_type(hintType):
+    """
+    Check whether a type hint is Iterator[str] (the lines of a file), Iterator[bytes] (the chunks of a file) or
+    Iterator[Path] (the files matched by a glob pattern or in a directory)
+    :param hintType: The type hint
+    :return: A FileIteratorType or a PathPatternType, or None if hintType is not an Iterator
+    """
+    import collections.abc
+    import pathlib
+    if getattr(hintType, "__origin__", None) not in (collections.abc.Iterator, collections.abc.Iterable):
+        return None
+    inner_args = hintType.__args__
+    assert len(inner_args) == 1 and inner_args[0] in (str, bytes, pathlib.Path), \
+        "argParseFromDoc: Error, only Iterator[str] (lines), Iterator[bytes] (chunks) or Iterator[Path] (files) are " \
+        "supported, not %s" % hintType
+    if inner_args[0] is pathlib.Path:
+        from argParseFromDoc.pathPatterns import PathPatternType
+        return PathPatternType()
+    from argParseFromDoc.fileTypes import FileIteratorType
+    return FileIteratorType("lines" if inner_args[0] is str else "chunks")
+
+
 def _get_type_from_str(strType):
     _type = None
     if strType == "str":
@@ -101,9 +172,17 @@ def _get_type_from_str(strType):
     elif strType == "bool":
         _type = bool
     elif strType == "TextIO":
-        _type = argparse.FileType('r')
+        from argParseFromDoc.fileTypes import LazyFileType
+        _type = LazyFileType('r')
     elif strType == "BinaryIO":
-        _type = argparse.FileType('rb')
+        from argParseFromDoc.fileTypes import LazyFileType
+        _type = LazyFileType('rb')
+    elif strType in ("OutputFile", "BinaryOutputFile"):
+        from argParseFromDoc.fileTypes import AtomicOutputFileType
+        _type = AtomicOutputFileType('w' if strType == "OutputFile" else 'wb')
+    elif strType in ("mmap", "memoryview"):
+        from argParseFromDoc.fileTypes import MappedFileType
+        _type = MappedFileType(strType)
     elif isinstance(strType, str) and strType.startswith("list of"):
         _type = List[_get_type_from_str(strType.replace("list of", "").strip())]
     return _type
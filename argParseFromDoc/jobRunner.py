@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Set, TextIO, Union
+
+
+class JobResult(NamedTuple):
+    index: int
+    argv: List[str]
+    returncode: Optional[int]
+    attempts: int
+    duration: float
+    error: Optional[str]
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+class JobRunSummary(NamedTuple):
+    n_ok: int
+    n_failed: int
+    n_skipped: int
+    duration: float
+
+
+def get_job_key(argv: List[str]) -> str:
+    """
+    :param argv: The command of a job
+    :return: The key of the job in the journal. It only depends on the command, so it is the same if the list of jobs
+             is generated again in a different order
+    """
+    return hashlib.sha1("\0".join(argv).encode("utf-8", "surrogateescape")).hexdigest()
+
+
+def read_job_file(job_file: Union[str, TextIO]) -> Iterator[List[str]]:
+    """
+    Lazily read the jobs of a job file, such as the ones written by write_sweep_commands: one command per line, or
+    one json list with the command per line. Empty lines and lines starting with # are skipped
+
+    :param job_file: The file name, "-" for stdin, or an opened file
+    :return: A generator of commands
+    """
+    f = sys.stdin if job_file == "-" else (open(job_file) if isinstance(job_file, str) else job_file)
+    try:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            yield json.loads(line) if line.startswith("[") else shlex.split(line)
+    finally:
+        if f is not job_file and f is not sys.stdin:
+            f.close()
+
+
+def read_journal(journal: str) -> Set[str]:
+    """
+    :param journal: The journal file of a previous run
+    :return: The keys of the jobs that succeeded. See get_job_key
+    """
+    completed = set()
+    if not os.path.exists(journal):
+        return completed
+    with open(journal) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # The last line may be truncated if the previous run was killed
+            if entry.get("ok"):
+                completed.add(entry["key"])
+    return completed
+
+
+def _run_subprocess(argv: List[str], stdout: Optional[str], stderr: Optional[str], timeout: Optional[float]) -> int:
+    out_file = err_file = subprocess.DEVNULL
+    try:
+        if stdout is not None:
+            out_file = open(stdout, "wb")
+        if stderr is not None:
+            err_file = open(stderr, "wb")
+        return subprocess.run(argv, stdin=subprocess.DEVNULL, stdout=out_file, stderr=err_file,
+                              timeout=timeout).returncode
+    finally:
+        for f in (out_file, err_file):
+            if f is not subprocess.DEVNULL:
+                f.close()
+
+
+def _run_job(index: int, argv: List[str], timeout: Optional[float], retries: int, backoff: float,
+             log_dir: Optional[str], stop: threading.Event, fork_server=None) -> JobResult:
+    start = time.perf_counter()
+    returncode = error = None
+    stdout = stderr = None
+    if log_dir is not None:
+        stdout, stderr = os.path.join(log_dir, "%d.out" % index), os.path.join(log_dir, "%d.err" % index)
+    function_args = fork_server.get_function_args(argv) if fork_server is not None else None
+    attempt = 0
+    for attempt in range(1, retries + 2):
+        if attempt > 1:
+            if stop.wait(backoff * 2 ** (attempt - 2)):
+                break
+        try:
+            if function_args is not None:
+                returncode = fork_server.run(function_args, stdout, stderr, timeout)
+            else:
+                returncode = _run_subprocess(argv, stdout, stderr, timeout)
+            error = None if returncode == 0 else "exit status %d" % returncode
+        except subprocess.TimeoutExpired:
+            returncode, error = None, "timeout after %ss" % timeout
+        except (OSError, RuntimeError) as e:
+            returncode, error = None, "%s: %s" % (type(e).__name__, e)
+        if returncode == 0:
+            break
+    return JobResult(index, argv, returncode, attempt, time.perf_counter() - start, error)
+
+
+class _Progress():
+
+    def __init__(self, stream: Optional[TextIO], interval: float, total: Optional[int]):
+        self._stream = stream
+        self.interval = interval
+        self._total = total
+        self.start = self._last = time.perf_counter()
+        self.counts = [0, 0, 0]  # ok, failed, skipped
+
+    def update(self, force: bool = False):
+        now = time.perf_counter()
+        if self._stream is None or (not force and now - self._last < self.interval):
+            return
+        self._last = now
+        n_ok, n_failed, n_skipped = self.counts
+        done = n_ok + n_failed
+        total = "" if self._total is None else "/%d" % (self._total - n_skipped)
+        self._stream.write("argParseFromDoc: %d%s jobs done, %d failed, %d skipped, %.1f jobs/s\n" %
+                           (done, total, n_failed, n_skipped, done / max(now - self.start, 1e-9)))
+        self._stream.flush()
+
+
+def run_jobs(jobs: Iterable[Union[str, List[str]]], n_workers: Optional[int] = None, timeout: Optional[float] = None,
+             retries: int = 0, backoff: float = 1.0, log_dir: Optional[str] = None, journal: Optional[str] = None,
+             progress: Optional[TextIO] = sys.stderr, progress_interval: float = 10.,
+             fork_server=None) -> JobRunSummary:
+    """
+    Run commands, such as the ones generated by iter_sweep_commands, in a pool of n_workers concurrent processes.
+    Commands are run without a shell and jobs are consumed lazily, with a bounded number of them in flight, so jobs
+    can be a long generator.
+
+    :param jobs: The commands. Either lists with the argv (e.g. ["python", "script.py", "--a", "1"]), as yielded by
+                 iter_sweep_commands(..., as_argv=True), or strings, which are split with shlex.split
+    :param n_workers: The number of jobs running at the same time. Defaults to the number of cpus
+    :param timeout: The maximum number of seconds per attempt of a job. Jobs that take longer are killed
+    :param retries: The number of times failed jobs are run again
+    :param backoff: The seconds to wait before the first retry. Each retry waits twice as long as the previous one
+    :param log_dir: If provided, the stdout and the stderr of the job with index i are written to log_dir/i.out and
+                    log_dir/i.err. Otherwise, they are discarded
+    :param journal: If provided, a json line is appended to this file when each job finishes. Jobs that succeeded
+                    according to the journal are skipped, so an interrupted run can be resumed by running it again
+    :param progress: Where progress and throughput are reported every progress_interval seconds, or None
+    :param progress_interval: The seconds between progress reports
+    :param fork_server: An argParseFromDoc.forkServer.ForkServer. The jobs that run its script or module are run in a
+                        child forked from it, instead of in a new python process
+    :return: The number of jobs that succeeded, failed and were skipped, and the total time
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    assert n_workers >= 1, "argParseFromDoc: Error, n_workers should be >= 1"
+    assert retries >= 0, "argParseFromDoc: Error, retries should be >= 0"
+    completed = read_journal(journal) if journal is not None else set()
+    if log_dir is not None:
+        os.makedirs(log_dir, exist_ok=True)
+    status = _Progress(progress, progress_interval, len(jobs) if hasattr(jobs, "__len__") else None)
+    journal_file = open(journal, "a") if journal is not None else None
+    stop = threading.Event()
+    in_flight = {}
+    try:
+        with ThreadPoolExecutor(n_workers) as executor:
+            try:
+                for index, argv in enumerate(jobs):
+                    argv = shlex.split(argv) if isinstance(argv, str) else [str(arg) for arg in argv]
+                    key = get_job_key(argv)
+                    if key in completed:
+                        status.counts[2] += 1
+                        continue
+                    # _collect_results returns every progress_interval, even if no job finished
+                    while len(in_flight) >= 2 * n_workers:
+                        _collect_results(in_flight, status, journal_file)
+                    in_flight[executor.submit(_run_job, index, argv, timeout, retries, backoff, log_dir, stop,
+                                              fork_server)] = key
+                while in_flight:
+                    _collect_results(in_flight, status, journal_file)
+            except BaseException:
+                # Before the pool waits for its threads: jobs that did not start are cancelled and pending retries
+                # are abandoned. Only the attempts already running are waited for
+                stop.set()
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        if journal_file is not None:
+            journal_file.close()
+    status.update(force=True)
+    return JobRunSummary(status.counts[0], status.counts[1], status.counts[2],
+                         time.perf_counter() - status.start)
+
+
+def _collect_results(in_flight: dict, status: _Progress, journal_file: Optional[TextIO]):
+    done, _ = wait(in_flight, timeout=status.interval, return_when=FIRST_COMPLETED)
+    for future in done:
+        key = in_flight.pop(future)
+        result = future.result()
+        status.counts[0 if result.ok else 1] += 1
+        if journal_file is not None:
+            journal_file.write(json.dumps(dict(key=key, index=result.index, ok=result.ok,
+                                               returncode=result.returncode, attempts=result.attempts,
+                                               duration=round(result.duration, 3), error=result.error,
+                                               argv=result.argv)) + "\n")
+            journal_file.flush()
+    status.update()
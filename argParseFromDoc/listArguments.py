@@ -0,0 +1,114 @@
+import argparse
+from itertools import islice
+from typing import Callable, List, Optional, Sequence
+
+LONG_RUN_MIN_ITEMS = 64
+
+
+class ValueRun(str):
+    """
+    A run of consecutive values of a list argument, collapsed into a single command line token so that argparse
+    handles it as one value. See collapse_value_runs
+    """
+
+    def __new__(cls, values: List[str]):
+        run = super().__new__(cls, "<%d values>" % len(values))
+        run.values = values
+        return run
+
+
+def expand_values(values: Sequence[str]) -> List[str]:
+    """
+    Undo collapse_value_runs for the values received by an action
+    :param values: The values, which may contain ValueRun tokens
+    :return: The list of command line strings
+    """
+    if len(values) == 1 and isinstance(values[0], ValueRun):
+        return values[0].values
+    expanded = []
+    for value in values:
+        if isinstance(value, ValueRun):
+            expanded.extend(value.values)
+        else:
+            expanded.append(value)
+    return expanded
+
+
+class ListAction(argparse.Action):
+    """
+    Stores the values of a nargs="+" argument as a list, converting all of them at once with item_type instead of
+    one argparse type call per value. Errors are reported as argparse does.
+    """
+
+    def __init__(self, option_strings, dest, item_type: Optional[Callable] = None, **kwargs):
+        super().__init__(option_strings, dest, **kwargs)
+        self.item_type = item_type
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        values = expand_values(values)
+        if self.item_type is not None and self.item_type is not str:
+            try:
+                values = list(map(self.item_type, values))
+            except (argparse.ArgumentTypeError, TypeError, ValueError):
+                values = [self._convert(value) for value in values]  # Find the wrong value to report it
+        setattr(namespace, self.dest, values)
+
+    def _convert(self, value: str):
+        try:
+            return self.item_type(value)
+        except argparse.ArgumentTypeError as e:
+            raise argparse.ArgumentError(self, str(e))
+        except (TypeError, ValueError):
+            name = getattr(self.item_type, "__name__", repr(self.item_type))
+            raise argparse.ArgumentError(self, "invalid %s value: %r" % (name, value))
+
+
+def _find_run_end(args: List[str], start: int, is_value: Callable) -> int:
+    for i, arg in enumerate(islice(args, start, None), start):
+        if arg[:1] == "-" and not is_value(arg):
+            return i
+    return len(args)
+
+
+def collapse_value_runs(parser: argparse.ArgumentParser, args: List[str],
+                        min_items: int = LONG_RUN_MIN_ITEMS) -> List[str]:
+    """
+    Replace the long runs of values that follow the option string of a ListAction or CompactArrayAction with a single
+    ValueRun token. argparse then needs a constant amount of work per run, instead of classifying, converting and
+    checking every value. The command line is scanned once, so the cost is linear in its length.
+
+    :param parser: The parser. Nothing is collapsed if it uses other prefix chars than "-", options that look like
+                   negative numbers or positional arguments, as argparse would then split the values differently
+    :param args: The command line arguments
+    :param min_items: Runs with less values are kept as they are
+    :return: The new command line arguments
+    """
+    from argParseFromDoc.compactArrays import CompactArrayAction
+    if parser.prefix_chars != "-" or parser._has_negative_number_optionals or \
+            any(not action.option_strings for action in parser._actions):
+        return args
+    list_options = {option_string for option_string, action in parser._option_string_actions.items()
+                    if isinstance(action, (ListAction, CompactArrayAction)) and action.nargs == "+"}
+    if not list_options:
+        return args
+    # Only imported once there is something to collapse, to keep the start up of the other parsers fast
+    from argParseFromDoc.fastParser import FastParser
+    is_value = FastParser._is_value
+    collapsed = []
+    i = 0
+    n_args = len(args)
+    while i < n_args:
+        arg = args[i]
+        i += 1
+        collapsed.append(arg)
+        if arg == "--":
+            collapsed.extend(args[i:])
+            break
+        if arg in list_options:
+            start = i
+            i = _find_run_end(args, start, is_value)
+            if i - start >= min_items:
+                collapsed.append(ValueRun(args[start:i]))
+            else:
+                collapsed.extend(args[start:i])
+    return collapsed
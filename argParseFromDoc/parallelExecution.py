@@ -0,0 +1,132 @@
+import os
+import pickle
+from collections import deque
+from typing import Callable, Iterable, Iterator, List, Optional, Union
+
+from argParseFromDoc.batchExecution import BatchResult
+
+# Set in each worker process by _init_worker: (callable, parser, args_to_ignore, args_to_include, args_optional)
+_WORKER_STATE = None
+
+
+def _init_worker(callable: Callable, pickled_spec: Optional[bytes], args_to_ignore: Optional[List[str]],
+                 args_to_include: Optional[List[str]], args_optional: Optional[List[str]],
+                 cache_dir: Optional[str]):
+    global _WORKER_STATE
+    from argParseFromDoc.batchExecution import _BatchArgumentParser
+    from argParseFromDoc.fastParser import FastParser
+    if pickled_spec is not None:
+        spec = pickle.loads(pickled_spec)
+    else:
+        from argParseFromDoc.autoArgparseFunction import get_spec_from_function
+        spec = get_spec_from_function(callable, args_to_ignore=args_to_ignore, args_to_include=args_to_include,
+                                      args_optional=args_optional, cache_dir=cache_dir)
+    parser = FastParser(spec, prog=getattr(callable, "__name__", None), fallback_parser_class=_BatchArgumentParser)
+    _WORKER_STATE = (callable, parser, args_to_ignore, args_to_include, args_optional)
+
+
+def _call_chunk(chunk: List[tuple]) -> List[BatchResult]:
+    from argParseFromDoc.batchExecution import _call_item
+    callable, parser, args_to_ignore, args_to_include, args_optional = _WORKER_STATE
+    return [_call_item(callable, parser, index, item, "argv", args_to_ignore, args_to_include, args_optional)
+            for index, item in chunk]
+
+
+def get_picklable_spec(spec) -> Optional[bytes]:
+    """
+    Pickle a spec so that it can be sent to worker processes.
+
+    :param spec: The spec, as returned by get_spec_from_function
+    :return: The pickled spec, or None if some default value of the function cannot be pickled. In that case, the
+             workers need to extract the spec themselves
+    """
+    try:
+        return pickle.dumps(spec)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+
+
+def _iter_chunks(items: Iterable, chunksize: int) -> Iterator[List[tuple]]:
+    chunk = []
+    for index_item in enumerate(items):
+        chunk.append(index_item)
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_function_and_call_parallel(callable: Callable, args_list: Iterable[Union[str, List[str], dict]],
+                                     n_workers: Optional[int] = None, chunksize: int = 1, ordered: bool = True,
+                                     args_to_ignore: List[str] = None, args_to_include: List[str] = None,
+                                     args_optional: List[str] = None, cache_dir: Optional[str] = None,
+                                     mp_context=None) -> Iterator[BatchResult]:
+    """
+    Like parse_function_and_call_batch, but the calls run in a pool of worker processes. Each worker imports the module
+    of the function and builds its parser once, from the spec extracted in the calling process, and then handles
+    chunks of argument sets. Argument sets are consumed lazily, with a bounded number of chunks in flight, so
+    args_list can be a long generator.
+
+    :param callable: the documented function to call. It should be importable from its module (i.e. not a lambda
+                     or a nested function), so that it can be sent to the workers
+    :param args_list: The argument sets. Each one can be a list with the argv (e.g. ["--a", "1"]), a string with the
+                      command line arguments (e.g. "--a 1") or a dict with the argument values (e.g. {"a": 1})
+    :param n_workers: The number of worker processes. Defaults to the number of cpus
+    :param chunksize: The number of argument sets sent to a worker at once. Larger chunks reduce the communication
+                      overhead of short calls
+    :param ordered: If True, results are yielded in the same order as args_list. Otherwise, they are yielded as soon
+                    as they are ready. Use BatchResult.index to match them
+    :param args_to_ignore: Arguments in the function callable that won't be translated to argparse arguments
+    :param args_to_include: Only this names of arguments in the function callable will be translated to argparse arguments
+    :param args_optional: Arguments in the function callable that are optional.
+    :param cache_dir: Directory of the on-disk spec cache. See get_spec_from_function
+    :param mp_context: The multiprocessing context of the pool. See concurrent.futures.ProcessPoolExecutor
+    :return: A generator of BatchResult, one per argument set. If the results of a chunk cannot be pickled or its
+             worker dies, all the argument sets of the chunk get an error
+    """
+    from concurrent.futures import Future, ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+    from argParseFromDoc.autoArgparseFunction import get_spec_from_function
+    assert chunksize >= 1, "argParseFromDoc: Error, chunksize should be >= 1"
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    spec = get_spec_from_function(callable, args_to_ignore=args_to_ignore, args_to_include=args_to_include,
+                                  args_optional=args_optional, cache_dir=cache_dir)
+    initargs = (callable, get_picklable_spec(spec), args_to_ignore, args_to_include, args_optional, cache_dir)
+    max_in_flight = 2 * n_workers
+    with ProcessPoolExecutor(n_workers, mp_context=mp_context, initializer=_init_worker,
+                             initargs=initargs) as executor:
+        in_flight = deque()
+        for chunk in _iter_chunks(args_list, chunksize):
+            try:
+                future = executor.submit(_call_chunk, chunk)
+            except BrokenProcessPool as e:  # A worker died. The pool cannot run anything else
+                future = Future()
+                future.set_exception(e)
+            in_flight.append((future, chunk))
+            if len(in_flight) >= max_in_flight:
+                yield from _pop_results(in_flight, ordered)
+        while in_flight:
+            yield from _pop_results(in_flight, ordered)
+
+
+def _get_chunk_results(future, chunk: List[tuple]) -> List[BatchResult]:
+    # The calls catch their errors, but the chunk fails as a whole if its results cannot be pickled or its worker dies
+    try:
+        return future.result()
+    except Exception as e:
+        from argParseFromDoc.batchExecution import _format_error
+        return [BatchResult(index, item if isinstance(item, list) else None, None, _format_error(e))
+                for index, item in chunk]
+
+
+def _pop_results(in_flight: deque, ordered: bool) -> Iterator[BatchResult]:
+    if ordered:
+        yield from _get_chunk_results(*in_flight.popleft())
+        return
+    from concurrent.futures import FIRST_COMPLETED, wait
+    done, _ = wait([future for future, _ in in_flight], return_when=FIRST_COMPLETED)
+    for future_chunk in [future_chunk for future_chunk in in_flight if future_chunk[0] in done]:
+        in_flight.remove(future_chunk)
+        yield from _get_chunk_results(*future_chunk)
@@ -0,0 +1,182 @@
+import array
+import ast
+import hashlib
+import re
+from typing import Any, List, Optional, Set, Tuple
+
+from argParseFromDoc.compactArrays import CompactArrayType
+from argParseFromDoc.helpers import ArgSpec, HelpWithDefault
+
+_SOURCE_HASH_PATTERN = re.compile(r'^SOURCE_HASH\s*=\s*"([0-9a-f]+)"', re.MULTILINE)
+
+_MODULE_TEMPLATE = '''# This module was generated by argParseFromDoc {version}. Do not edit it.
+# Regenerate it with:   python -m argParseFromDoc compile {target} -o <this_file>
+# Check it is updated:  python -m argParseFromDoc compile {target} -o <this_file> --check
+{imports}
+
+TARGET = {target!r}
+SOURCE_HASH = "{source_hash}"
+
+
+def add_arguments(parser):
+{add_argument_lines}
+    return parser
+
+
+def get_parser(*args, **kwargs):
+    return add_arguments(ArgumentParser(*args, **kwargs))
+
+
+def parse_args(args=None):
+    return get_parser({prog!r}).parse_args(args)
+{call_function}'''
+
+_CALL_FUNCTION_TEMPLATE = '''
+
+def parse_and_call(args=None):
+    import importlib
+    from argParseFromDoc.asyncExecution import call_function
+    args = parse_args(args)
+    fun = importlib.import_module({module!r})
+    for name in {function_name!r}.split("."):
+        fun = getattr(fun, name)
+    return call_function(fun, vars(args))
+'''
+
+
+class NotCompilableError(ValueError):
+    """
+    Raised when an argument cannot be written as a literal add_argument call.
+    """
+    pass
+
+
+def _value_to_code(value: Any, what: str) -> str:
+    code = repr(value)
+    try:
+        same = ast.literal_eval(code) == value
+    except (ValueError, SyntaxError):
+        same = False
+    if not same:
+        raise NotCompilableError("argParseFromDoc: Error, %s %r cannot be written as a literal" % (what, value))
+    return code
+
+
+def _type_to_code(typeFun: Any, imports: Set[str]) -> str:
+    if typeFun in (str, int, float, bool):
+        return typeFun.__name__
+    if isinstance(typeFun, type):
+        imports.add("from %s import %s" % (typeFun.__module__, typeFun.__qualname__))
+        return typeFun.__qualname__
+    type_name = type(typeFun).__name__
+    code = repr(typeFun)
+    if not code.startswith(type_name + "("):
+        raise NotCompilableError("argParseFromDoc: Error, type %r cannot be written as code" % typeFun)
+    imports.add("from %s import %s" % (type(typeFun).__module__, type_name))
+    return code
+
+
+def _argument_to_code(argSpec: ArgSpec, imports: Set[str]) -> str:
+    from argParseFromDoc.autoArgparseFunction import _get_add_argument_params
+    option_string, params = _get_add_argument_params(argSpec)
+    param_codes = [repr(option_string)]
+    for key, value in params.items():
+        if key in ("type", "item_type", "array_type") or (key == "action" and not isinstance(value, str)):
+            value_code = _type_to_code(value, imports)
+        elif key == "default" and isinstance(argSpec.typeFun, CompactArrayType) and \
+                isinstance(argSpec.default, (list, tuple, array.array)):
+            default_code = _value_to_code(tuple(argSpec.default), "default of argument %s" % argSpec.name)
+            value_code = "%s.from_values(%s)" % (_type_to_code(argSpec.typeFun, imports), default_code)
+        elif isinstance(value, HelpWithDefault):
+            imports.add("from argParseFromDoc.helpers import HelpWithDefault")
+            value_code = "HelpWithDefault(%r)" % str(value)
+        else:
+            value_code = _value_to_code(value, "%s of argument %s" % (key, argSpec.name))
+        param_codes.append("%s=%s" % (key, value_code))
+    return "    parser.add_argument(%s)" % ", ".join(param_codes)
+
+
+def compile_spec(spec: Tuple[ArgSpec, ...], target: str) -> str:
+    """
+    Write the code of a python module that builds the parser of a spec with literal add_argument calls, so that it
+    can be imported without docstring_parser or inspect.
+
+    :param spec: The spec, as returned by get_spec_from_function or get_spec_from_source
+    :param target: "package.module:function" or "path/to/file.py:function". It is recorded in the module and, for
+                   package.module:function targets, it is used to generate a parse_and_call function.
+    :return: The code of the module
+    """
+    from argParseFromDoc import __version__
+    from argParseFromDoc.staticSpec import split_target, _is_path
+    imports = {"from argparse import ArgumentParser"}
+    add_argument_lines = [_argument_to_code(argSpec, imports) for argSpec in spec]
+    if not add_argument_lines:
+        add_argument_lines = ["    pass"]
+    add_argument_lines = "\n".join(add_argument_lines)
+
+    module, function_name = split_target(target)
+    call_function = ""
+    if not _is_path(module):
+        call_function = _CALL_FUNCTION_TEMPLATE.format(module=module, function_name=function_name)
+    code = _MODULE_TEMPLATE.format(version=__version__, target=target, imports="\n".join(sorted(imports)),
+                                   source_hash="", add_argument_lines=add_argument_lines,
+                                   prog=function_name.split(".")[-1], call_function=call_function)
+    # The hash covers the whole module, with an empty SOURCE_HASH
+    return code.replace('SOURCE_HASH = ""', 'SOURCE_HASH = "%s"' % _get_source_hash(code), 1)
+
+
+def _get_source_hash(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def compile_target(target: str, static: bool = False, args_to_ignore: List[str] = None,
+                   args_to_include: List[str] = None, args_optional: List[str] = None) -> str:
+    """
+    Write the code of a python module that builds the parser of a documented function. See compile_spec
+
+    :param target: "package.module:function" or "path/to/file.py:function"
+    :param static: If True, the spec is extracted from the source code without importing the module
+    :param args_to_ignore: Arguments in the function callable that won't be translated to argparse arguments
+    :param args_to_include: Only this names of arguments in the function callable will be translated to argparse arguments
+    :param args_optional: Arguments in the function callable that are optional.
+    :return: The code of the module
+    """
+    if static:
+        from argParseFromDoc.staticSpec import get_spec_from_source
+        spec = get_spec_from_source(target, args_to_ignore=args_to_ignore, args_to_include=args_to_include,
+                                    args_optional=args_optional)
+    else:
+        from argParseFromDoc.autoArgparseFunction import get_spec_from_function
+        from argParseFromDoc.staticSpec import import_target
+        spec = get_spec_from_function(import_target(target), args_to_ignore=args_to_ignore,
+                                      args_to_include=args_to_include, args_optional=args_optional)
+    return compile_spec(spec, target)
+
+
+def get_source_hash(code: str) -> Optional[str]:
+    """
+    Read the SOURCE_HASH of a generated module
+    :param code: The code of the module
+    :return: The hash or None if it was not found
+    """
+    match = _SOURCE_HASH_PATTERN.search(code)
+    return None if match is None else match.group(1)
+
+
+def is_compiled_module_updated(fname: str, expected_code: str) -> bool:
+    """
+    Check whether a generated module was generated with the same code as a freshly generated one, according to
+    their SOURCE_HASH. The module must also match its own SOURCE_HASH, so hand edits of the module are detected.
+    :param fname: The generated module
+    :param expected_code: The code of the freshly generated module
+    :return: True if the module is up to date
+    """
+    try:
+        with open(fname) as f:
+            code = f.read()
+    except OSError:
+        return False
+    source_hash = get_source_hash(code)
+    if source_hash is None or source_hash != get_source_hash(expected_code):
+        return False
+    return _get_source_hash(code.replace('SOURCE_HASH = "%s"' % source_hash, 'SOURCE_HASH = ""', 1)) == source_hash
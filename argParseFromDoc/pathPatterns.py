@@ -0,0 +1,223 @@
+import argparse
+import os
+import re
+from fnmatch import translate
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple, Union
+
+_MAGIC_CHARS = re.compile(r"[*?[]")
+
+
+def _has_magic(part: str) -> bool:
+    return _MAGIC_CHARS.search(part) is not None
+
+
+def _compile(pattern: str) -> Callable:
+    return re.compile(translate(pattern), 0 if os.path.normcase("A") == "A" else re.IGNORECASE).match
+
+
+def split_pattern(pattern: str) -> Tuple[str, List[str]]:
+    """
+    Split a glob pattern into the directory where the search starts and the components that are matched
+    :param pattern: The glob pattern, e.g. data/**/*.txt
+    :return: The directory and the components, e.g. ("data", ["**", "*.txt"])
+    """
+    parts = re.split(r"[/%s]+" % re.escape(os.sep), pattern)
+    n_fixed = 0
+    while n_fixed < len(parts) - 1 and not _has_magic(parts[n_fixed]):
+        n_fixed += 1
+    fixed = parts[:n_fixed]
+    if fixed and fixed[0] == "":  # Absolute patterns
+        fixed[0] = os.sep
+    return os.path.join(*fixed) if fixed else ".", parts[n_fixed:]
+
+
+def _scandir(dirname: str, sort: bool) -> List[os.DirEntry]:
+    try:
+        with os.scandir(dirname) as it:
+            entries = list(it)
+    except OSError:
+        return []
+    if sort:
+        entries.sort(key=lambda entry: entry.name)
+    return entries
+
+
+def _is_dir(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _iter_all_files(dirname: str, sort: bool) -> Iterator[str]:
+    for entry in _scandir(dirname, sort):
+        if entry.name.startswith("."):
+            continue
+        if _is_dir(entry):
+            yield from _iter_all_files(entry.path, sort)
+        else:
+            yield entry.path
+
+
+def _iter_matches(dirname: str, parts: List[str], sort: bool) -> Iterator[str]:
+    part, rest = parts[0], parts[1:]
+    if part == "**":
+        if not rest:
+            yield from _iter_all_files(dirname, sort)
+            return
+        here = _iter_matches(dirname, rest, sort)  # ** also matches no directory at all
+        below = (path for entry in _scandir(dirname, sort) if not entry.name.startswith(".") and _is_dir(entry)
+                 for path in _iter_matches(entry.path, parts, sort))
+        if sort:
+            # Both are sorted, so they are merged lazily. E.g. a/x.txt comes before b.txt
+            import heapq
+            yield from heapq.merge(here, below, key=lambda path: path.split(os.sep))
+        else:
+            yield from here
+            yield from below
+    elif not _has_magic(part):
+        path = os.path.join(dirname, part)
+        if rest:
+            if os.path.isdir(path):
+                yield from _iter_matches(path, rest, sort)
+        elif os.path.lexists(path) and not os.path.isdir(path):
+            yield path
+    else:
+        match = _compile(part)
+        show_hidden = part.startswith(".")
+        for entry in _scandir(dirname, sort):
+            if (entry.name.startswith(".") and not show_hidden) or not match(entry.name):
+                continue
+            if rest:
+                if _is_dir(entry):
+                    yield from _iter_matches(entry.path, rest, sort)
+            elif not _is_dir(entry):
+                yield entry.path
+
+
+class PathIterator():
+    """
+    The files matched by a glob pattern (e.g. data/**/*.txt) or contained in a directory, as pathlib.Path objects.
+    Directories are listed with os.scandir only as the iteration advances, so millions of files can be processed
+    without building a list of them, and without hitting the command line length limit of the shell. It can be
+    iterated several times. Hidden files are skipped unless the pattern matches them explicitly (e.g. data/.*).
+    """
+
+    def __init__(self, pattern: str, sort: bool = False,
+                 filters: Tuple[Union[str, Callable[[Path], bool]], ...] = ()):
+        """
+        :param pattern: A glob pattern, the path of a directory, whose files (not recursively) are iterated, or the path
+                        of a file
+        :param sort: Sort the entries of every directory by name, so the paths are yielded in lexicographic order of
+                     their components. Otherwise they come in the order of os.scandir, which is faster
+        :param filters: Only the paths that match all of them are yielded. Strings are glob patterns for the file name
+                        (e.g. "*.txt"), which are checked before creating any Path object, and callables receive the
+                        Path
+        """
+        self.pattern = pattern
+        self._sort = sort
+        self._filters = tuple(filters)
+
+    def sorted(self) -> "PathIterator":
+        """
+        :return: A PathIterator that yields the same paths in lexicographic order
+        """
+        return PathIterator(self.pattern, True, self._filters)
+
+    def filter(self, condition: Union[str, Callable[[Path], bool]]) -> "PathIterator":
+        """
+        :param condition: A glob pattern for the file names (e.g. "*.txt") or a function that receives the Path
+        :return: A PathIterator that only yields the paths that also satisfy condition
+        """
+        return PathIterator(self.pattern, self._sort, self._filters + (condition,))
+
+    def _iter_str(self) -> Iterator[str]:
+        if os.path.isdir(self.pattern):
+            return _iter_matches(self.pattern, ["*"], self._sort)
+        if not _has_magic(self.pattern):
+            return iter([self.pattern] if os.path.lexists(self.pattern) else [])
+        dirname, parts = split_pattern(self.pattern)
+        return _iter_matches(dirname, parts, self._sort)
+
+    def __iter__(self) -> Iterator[Path]:
+        name_matches = [_compile(condition) for condition in self._filters if isinstance(condition, str)]
+        predicates = [condition for condition in self._filters if not isinstance(condition, str)]
+        for path in self._iter_str():
+            if name_matches:
+                name = os.path.basename(path)
+                if not all(match(name) for match in name_matches):
+                    continue
+            path = Path(path)
+            if all(predicate(path) for predicate in predicates):
+                yield path
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, self.pattern)
+
+
+class PathPatternType():
+    """
+    For Iterator[Path] arguments. The argument is a glob pattern (quote it so that the shell does not expand it) or a
+    directory, and the function receives a PathIterator. The pattern can be followed by the options ":sorted", to
+    sort the paths, and ":filter=<glob>", to only keep the files whose name matches <glob>, e.g.
+    --inputs 'data/**' :sorted ':filter=*.mrc'. Each value is converted by __call__ and PathPatternAction applies the
+    options to the PathIterator of the pattern
+    """
+
+    def __init__(self, sort: bool = False):
+        """
+        :param sort: Whether the PathIterators are sorted. See PathIterator
+        """
+        self._sort = sort
+
+    def __call__(self, string: str) -> Union[PathIterator, Tuple[str, str]]:
+        if string == ":sorted":
+            return ("sorted", "")
+        if string.startswith(":filter="):
+            return ("filter", string[len(":filter="):])
+        if not _has_magic(string) and not os.path.exists(string):
+            raise argparse.ArgumentTypeError("can't open '%s': No such file or directory" % string)
+        return PathIterator(string, self._sort)
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__, "sort=True" if self._sort else "")
+
+    def __eq__(self, other):
+        return isinstance(other, PathPatternType) and self._sort == other._sort
+
+    def __hash__(self):
+        return hash(self._sort)
+
+
+class PathPatternAction(argparse.Action):
+    """
+    Stores the PathIterator of an Iterator[Path] argument, after applying the :sorted and :filter=<glob> options that
+    follow the pattern. See PathPatternType
+    """
+
+    OPTIONS_METAVAR = ":sorted|:filter=GLOB"
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        try:
+            setattr(namespace, self.dest, self.combine(values))
+        except argparse.ArgumentTypeError as e:
+            raise argparse.ArgumentError(self, str(e))
+
+    @staticmethod
+    def combine(values: List[Union[PathIterator, Tuple[str, str]]]) -> PathIterator:
+        """
+        :param values: The values converted by PathPatternType: a PathIterator followed by options
+        :return: The PathIterator with the options applied
+        """
+        paths = values[0]
+        if not isinstance(paths, PathIterator):
+            raise argparse.ArgumentTypeError("the first value should be a pattern or a directory, not an option")
+        for option in values[1:]:
+            if not isinstance(option, tuple):
+                raise argparse.ArgumentTypeError("only one pattern is allowed, and %r is not an option (%s)" %
+                                                 (option.pattern, PathPatternAction.OPTIONS_METAVAR))
+            name, value = option
+            paths = paths.sorted() if name == "sorted" else paths.filter(value)
+        return paths
+
@@ -0,0 +1,220 @@
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+from argParseFromDoc.helpers import ArgSpec
+
+CACHE_DIR_ENV_VAR = "ARGPARSEFROMDOC_CACHE_DIR"
+DEFAULT_MEMO_SIZE = 128
+
+
+def get_cache_dir(cache_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Resolve the directory of the on-disk spec cache.
+    :param cache_dir: An explicit directory. If None, the environment variable ARGPARSEFROMDOC_CACHE_DIR is used
+    :return: The cache directory or None if caching is disabled
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get(CACHE_DIR_ENV_VAR) or None
+    return cache_dir
+
+
+def get_spec_key(callable: Callable, *options) -> Optional[str]:
+    """
+    Compute the cache key of a callable without introspecting it. The key covers the library and python versions,
+    the qualified name of the function and a hash of everything the spec is derived from (docstring, argument names,
+    type hints and defaults), together with the options used to build the spec.
+    :param callable: The function to compute the key for
+    :param options: Any other hashable value that affects the spec (e.g. args_to_ignore)
+    :return: A hex digest, or None if the callable cannot be keyed (e.g. it is not a python function, or the repr of
+             some default contains a memory address, which changes in every process)
+    """
+    import hashlib
+    import re
+    from argParseFromDoc import __version__
+    fun = getattr(callable, "__func__", callable)
+    code = getattr(fun, "__code__", None)
+    if code is None:
+        return None
+    n_args = code.co_argcount + code.co_kwonlyargcount
+    key_parts = (__version__, sys.version_info[:2], getattr(fun, "__module__", None), fun.__qualname__,
+                 fun.__doc__, code.co_varnames[:n_args], fun.__annotations__, fun.__defaults__, fun.__kwdefaults__,
+                 getattr(fun, "__signature__", None), options)
+    hasher = hashlib.sha256()
+    for part in key_parts:
+        part_repr = repr(part)
+        if re.search(r" at 0x[0-9a-fA-F]+", part_repr):  # E.g. <Foo object at 0x7f...>. The key would never match
+            return None
+        hasher.update(part_repr.encode("utf-8", errors="backslashreplace"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def _get_spec_fname(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, key + ".pkl")
+
+
+def load_spec(cache_dir: str, key: str) -> Optional[Tuple[ArgSpec, ...]]:
+    """
+    Read a spec from the cache.
+    :param cache_dir: The cache directory
+    :param key: The key computed with get_spec_key
+    :return: The cached spec or None if it is not available, or if the file is not a regular file of the current
+             user, as unpickling a file planted by someone else would run their code
+    """
+    import pickle
+    import stat
+    try:
+        fd = os.open(_get_spec_fname(cache_dir, key), os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+        with open(fd, "rb") as f:
+            st = os.fstat(fd)
+            if not stat.S_ISREG(st.st_mode) or (hasattr(os, "getuid") and st.st_uid != os.getuid()):
+                return None
+            stored_key, spec = pickle.load(f)
+    except Exception:  # Missing, or written by an incompatible version. Either way, it is a cache miss
+        return None
+    if stored_key != key:
+        return None
+    return spec
+
+
+def save_spec(cache_dir: str, key: str, spec: Tuple[ArgSpec, ...]):
+    """
+    Store a spec in the cache. The file is written to a temporary name and atomically renamed, so concurrent
+    readers either see a complete entry or no entry at all. Failures are ignored, as caching is best effort.
+    :param cache_dir: The cache directory
+    :param key: The key computed with get_spec_key
+    :param spec: The spec to store
+    """
+    import pickle
+    import tempfile
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)  # Only accessible by its owner, if it is created here
+        fd, tmp_fname = tempfile.mkstemp(dir=cache_dir, prefix=".tmp_", suffix=".pkl")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((key, spec), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_fname, _get_spec_fname(cache_dir, key))
+    except Exception:  # e.g. defaults that cannot be pickled
+        try:
+            os.unlink(tmp_fname)
+        except OSError:
+            pass
+
+
+def clear_spec_cache(cache_dir: Optional[str] = None) -> List[str]:
+    """
+    Remove all the entries of the on-disk spec cache
+    :param cache_dir: The cache directory. If None, the environment variable ARGPARSEFROMDOC_CACHE_DIR is used
+    :return: The list of removed files
+    """
+    cache_dir = get_cache_dir(cache_dir)
+    removed = []
+    if cache_dir is None or not os.path.isdir(cache_dir):
+        return removed
+    for fname in os.listdir(cache_dir):
+        if fname.endswith(".pkl"):
+            try:
+                os.unlink(os.path.join(cache_dir, fname))
+                removed.append(fname)
+            except OSError:
+                pass
+    return removed
+
+
+class _SpecMemo():
+    """
+    In-process LRU of extracted specs. Callables are referenced weakly, so their entries are dropped once they are
+    garbage collected.
+    """
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE):
+        self.maxsize = maxsize
+        self._lru = OrderedDict()  # (weakref to callable, options) -> spec
+        self._lock = threading.Lock()
+        self._n_dead = 0
+
+    @staticmethod
+    def _get_target(callable: Callable):
+        return getattr(callable, "__func__", callable)  # bound methods are recreated on every attribute access
+
+    def _make_key(self, callable: Callable, options) -> Optional[tuple]:
+        try:
+            return weakref.ref(self._get_target(callable), self._on_dead), options
+        except TypeError:  # Not weak referenceable
+            return None
+
+    def _on_dead(self, ref):
+        # Called by the garbage collector at any point, so the actual removal is deferred to _prune
+        self._n_dead += 1
+
+    def _prune(self):
+        if self._n_dead:
+            self._n_dead = 0
+            for key in [key for key in self._lru if key[0]() is None]:
+                del self._lru[key]
+        while len(self._lru) > max(self.maxsize, 0):
+            self._lru.popitem(last=False)
+
+    def get(self, callable: Callable, options) -> Optional[Tuple[ArgSpec, ...]]:
+        if self.maxsize <= 0:
+            return None
+        key = self._make_key(callable, options)
+        if key is None:
+            return None
+        with self._lock:
+            spec = self._lru.get(key)
+            if spec is not None:
+                self._lru.move_to_end(key)
+        return spec
+
+    def put(self, callable: Callable, options, spec: Tuple[ArgSpec, ...]):
+        if self.maxsize <= 0:
+            return
+        key = self._make_key(callable, options)
+        if key is None:
+            return
+        with self._lock:
+            self._lru[key] = spec
+            self._lru.move_to_end(key)
+            self._prune()
+
+    def invalidate(self, callable: Optional[Callable] = None):
+        with self._lock:
+            if callable is None:
+                self._lru.clear()
+                return
+            target = self._get_target(callable)
+            for key in [key for key in self._lru if key[0]() is target]:
+                del self._lru[key]
+            self._prune()
+
+    def __len__(self):
+        with self._lock:
+            self._prune()
+            return len(self._lru)
+
+
+_SPEC_MEMO = _SpecMemo()
+
+
+def set_spec_memo_size(maxsize: int):
+    """
+    Set the maximum number of specs kept in memory. Least recently used specs are evicted first.
+    :param maxsize: The maximum number of entries. Use 0 to disable the in-memory cache
+    """
+    with _SPEC_MEMO._lock:
+        _SPEC_MEMO.maxsize = maxsize
+        _SPEC_MEMO._prune()
+
+
+def invalidate_spec(callable: Optional[Callable] = None):
+    """
+    Drop the in-memory specs of a callable, e.g. after editing its docstring or signature at runtime.
+    :param callable: The callable to forget. If None, the whole in-memory cache is emptied
+    """
+    _SPEC_MEMO.invalidate(callable)
@@ -0,0 +1,257 @@
+import ast
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import os
+import sys
+import typing
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from argParseFromDoc.helpers import ArgSpec
+
+# Modules whose names can be used in type hints of statically analysed functions. They are cheap to import
+_STATIC_IMPORTABLE_MODULES = ("typing", "collections.abc", "io", "pathlib", "array", "mmap", "argParseFromDoc",
+                              "argParseFromDoc.fileTypes")
+
+_BUILTIN_NAMES = {"int": int, "str": str, "float": float, "bool": bool, "list": list, "tuple": tuple,
+                  "bytes": bytes, "memoryview": memoryview}
+
+
+class StaticSpecError(ValueError):
+    """
+    Raised when a function cannot be analysed without importing its module.
+    """
+    pass
+
+
+def split_target(target: str) -> Tuple[str, str]:
+    """
+    Split a target of the form "package.module:function" or "path/to/file.py:function"
+    :param target: The target string
+    :return: The module name or path, and the (qualified) name of the function
+    """
+    module, sep, function_name = target.rpartition(":")
+    if not sep or not module or not function_name:
+        raise ValueError("argParseFromDoc: Error, target '%s' should be 'module:function' or 'file.py:function'"
+                         % target)
+    return module, function_name
+
+
+def _is_path(module: str) -> bool:
+    return module.endswith(".py") or os.sep in module or (os.altsep is not None and os.altsep in module)
+
+
+def find_source_file(module: str) -> str:
+    """
+    Find the source file of a module without executing it. Parent packages are imported, as python needs them to
+    locate submodules.
+    :param module: A module name or a path to a python file
+    :return: The path of the source file
+    """
+    if _is_path(module):
+        return module
+    spec = importlib.util.find_spec(module)
+    if spec is None or spec.origin is None or not spec.origin.endswith(".py"):
+        raise StaticSpecError("argParseFromDoc: Error, source file of module %s not found" % module)
+    return spec.origin
+
+
+def _find_function_node(tree: ast.Module, function_name: str) -> ast.AST:
+    body = tree.body
+    node = None
+    for name in function_name.split("."):
+        node = None
+        for candidate in body:
+            if isinstance(candidate, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and \
+                    candidate.name == name:
+                node = candidate  # Keep the last definition, as the interpreter would
+        if node is None:
+            raise StaticSpecError("argParseFromDoc: Error, function %s not found" % function_name)
+        body = node.body
+    if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        raise StaticSpecError("argParseFromDoc: Error, %s is not a function" % function_name)
+    return node
+
+
+def _get_importable_names(tree: ast.Module) -> Dict[str, object]:
+    names = dict(_BUILTIN_NAMES)
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.name in _STATIC_IMPORTABLE_MODULES:
+                    module = importlib.import_module(alias.name)
+                    if alias.asname is not None:
+                        names[alias.asname] = module
+                    else:
+                        top_name = alias.name.split(".")[0]
+                        names[top_name] = importlib.import_module(top_name)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module in _STATIC_IMPORTABLE_MODULES:
+            module = importlib.import_module(node.module)
+            for alias in node.names:
+                if alias.name != "*" and hasattr(module, alias.name):
+                    names[alias.asname or alias.name] = getattr(module, alias.name)
+    return names
+
+
+def _resolve_annotation(node: ast.AST, names: Dict[str, object]):
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, str):  # String annotations, e.g. from __future__ import annotations
+            return _resolve_annotation(ast.parse(node.value, mode="eval").body, names)
+        if node.value is None:
+            return None
+    elif isinstance(node, ast.Name):
+        if node.id in names:
+            return names[node.id]
+    elif isinstance(node, ast.Attribute):
+        value = _resolve_annotation(node.value, names)
+        if inspect.ismodule(value) and hasattr(value, node.attr):
+            return getattr(value, node.attr)
+    elif isinstance(node, ast.Subscript):
+        origin = _resolve_annotation(node.value, names)
+        slice_node = node.slice
+        elements = slice_node.elts if isinstance(slice_node, ast.Tuple) else [slice_node]
+        if origin is getattr(typing, "Literal", None):
+            try:
+                args = tuple(ast.literal_eval(elem) for elem in elements)
+            except ValueError:
+                raise StaticSpecError("argParseFromDoc: Error, only literal values are supported in Literal[%s]"
+                                      % ast.unparse(slice_node))
+        else:
+            args = tuple(_resolve_annotation(elem, names) for elem in elements)
+        return origin[args if len(args) > 1 else args[0]]
+    elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        return _resolve_annotation(node.left, names) | _resolve_annotation(node.right, names)
+    raise StaticSpecError("argParseFromDoc: Error, type hint %s cannot be resolved without importing the module"
+                          % ast.unparse(node))
+
+
+def _get_default(node: Optional[ast.AST]):
+    if node is None:
+        return inspect.Parameter.empty
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        raise StaticSpecError("argParseFromDoc: Error, default value %s is not a literal" % ast.unparse(node))
+
+
+def _build_signature(node: ast.AST, names: Dict[str, object]) -> inspect.Signature:
+    arguments = node.args
+
+    def make_param(arg: ast.arg, kind, default_node=None):
+        annotation = inspect.Parameter.empty
+        if arg.annotation is not None:
+            annotation = _resolve_annotation(arg.annotation, names)
+        return inspect.Parameter(arg.arg, kind, default=_get_default(default_node), annotation=annotation)
+
+    positional = arguments.posonlyargs + arguments.args
+    defaults = [None] * (len(positional) - len(arguments.defaults)) + arguments.defaults
+    params = []
+    for i, arg in enumerate(positional):
+        kind = inspect.Parameter.POSITIONAL_ONLY if i < len(arguments.posonlyargs) else \
+            inspect.Parameter.POSITIONAL_OR_KEYWORD
+        params.append(make_param(arg, kind, defaults[i]))
+    if arguments.vararg is not None:
+        params.append(make_param(arguments.vararg, inspect.Parameter.VAR_POSITIONAL))
+    for arg, default_node in zip(arguments.kwonlyargs, arguments.kw_defaults):
+        params.append(make_param(arg, inspect.Parameter.KEYWORD_ONLY, default_node))
+    if arguments.kwarg is not None:
+        params.append(make_param(arguments.kwarg, inspect.Parameter.VAR_KEYWORD))
+    return inspect.Signature(params)
+
+
+def get_static_stub(source_file: str, function_name: str) -> Callable:
+    """
+    Build a stand-in for a function from its source code, without executing the module it belongs to. The stand-in
+    has the same docstring and signature (type hints and default values included) as the function, so that it can
+    be used to extract the spec of the function, but it cannot be called.
+
+    :param source_file: The python file that contains the function
+    :param function_name: The name of the function. Use "ClassName.method" for methods
+    :return: The stand-in function
+    """
+    with open(source_file, "rb") as f:
+        tree = ast.parse(f.read(), filename=source_file)
+    node = _find_function_node(tree, function_name)
+    names = _get_importable_names(tree)
+
+    def stub(*args, **kwargs):
+        raise RuntimeError("argParseFromDoc: Error, %s was statically analysed and cannot be called" % function_name)
+
+    stub.__name__ = node.name
+    stub.__qualname__ = function_name
+    stub.__doc__ = ast.get_docstring(node, clean=False)
+    stub.__signature__ = _build_signature(node, names)
+    return stub
+
+
+def get_spec_from_source(target: str, args_to_ignore: List[str] = None, args_to_include: List[str] = None,
+                         args_optional: List[str] = None) -> Tuple[ArgSpec, ...]:
+    """
+    Extract the arguments of a documented function reading its source code with ast, so that its module is never
+    executed. The result is the same as argParseFromDoc.autoArgparseFunction.get_spec_from_function would produce
+    for the imported function. Only literal default values and type hints built from builtins and typing are
+    supported. Decorators that change the signature of the function are not taken into account.
+
+    :param target: "package.module:function" or "path/to/file.py:function"
+    :param args_to_ignore: Arguments in the function callable that won't be translated to argparse arguments
+    :param args_to_include: Only this names of arguments in the function callable will be translated to argparse arguments
+    :param args_optional: Arguments in the function callable that are optional.
+    :return: One ArgSpec per argument
+    """
+    from argParseFromDoc.autoArgparseFunction import _extract_spec_from_function
+    module, function_name = split_target(target)
+    stub = get_static_stub(find_source_file(module), function_name)
+    return _extract_spec_from_function(stub, args_to_ignore, args_to_include, args_optional)
+
+
+def import_target(target: str) -> Callable:
+    """
+    Import the function referred by a target
+    :param target: "package.module:function" or "path/to/file.py:function"
+    :return: The function
+    """
+    module_name, function_name = split_target(target)
+    if _is_path(module_name):
+        module_path = os.path.abspath(module_name)
+        module_dir = os.path.dirname(module_path)
+        if module_dir not in sys.path:
+            sys.path.insert(0, module_dir)  # As if the file was executed as a script
+        # A private name, so that e.g. tools/json.py does not replace the json module of the standard library
+        path_hash = hashlib.sha1(module_path.encode("utf-8", "surrogateescape")).hexdigest()[:12]
+        name = "_argParseFromDoc_script_%s_%s" % (os.path.splitext(os.path.basename(module_path))[0], path_hash)
+        import_spec = importlib.util.spec_from_file_location(name, module_name)
+        module = importlib.util.module_from_spec(import_spec)
+        sys.modules[name] = module
+        import_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(module_name)
+    fun = module
+    for name in function_name.split("."):
+        fun = getattr(fun, name)
+    return fun
+
+
+def parse_source_function_and_call(target: str, args_to_ignore: List[str] = None, args_to_include: List[str] = None,
+                                   args_optional: List[str] = None, args: Optional[Sequence[str]] = None):
+    """
+    Like argParseFromDoc.parse_function_and_call, but the arguments are parsed using the spec obtained statically
+    from the source code of the function. Help messages and argument errors are thus reported without executing the
+    module of the function, which is only imported once the arguments are known to be valid.
+
+    :param target: "package.module:function" or "path/to/file.py:function"
+    :param args_to_ignore: Arguments in the function callable that won't be translated to argparse arguments
+    :param args_to_include: Only this names of arguments in the function callable will be translated to argparse arguments
+    :param args_optional: Arguments in the function callable that are optional.
+    :param args: The command line arguments. If None, sys.argv[1:] is used
+    :return: The result of calling the function
+    """
+    from argParseFromDoc.AutoArgumentParser import AutoArgumentParser
+    from argParseFromDoc.autoArgparseFunction import _add_spec_to_parser
+    spec = get_spec_from_source(target, args_to_ignore=args_to_ignore, args_to_include=args_to_include,
+                                args_optional=args_optional)
+    parser = AutoArgumentParser(split_target(target)[1].split(".")[-1])
+    _add_spec_to_parser(spec, parser)
+    parsed_args = parser.parse_args(args)
+    from argParseFromDoc.asyncExecution import call_function
+    return call_function(import_target(target), vars(parsed_args))
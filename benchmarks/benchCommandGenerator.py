@@ -0,0 +1,67 @@
+"""
+Throughput of generate_args_for_argparseFromDoc against a CommandGenerator created once, for a sweep of commands
+
+python benchmarks/benchCommandGenerator.py
+"""
+import itertools
+import time
+from typing import List, Optional
+
+from argParseFromDoc.commandStrGenerator import CommandGenerator, generate_args_for_argparseFromDoc
+
+
+def train(data_dir: str, n_epochs: int = 10, learning_rate: float = 1e-3, batch_sizes: List[int] = (16, 32),
+          weight_decay: Optional[float] = None, use_gpu: bool = True, seed: int = 1, name: str = "model",
+          verbose: bool = False):
+    '''
+    Train a model
+
+    @param data_dir: directory with the training data
+    @param n_epochs: number of epochs
+    @param learning_rate: learning rate of the optimizer
+    @param batch_sizes: batch sizes to try
+    @param weight_decay: optional weight decay
+    @param use_gpu: use the gpu if available
+    @param seed: random seed
+    @param name: name of the model
+    @param verbose: print more information
+    '''
+    return data_dir
+
+
+def iter_sweep(n_commands: int):
+    points = itertools.product([1e-2, 1e-3, 1e-4], [[16], [16, 32], [64, 128, 256]], [None, 0.1], [True, False],
+                               range(n_commands))
+    for learning_rate, batch_sizes, weight_decay, use_gpu, seed in itertools.islice(points, n_commands):
+        yield dict(data_dir="/data/train", learning_rate=learning_rate, batch_sizes=batch_sizes,
+                   weight_decay=weight_decay, use_gpu=use_gpu, seed=seed, name="run%d" % seed)
+
+
+def main(n_commands: int = 100000):
+    sweep = list(iter_sweep(n_commands))
+
+    start = time.perf_counter()
+    expected = [generate_args_for_argparseFromDoc(train, **kwargs) for kwargs in sweep]
+    function_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    generator = CommandGenerator(train, path="train.py")
+    get_args = generator.get_args
+    args = [get_args(**kwargs) for kwargs in sweep]
+    generator_time = time.perf_counter() - start
+    assert args == expected
+
+    start = time.perf_counter()
+    get_command = generator.get_command
+    for kwargs in sweep:
+        get_command(**kwargs)
+    command_time = time.perf_counter() - start
+
+    print("generate_args_for_argparseFromDoc: %10.0f commands/s" % (n_commands / function_time))
+    print("CommandGenerator.get_args:         %10.0f commands/s" % (n_commands / generator_time))
+    print("CommandGenerator.get_command:      %10.0f commands/s (shell quoted)" % (n_commands / command_time))
+    print("speedup: %.1fx" % (function_time / generator_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark of compact array arguments (array.array and numpy arrays) against List[int] arguments, for a long list of
+ids. Memory is the size of the parsed value, as reported by tracemalloc.
+
+python benchmarks/benchCompactArrays.py
+"""
+import array
+import time
+import tracemalloc
+from typing import List
+
+from argParseFromDoc import get_parser_from_function
+from argParseFromDoc.fastParser import get_fast_parser_from_function
+
+
+def with_list(ids: List[int]):
+    '''
+    @param ids: the ids to process
+    '''
+    return ids
+
+
+def with_array(ids: array.array = array.array("q")):
+    '''
+    @param ids: the ids to process
+    '''
+    return ids
+
+
+def get_functions():
+    functions = [("List[int]", with_list), ("array.array", with_array)]
+    try:
+        import numpy
+        import numpy.typing
+
+        def with_ndarray(ids: numpy.typing.NDArray[numpy.int64]):
+            '''
+            @param ids: the ids to process
+            '''
+            return ids
+        functions.append(("NDArray[int64]", with_ndarray))
+    except ImportError:
+        pass
+    return functions
+
+
+def measure(parser, argv):
+    start = time.perf_counter()
+    parser.parse_args(argv)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    ids = parser.parse_args(argv).ids
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del ids
+    return elapsed, size
+
+
+def main(n_items: int = 200000):
+    argv = ["--ids"] + [str(i * 7919) for i in range(n_items)]
+    print("%d ids" % n_items)
+    print("%-16s %-10s %12s %12s" % ("annotation", "parser", "ms", "MB"))
+    for name, function in get_functions():
+        for parser_name, parser in [("argparse", get_parser_from_function(function)),
+                                    ("FastParser", get_fast_parser_from_function(function))]:
+            parser.parse_args(argv[:10])
+            elapsed, size = measure(parser, argv)
+            print("%-16s %-10s %12.1f %12.2f" % (name, parser_name, elapsed * 1e3, size / 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark of the FastParser against the argparse parser built by get_parser_from_function
+
+python benchmarks/benchFastParser.py
+"""
+import timeit
+from typing import List, Literal
+
+from argParseFromDoc import get_parser_from_function
+from argParseFromDoc.fastParser import get_fast_parser_from_function
+
+
+def sweep_point(learning_rate: float, n_layers: int = 2, hidden_sizes: List[int] = (64, 64),
+                activation: Literal["relu", "tanh"] = "relu", name: str = "run", use_dropout: bool = False,
+                normalize: bool = True):
+    '''
+    @param learning_rate: the learning rate
+    @param n_layers: number of layers
+    @param hidden_sizes: size of each hidden layer
+    @param activation: the activation function
+    @param name: name of the run
+    @param use_dropout: use dropout
+    @param normalize: normalize the inputs
+    '''
+    return learning_rate
+
+
+ARGV = ["--learning_rate", "0.001", "--n_layers", "3", "--hidden_sizes", "128", "64", "32",
+        "--activation", "tanh", "--name", "sweep_17", "--use_dropout", "--NOT_normalize"]
+
+
+def main(number: int = 20000):
+    parser = get_parser_from_function(sweep_point)
+    fast_parser = get_fast_parser_from_function(sweep_point)
+    assert parser.parse_args(ARGV) == fast_parser.parse_args(ARGV)
+
+    argparse_time = min(timeit.repeat(lambda: parser.parse_args(ARGV), number=number, repeat=3)) / number
+    fast_time = min(timeit.repeat(lambda: fast_parser.parse_args(ARGV), number=number, repeat=3)) / number
+    print("argparse parser: %8.2f us/call" % (argparse_time * 1e6))
+    print("FastParser:      %8.2f us/call" % (fast_time * 1e6))
+    print("speedup: %.1fx" % (argparse_time / fast_time))
+
+
+if __name__ == "__main__":
+    main()
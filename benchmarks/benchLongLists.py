@@ -0,0 +1,59 @@
+"""
+Scaling benchmark of List[str] and List[int] arguments with 10^3 to 10^6 values, as produced by xargs. It compares a
+plain argparse parser (one type call per value), the parser built by get_parser_from_function (long runs of values are
+collapsed before argparse sees them and converted at once) and the FastParser.
+
+python benchmarks/benchLongLists.py
+"""
+import argparse
+import time
+from typing import List
+
+from argParseFromDoc import get_parser_from_function
+from argParseFromDoc.fastParser import get_fast_parser_from_function
+
+
+def process(names: List[str], ids: List[int] = (0,), verbose: bool = False):
+    '''
+    @param names: the names to process
+    @param ids: the ids to process
+    @param verbose: print more
+    '''
+    return names
+
+
+def get_plain_argparse_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--names", type=str, nargs="+", required=True)
+    parser.add_argument("--ids", type=int, nargs="+", default=(0,))
+    parser.add_argument("--verbose", action="store_true")
+    return parser
+
+
+def measure(parser, argv, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser.parse_args(argv)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(max_exponent: int = 6):
+    parsers = [("plain argparse", get_plain_argparse_parser()),
+               ("get_parser_from_function", get_parser_from_function(process)),
+               ("FastParser", get_fast_parser_from_function(process))]
+    print("%-10s %-8s" % ("n_items", "type") + "".join("%28s" % name for name, _ in parsers))
+    for exponent in range(3, max_exponent + 1):
+        n_items = 10 ** exponent
+        values = [str(i) for i in range(n_items)]
+        for option in ["--names", "--ids"]:
+            argv = ["--verbose", option] + values
+            if option == "--ids":
+                argv = ["--names", "x"] + argv
+            times = [measure(parser, argv) for _, parser in parsers]
+            print("%-10d %-8s" % (n_items, option[2:]) + "".join("%25.1f ms" % (t * 1e3) for t in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Microbenchmark of repeated AutoArgumentParser.add_args_from_function calls with and without the in-memory spec cache
+
+python benchmarks/benchSpecMemo.py
+"""
+import timeit
+from typing import List, Literal, Optional
+
+from argParseFromDoc import AutoArgumentParser
+from argParseFromDoc.specCache import set_spec_memo_size, invalidate_spec, DEFAULT_MEMO_SIZE
+
+
+def train(data_dir: str, n_epochs: int = 10, learning_rate: float = 1e-3, batch_sizes: List[int] = (16, 32),
+          optimizer: Literal["sgd", "adam"] = "adam", weight_decay: Optional[float] = None, use_gpu: bool = True,
+          seed: int = 1, name: str = "model", verbose: bool = False):
+    '''
+    Train a model
+
+    @param data_dir: directory with the training data
+    @param n_epochs: number of epochs
+    @param learning_rate: learning rate of the optimizer
+    @param batch_sizes: batch sizes to try
+    @param optimizer: the optimizer name
+    @param weight_decay: optional weight decay
+    @param use_gpu: use the gpu if available
+    @param seed: random seed
+    @param name: name of the model
+    @param verbose: print more information
+    '''
+    return data_dir
+
+
+def build_parser():
+    parser = AutoArgumentParser()
+    parser.add_args_from_function(train)
+    return parser
+
+
+def main(number: int = 2000):
+    set_spec_memo_size(0)
+    uncached = min(timeit.repeat(build_parser, number=number, repeat=3)) / number
+
+    set_spec_memo_size(DEFAULT_MEMO_SIZE)
+    invalidate_spec()
+    build_parser()
+    cached = min(timeit.repeat(build_parser, number=number, repeat=3)) / number
+
+    print("add_args_from_function without memo: %8.1f us/call" % (uncached * 1e6))
+    print("add_args_from_function with memo:    %8.1f us/call" % (cached * 1e6))
+    print("speedup: %.1fx" % (uncached / cached))
+
+
+if __name__ == "__main__":
+    main()
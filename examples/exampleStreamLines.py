@@ -0,0 +1,19 @@
+from typing import Iterator
+
+
+def count_words(lines: Iterator[str]):
+    '''
+    @param lines: text file. Its lines are read one at a time, so it can be arbitrarily large
+    '''
+    return sum(len(line.split()) for line in lines)
+
+
+if __name__ == "__main__":
+    from argParseFromDoc import parse_function_and_call
+    out = parse_function_and_call(count_words)
+    print(out)
+
+    '''
+python -m examples.exampleStreamLines --lines examples/exampleStreamLines.py
+cat examples/exampleStreamLines.py | python -m examples.exampleStreamLines --lines -
+    '''
@@ -1,4 +1,7 @@
+import itertools
 import os
+import shlex
+import sys
 import tempfile
 import subprocess
 import inspect
@@ -7,7 +10,8 @@ from typing import List, Optional, TextIO, Tuple, Literal
 from unittest import TestCase
 from pathlib import Path
 
-from argParseFromDoc.commandStrGenerator import generate_command_for_argparseFromDoc
+from argParseFromDoc.commandStrGenerator import generate_command_for_argparseFromDoc, \
+    generate_args_for_argparseFromDoc, CommandGenerator, iter_sweep_kwargs, iter_sweep_commands, write_sweep_commands
 
 
 class TestCommandExecution(TestCase):
@@ -61,6 +65,38 @@ if __name__ == "__main__":
         result = subprocess.check_output(cmd.split(), text=True)
         self.assertEqual(int(result.strip()), 15)
 
+    def test_argument_file_spill(self):
+        def count_ids(ids: List[int], name: str = "x"):
+            """
+            Count the ids
+            @param ids: the ids
+            @param name: a name
+            """
+            return len(ids), sum(ids), name
+
+        script_path = self.create_test_script(count_ids)
+        ids = list(range(100000))
+        cmd = generate_command_for_argparseFromDoc(script_path, count_ids, spill_dir=self.tempdir, ids=ids,
+                                                   name="a@b")
+        self.assertLess(len(cmd), 1000)
+        self.assertEqual(cmd.split()[-1][0], "@")
+        result = subprocess.check_output(shlex.split(cmd), text=True)
+        self.assertEqual(eval(result), (len(ids), sum(ids), "a@b"))
+
+        cmd = generate_command_for_argparseFromDoc(script_path, count_ids, spill_dir=self.tempdir, max_length=50,
+                                                   ids=[1, 2], name="@not_a_file")
+        result = subprocess.check_output(shlex.split(cmd), text=True)
+        self.assertEqual(eval(result), (2, 3, "@not_a_file"))
+        self.assertEqual(len([f for f in os.listdir(self.tempdir) if f.endswith(".args")]), 2)
+
+        generator = CommandGenerator(count_ids, path=script_path, python_executable=sys.executable,
+                                     spill_dir=self.tempdir)
+        self.assertEqual(generator.get_argv(ids=[1]), [sys.executable, script_path, "--ids", "1"])
+        argv = generator.get_argv(ids=ids)
+        self.assertEqual(len(argv), 3)
+        self.assertEqual(eval(subprocess.check_output(argv, text=True)), (len(ids), sum(ids), "x"))
+        self.assertEqual(generator.get_command(ids=ids), " ".join(map(shlex.quote, argv)))
+
     def test_list_handling(self):
         def sum_list(numbers: List[float]):
             """
@@ -342,6 +378,113 @@ if __name__ == "__main__":
         self.assertEqual(result["required_list"], [1])
         self.assertEqual(result["optional_list"], [2., 3.])
 
+
+def sweep_point(name: str, sizes: List[int], verbose: bool = False, use_gpu: bool = True,
+                inputFile: Optional[TextIO] = None, scale: Optional[float] = None, seed: int = 1):
+    """
+    @param name: the name
+    @param sizes: the sizes
+    @param verbose: print more
+    @param use_gpu: use the gpu
+    @param inputFile: an input file
+    @param scale: the scale
+    @param seed: the seed
+    """
+    return locals()
+
+
+class TestCommandGenerator(TestCase):
+
+    def test_same_args_as_generate_args(self):
+        generator = CommandGenerator(sweep_point)
+        with open(__file__) as f:
+            for kwargs in [dict(name="a", sizes=[1, 2]),
+                           dict(name="a b", sizes=(3,), verbose=True, use_gpu=False, scale=0.5, seed=2),
+                           dict(name="a", sizes=[], verbose=False, use_gpu=True, scale=None),
+                           dict(name="a", sizes=[1], inputFile=f, unknown=3),
+                           dict(name="a", sizes=[1], inputFile="some/file")]:
+                self.assertEqual(generator.get_args(**kwargs), generate_args_for_argparseFromDoc(sweep_point, **kwargs))
+        self.assertRaises(ValueError, generator.get_args, name="a")
+        self.assertRaises(ValueError, generator.get_args, name="a", sizes=1)
+        generator = CommandGenerator(sweep_point, args_to_ignore=["seed"], args_optional=["sizes"])
+        self.assertEqual(generator.get_args(name="a", seed=3),
+                         generate_args_for_argparseFromDoc(sweep_point, args_to_ignore=["seed"],
+                                                           args_optional=["sizes"], name="a", seed=3))
+
+    def test_commands(self):
+        self.assertRaises(ValueError, CommandGenerator(sweep_point).get_command, name="a", sizes=[1])
+        generator = CommandGenerator(sweep_point, path="my_package.script", use_module=True, python_executable="python3")
+        self.assertEqual(generator.get_command(name="a b", sizes=[1, 2], verbose=True),
+                         "python3 -m my_package.script --name 'a b' --sizes 1 2 --verbose")
+
+
+class TestSweeps(TestCase):
+
+    def test_sweep_kwargs(self):
+        points = list(iter_sweep_kwargs(dict(name="a", seed=0), product=dict(seed=[1, 2], scale=[0.5]),
+                                        zipped=dict(sizes=[[1], [2]], verbose=[True, False]),
+                                        overrides=[{}, dict(name="b")]))
+        self.assertEqual(len(points), 8)
+        self.assertEqual(points[0], dict(name="a", seed=1, scale=0.5, sizes=[1], verbose=True))
+        self.assertEqual(points[-1], dict(name="b", seed=2, scale=0.5, sizes=[2], verbose=False))
+        self.assertEqual(list(iter_sweep_kwargs()), [{}])
+        self.assertRaises(ValueError, list, iter_sweep_kwargs(zipped=dict(a=[1], b=[1, 2])))
+        self.assertRaises(ValueError, list, iter_sweep_kwargs(zipped=dict(a=iter([1])), overrides=[{}]))
+        self.assertRaises(ValueError, list, iter_sweep_kwargs(product=dict(a=[1, 2]), zipped=dict(a=[3], b=[4])))
+        huge = iter_sweep_kwargs(product=dict(seed=range(10 ** 7), scale=[1, 2]))
+        self.assertEqual(next(itertools.islice(huge, 10 ** 4, None)), dict(seed=5000, scale=1))
+
+    def test_sweep_commands(self):
+        commands = iter_sweep_commands(sweep_point, "script.py", base=dict(name="x y", sizes=[1]),
+                                       product=dict(seed=range(2)), overrides=({"verbose": v} for v in [False, True]))
+        self.assertEqual(list(commands), ["python script.py --name 'x y' --sizes 1 --seed 0",
+                                          "python script.py --name 'x y' --sizes 1 --seed 1",
+                                          "python script.py --name 'x y' --sizes 1 --verbose --seed 0",
+                                          "python script.py --name 'x y' --sizes 1 --verbose --seed 1"])
+        argvs = iter_sweep_commands(sweep_point, base=dict(name="a"), zipped=dict(sizes=[[1, 2], [3]]), as_argv=True)
+        self.assertEqual(list(argvs), [["--name", "a", "--sizes", "1", "2"], ["--name", "a", "--sizes", "3"]])
+        self.assertRaises(ValueError, iter_sweep_commands, sweep_point, "script.py", product=dict(other=[1]))
+        self.assertRaises(ValueError, list, iter_sweep_commands(sweep_point, as_argv=True, base=dict(name="a"),
+                                                                product=dict(sizes=[[1], ["x"]])))
+        self.assertRaises(ValueError, list, iter_sweep_commands(sweep_point, as_argv=True, base=dict(name="a")))
+
+    def test_write_sweep_commands(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            job_file = os.path.join(tmpdir, "jobs.txt")
+            self.assertEqual(write_sweep_commands(job_file, sweep_point, "script.py", base=dict(name="a"),
+                                                  product=dict(sizes=[[1], [2]])), 2)
+            with open(job_file) as f:
+                self.assertEqual(f.read().splitlines(), ["python script.py --name a --sizes 1",
+                                                         "python script.py --name a --sizes 2"])
+            bad_file = os.path.join(tmpdir, "bad.txt")
+            self.assertRaises(ValueError, write_sweep_commands, bad_file, sweep_point, "script.py",
+                              base=dict(name="a"), product=dict(sizes=[[1], ["x"]]))
+            self.assertEqual(os.listdir(tmpdir), ["jobs.txt"])
+            write_sweep_commands(job_file, sweep_point, "script.py", base=dict(name="a"),
+                                 product=dict(sizes=[[1], [2]]), max_length=30)
+            spill_dir = job_file + ".args"
+            self.assertEqual(len(os.listdir(spill_dir)), 2)
+            self.assertEqual(os.stat(spill_dir).st_mode & 0o777, 0o700)
+
+    def test_spill_args_replaces_other_files(self):
+        from argParseFromDoc.commandStrGenerator import spill_args
+        with tempfile.TemporaryDirectory() as tmpdir:
+            arg_file = spill_args(["--a", "1"], tmpdir)[1:]
+            self.assertEqual(spill_args(["--a", "1"], tmpdir)[1:], arg_file)
+            with open(arg_file, "w") as f:
+                f.write("--a\n2\n")  # A file with the same name but other arguments
+            spill_args(["--a", "1"], tmpdir)
+            with open(arg_file) as f:
+                self.assertEqual(f.read(), "--a\n1\n")
+            planted = os.path.join(tmpdir, "planted")
+            with open(planted, "w") as f:
+                f.write("--a\n1\n")
+            os.remove(arg_file)
+            os.symlink(planted, arg_file)
+            spill_args(["--a", "1"], tmpdir)
+            self.assertFalse(os.path.islink(arg_file))
+
+
 if __name__ == '__main__':
     import unittest
 
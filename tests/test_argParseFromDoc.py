@@ -55,6 +55,27 @@ class Test(TestCase):
         result = fun1( ** vars(args))
         self.assertTrue( result == ["10", "1-1"] )
 
+    def test_get_parser_large_default(self):
+        def fun1(a: int, ns: List[int] = tuple(range(1000)))-> int:
+            '''
+            :param a: input to add
+            :param ns: input param iterable
+            :return: an int
+            '''
+            return a + sum(ns)
+
+        parser = get_parser_from_function(fun1)
+
+        with StringIO() as strFile:
+            parser.print_help(strFile)
+            strFile.seek(0)
+            help_str = " ".join(strFile.read().split())
+            self._check_help(help_str, ["Default=(0, 1, 2, 3, 4, 5, 6, 7, 8, 9, ...) (1000 items)"])
+            self.assertNotIn("999", help_str)
+
+        args = parser.parse_args(["--a", "1"])
+        self.assertTrue(fun1(**vars(args)) == 1 + sum(range(1000)))
+
     def test_get_parser_file(self):
         def fun1(a: TextIO)-> int:
             '''
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import TestCase, mock
+
+from argParseFromDoc import OutputFile, parse_function_and_call, parse_function_and_call_batch
+from argParseFromDoc.asyncExecution import iter_function_calls_async
+
+_RUNNING = [0, 0]  # current, max
+
+
+async def fetch(key: str, delay: float = 0.05, fail: bool = False):
+    '''
+    @param key: the key to fetch
+    @param delay: seconds to wait
+    @param fail: raise an error
+    '''
+    _RUNNING[0] += 1
+    _RUNNING[1] = max(_RUNNING)
+    try:
+        await asyncio.sleep(delay)
+    finally:
+        _RUNNING[0] -= 1
+    if fail:
+        raise RuntimeError("asked to fail")
+    return key.upper()
+
+
+async def save(outFile: OutputFile, text: str):
+    '''
+    @param outFile: the output file
+    @param text: the text to write
+    '''
+    await asyncio.sleep(0)
+    outFile.write(text)
+    return text
+
+
+class TestAsyncExecution(TestCase):
+
+    def setUp(self):
+        _RUNNING[:] = [0, 0]
+
+    def test_parse_function_and_call(self):
+        with mock.patch("sys.argv", ["fetch", "--key", "abc", "--delay", "0"]):
+            self.assertEqual(parse_function_and_call(fetch), "ABC")
+
+    def test_running_event_loop(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "out.txt")
+
+            async def main():
+                with mock.patch("sys.argv", ["save", "--outFile", fname, "--text", "hello"]):
+                    awaitable = parse_function_and_call(save)
+                self.assertFalse(os.path.exists(fname))
+                return await awaitable
+            self.assertEqual(asyncio.run(main()), "hello")
+            with open(fname) as f:
+                self.assertEqual(f.read(), "hello")
+            self.assertEqual(os.listdir(tmpdir), ["out.txt"])
+
+    def test_concurrency_limit(self):
+        async def collect():
+            return [r async for r in iter_function_calls_async(fetch, ["--key k%d" % i for i in range(20)],
+                                                               max_concurrency=5)]
+        start = time.perf_counter()
+        results = asyncio.run(collect())
+        elapsed = time.perf_counter() - start
+        self.assertEqual(sorted((r.index, r.result) for r in results), [(i, "K%d" % i) for i in range(20)])
+        self.assertEqual(_RUNNING[1], 5)
+        self.assertLess(elapsed, 20 * 0.05 / 2)
+
+    def test_batch(self):
+        output = StringIO()
+        inputs = ["--key a", "--key b --fail", "", "--delay x", '--key "c d"']
+        self.assertEqual(parse_function_and_call_batch(fetch, inputs, output=output, max_concurrency=3), (2, 2))
+        self.assertEqual(len(output.getvalue().splitlines()), 4)
+        self.assertIn('"result": "C D"', output.getvalue())
+        self.assertEqual(parse_function_and_call_batch(fetch, ["--key a --delay 0"], output=StringIO()), (1, 0))
@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from typing import List
+from unittest import TestCase
+
+from argParseFromDoc import parse_function_and_call_batch
+from argParseFromDoc.batchExecution import iter_function_calls
+
+
+def add(a: int, b: List[int] = (0,), fail: bool = False):
+    '''
+    @param a: first number
+    @param b: numbers to add
+    @param fail: raise an error
+    '''
+    if fail:
+        raise RuntimeError("asked to fail")
+    return a + sum(b)
+
+
+class TestBatchExecution(TestCase):
+
+    def test_argv_lines(self):
+        lines = ["--a 1", "", "# a comment", "--a 2 --b 3 4", "--a x", "--a 1 --fail", "--b 1", "--a 5"]
+        results = list(iter_function_calls(add, lines))
+        self.assertEqual([r.index for r in results], [0, 3, 4, 5, 6, 7])
+        self.assertEqual([r.result for r in results], [1, 9, None, None, None, 5])
+        self.assertEqual([r.ok for r in results], [True, True, False, False, False, True])
+        self.assertIn("invalid int value", results[2].error)
+        self.assertIn("asked to fail", results[3].error)
+        self.assertIn("required", results[4].error)
+
+    def test_jsonl_lines(self):
+        lines = ['{"a": 1, "b": [2, 3]}', '["--a", 4]', '{"a": 1, "fail": true}', '{"a": ', '3']
+        results = list(iter_function_calls(add, lines, input_format="jsonl"))
+        self.assertEqual([r.result for r in results], [6, 4, None, None, None])
+        self.assertEqual([r.ok for r in results], [True, True, False, False, False])
+
+    def test_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname_in = os.path.join(tmpdir, "in.txt")
+            fname_out = os.path.join(tmpdir, "out.jsonl")
+            with open(fname_in, "w") as f:
+                f.write("--a 1\n--a 2 --b 2\n--a one\n")
+            self.assertEqual(parse_function_and_call_batch(add, fname_in, output=fname_out), (2, 1))
+            with open(fname_out) as f:
+                out = [json.loads(line) for line in f]
+        self.assertEqual(out[:2], [dict(index=0, ok=True, result=1), dict(index=1, ok=True, result=4)])
+        self.assertFalse(out[2]["ok"])
+
+    def test_stream_output(self):
+        output = StringIO()
+        self.assertEqual(parse_function_and_call_batch(add, StringIO("--a 1\n--help\n"), output=output), (1, 1))
+        self.assertEqual(len(output.getvalue().splitlines()), 2)
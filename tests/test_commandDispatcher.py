@@ -0,0 +1,67 @@
+import os
+import shutil
+import sys
+import tempfile
+from io import StringIO
+from unittest import TestCase, mock
+
+from argParseFromDoc.commandDispatcher import CommandDispatcher
+
+MODULE_TEMPLATE = '''
+from typing import List
+
+def %(name)s(a: int, b: List[int] = (1, 2)):
+    """
+    @param a: first number
+    @param b: numbers to add
+    """
+    return "%(name)s", a + sum(b)
+'''
+
+
+class TestCommandDispatcher(TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        sys.path.insert(0, self.tempdir)
+        self.dispatcher = CommandDispatcher("tool")
+        for i in range(20):
+            name = "cmd%d" % i
+            with open(os.path.join(self.tempdir, "dispatched_%s.py" % name), "w") as f:
+                f.write(MODULE_TEMPLATE % dict(name=name))
+            self.dispatcher.add_command("dispatched_%s:%s" % (name, name), help="command number %d" % i)
+
+    def tearDown(self):
+        sys.path.remove(self.tempdir)
+        for name in [name for name in sys.modules if name.startswith("dispatched_")]:
+            del sys.modules[name]
+        shutil.rmtree(self.tempdir)
+
+    def _imported(self):
+        return sorted(name for name in sys.modules if name.startswith("dispatched_"))
+
+    def test_only_selected_command_is_imported(self):
+        self.assertEqual(self.dispatcher.list_commands(), ["cmd%d" % i for i in range(20)])
+        with mock.patch("sys.stdout", new_callable=StringIO) as stdout:
+            with self.assertRaises(SystemExit):
+                self.dispatcher.run(["--help"])
+        self.assertIn("cmd7", stdout.getvalue())
+        self.assertIn("command number 7", stdout.getvalue())
+        self.assertEqual(self._imported(), [])
+
+        self.assertEqual(self.dispatcher.run(["cmd3", "--a", "1"]), ("cmd3", 4))
+        self.assertEqual(self._imported(), ["dispatched_cmd3"])
+
+    def test_static_command_help(self):
+        self.dispatcher.static = True
+        with mock.patch("sys.stdout", new_callable=StringIO) as stdout:
+            with self.assertRaises(SystemExit):
+                self.dispatcher.run(["cmd5", "--help"])
+        self.assertIn("usage: tool cmd5", stdout.getvalue())
+        self.assertEqual(self._imported(), [])
+        self.assertEqual(self.dispatcher.run(["cmd5", "--a", "1", "--b", "3"]), ("cmd5", 4))
+
+    def test_unknown_command(self):
+        with mock.patch("sys.stderr", new_callable=StringIO) as stderr:
+            with self.assertRaises(SystemExit):
+                self.dispatcher.run(["cmd100", "--a", "1"])
+        self.assertIn("unknown command 'cmd100'", stderr.getvalue())
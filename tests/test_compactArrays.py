@@ -0,0 +1,99 @@
+import array
+import sys
+from io import StringIO
+from typing import List, Optional
+from unittest import TestCase, mock, skipUnless
+
+from argParseFromDoc import get_parser_from_function
+from argParseFromDoc.compactArrays import CompactArrayType, set_compact_lists
+from argParseFromDoc.fastParser import get_fast_parser_from_function
+from argParseFromDoc.parserCompiler import compile_spec
+from argParseFromDoc.autoArgparseFunction import get_spec_from_function
+from argParseFromDoc.specCache import invalidate_spec
+
+try:
+    import numpy
+    import numpy.typing
+except ImportError:
+    numpy = None
+
+
+def fun(ids: array.array = array.array("q", [1, 2]), weights: Optional[array.array] = None):
+    '''
+    @param ids: the ids
+    @param weights: the weights
+    '''
+    return ids
+
+
+def fun_list(ids: List[int], weights: List[float] = (0.5,)):
+    '''
+    @param ids: the ids
+    @param weights: the weights
+    '''
+    return ids
+
+
+class TestCompactArrays(TestCase):
+
+    def setUp(self):
+        invalidate_spec()
+
+    def tearDown(self):
+        set_compact_lists(None)
+        invalidate_spec()
+
+    def test_array(self):
+        for parser in [get_parser_from_function(fun), get_fast_parser_from_function(fun)]:
+            args = parser.parse_args(["--ids", "3", "-4", "5", "--weights", "0.5", "1e3"])
+            self.assertEqual(args.ids, array.array("q", [3, -4, 5]))
+            self.assertEqual(args.weights, array.array("d", [0.5, 1000.]))
+            args = parser.parse_args([])
+            self.assertEqual(args.ids, array.array("q", [1, 2]))
+            self.assertIsNone(args.weights)
+
+    def test_invalid_values(self):
+        for parser in [get_parser_from_function(fun), get_fast_parser_from_function(fun)]:
+            for argv in [["--ids", "1", "x"], ["--ids", "1.5"], ["--ids", str(2 ** 70)]]:
+                with mock.patch("sys.stderr", new_callable=StringIO) as stderr:
+                    with self.assertRaises(SystemExit):
+                        parser.parse_args(argv)
+                self.assertIn("argument --ids: invalid q values", stderr.getvalue())
+
+    def test_compact_lists(self):
+        self.assertEqual(get_parser_from_function(fun_list).parse_args(["--ids", "1"]).ids, [1])
+        set_compact_lists("array")
+        args = get_fast_parser_from_function(fun_list).parse_args(["--ids", "1", "2"])
+        self.assertEqual((args.ids, args.weights), (array.array("q", [1, 2]), array.array("d", [0.5])))
+        set_compact_lists(None)
+        self.assertEqual(get_parser_from_function(fun_list).parse_args(["--ids", "1"]).ids, [1])
+
+    def test_compile(self):
+        namespace = {}
+        exec(compile_spec(get_spec_from_function(fun), "tests.test_compactArrays:fun"), namespace)
+        self.assertEqual(namespace["parse_args"](["--ids", "7"]).ids, array.array("q", [7]))
+        self.assertEqual(namespace["parse_args"]([]).ids, array.array("q", [1, 2]))
+
+    @skipUnless(numpy is not None, "numpy is not installed")
+    def test_ndarray(self):
+        def fun_numpy(ids: numpy.typing.NDArray[numpy.int32],
+                      weights: numpy.ndarray[tuple, numpy.dtype[numpy.float32]] = (1., 2.)):
+            '''
+            @param ids: the ids
+            @param weights: the weights
+            '''
+            return ids
+        self.assertEqual(get_spec_from_function(fun_numpy)[0].typeFun, CompactArrayType("ndarray", "int32"))
+        for parser in [get_parser_from_function(fun_numpy), get_fast_parser_from_function(fun_numpy)]:
+            args = parser.parse_args(["--ids", "3", "-4", "--weights", "0.5"])
+            self.assertEqual((args.ids.dtype, args.ids.tolist()), (numpy.int32, [3, -4]))
+            self.assertEqual((args.weights.dtype, args.weights.tolist()), (numpy.float32, [0.5]))
+            self.assertEqual(parser.parse_args(["--ids", "1"]).weights.tolist(), [1., 2.])
+            with mock.patch("sys.stderr", new_callable=StringIO):
+                with self.assertRaises(SystemExit):
+                    parser.parse_args(["--ids", str(2 ** 40)])
+            for weights in [["1", "", "3 4"], ["1", "x"]]:
+                with mock.patch("sys.stderr", new_callable=StringIO) as stderr:
+                    with self.assertRaises(SystemExit):
+                        parser.parse_args(["--ids", "1", "--weights"] + weights)
+                self.assertIn("argument --weights: invalid float32 values", stderr.getvalue())
@@ -0,0 +1,51 @@
+from io import StringIO
+from typing import List, Literal, Optional
+from unittest import TestCase, mock
+
+from argParseFromDoc import get_parser_from_function
+from argParseFromDoc.fastParser import get_fast_parser_from_function
+
+
+def fun(a: int, ratios: List[float] = (1., 2.), mode: Literal["fast", "slow"] = "fast",
+        name: Optional[str] = None, count: int = "3", verbose: bool = False, normalize: bool = True):
+    '''
+    @param a: a number
+    @param ratios: some ratios
+    @param mode: the mode
+    @param name: an optional name
+    @param count: a number with a string default
+    @param verbose: print more
+    @param normalize: normalize the inputs
+    '''
+    return a
+
+
+class TestFastParser(TestCase):
+
+    def setUp(self):
+        self.parser = get_parser_from_function(fun, prog="fun")
+        self.fast_parser = get_fast_parser_from_function(fun)
+
+    def test_same_namespace_as_argparse(self):
+        for argv in [["--a", "1"],
+                     ["--a", "-1", "--ratios", "-0.5", ".5", "3", "--mode", "slow"],
+                     ["--a=2", "--name", "-", "--count", "7", "--verbose", "--NOT_normalize"],
+                     ["--a", "1", "--a", "2", "--ratios=4"],
+                     ["--verbose", "--a", "5", "--name", ""]]:
+            with mock.patch.object(self.fast_parser, "_get_fallback_parser", side_effect=AssertionError(argv)):
+                self.assertEqual(self.fast_parser.parse_args(argv), self.parser.parse_args(argv))
+
+    def test_fallback_to_argparse(self):
+        self.assertEqual(self.fast_parser.parse_args(["--a", "1", "--rat", "3"]).ratios, [3.])  # abbreviation
+        for argv in [[], ["--a", "x"], ["--a", "1", "--mode", "medium"], ["--a"], ["--a", "1", "--ratios"],
+                     ["--a", "1", "extra"], ["--a", "1", "--unknown", "1"], ["--a", "1", "--verbose=1"]]:
+            with mock.patch("sys.stderr", new_callable=StringIO) as stderr:
+                with self.assertRaises(SystemExit):
+                    self.fast_parser.parse_args(argv)
+            self.assertIn("error:", stderr.getvalue())
+
+    def test_help(self):
+        with mock.patch("sys.stdout", new_callable=StringIO) as stdout:
+            with self.assertRaises(SystemExit):
+                self.fast_parser.parse_args(["--help"])
+        self.assertIn("--NOT_normalize       normalize the inputs", stdout.getvalue())
@@ -0,0 +1,289 @@
+import bz2
+import gzip
+import io
+import lzma
+import mmap
+import os
+import sys
+import tempfile
+from io import StringIO
+from typing import Iterator, List, Optional, TextIO
+from unittest import TestCase, mock, skipUnless
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from argParseFromDoc import BinaryOutputFile, OutputFile, get_parser_from_function, parse_function_and_call
+from argParseFromDoc.fileTypes import LazyFile, LazyFileType, get_max_open_files, set_max_open_files
+
+
+def count_lines(inputFiles: List[TextIO]):
+    '''
+    @param inputFiles: the files to read
+    '''
+    return [len(f.readlines()) for f in inputFiles]
+
+
+def find_magic(data: mmap.mmap, view: memoryview):
+    '''
+    @param data: a binary file
+    @param view: another binary file
+    '''
+    return data.find(b"MAGIC"), bytes(view[:5])
+
+
+def stream(lines: Iterator[str], chunks: Optional[Iterator[bytes]] = None):
+    '''
+    @param lines: a text file
+    @param chunks: a binary file
+    '''
+    return lines, chunks
+
+
+def write_report(outFile: OutputFile, fail: bool = False):
+    '''
+    @param outFile: the output file
+    @param fail: raise after writing
+    '''
+    outFile.write("partial\n")
+    if fail:
+        raise RuntimeError("failed")
+    outFile.write("done\n")
+    return os.listdir(os.path.dirname(outFile.name))
+
+
+def write_bytes(outFile: BinaryOutputFile):
+    '''
+    @param outFile: the output file
+    '''
+    outFile.write(b"data")
+
+
+class TestFileTypes(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.fnames = []
+        for i in range(20):
+            fname = os.path.join(self.tmpdir.name, "f%d.txt" % i)
+            with open(fname, "w") as f:
+                f.write("".join("file %d line %d\n" % (i, j) for j in range(i + 1)))
+            self.fnames.append(fname)
+        self.max_open_files = get_max_open_files()
+
+    def tearDown(self):
+        set_max_open_files(self.max_open_files)
+        self.tmpdir.cleanup()
+
+    def test_lazy_opening(self):
+        args = get_parser_from_function(count_lines).parse_args(["--inputFiles"] + self.fnames)
+        self.assertTrue(all(isinstance(f, LazyFile) and not f.is_open for f in args.inputFiles))
+        self.assertEqual(count_lines(**vars(args)), list(range(1, 21)))
+
+    def test_open_files_budget(self):
+        set_max_open_files(3)
+        files = [LazyFileType("r")(fname) for fname in self.fnames]
+        lines = [[] for _ in files]
+        for _ in range(3):
+            for f, file_lines in zip(files, lines):
+                file_lines.append(f.readline())
+                self.assertLessEqual(sum(f.is_open for f in files), 3)
+        for i, (f, file_lines) in enumerate(zip(files, lines)):
+            file_lines.extend(f)
+            self.assertEqual("".join(file_lines), "".join("file %d line %d\n" % (i, j) for j in range(i + 1)))
+            f.close()
+
+    def test_next_reopens_at_position(self):
+        set_max_open_files(1)
+        fnames = []
+        for name in ["a", "b"]:
+            fnames.append(os.path.join(self.tmpdir.name, name))
+            with open(fnames[-1], "w") as f:
+                f.write("".join("%s%d\n" % (name, i) for i in range(1, 4)))
+        a, b = [LazyFileType("r")(fname) for fname in fnames]
+        lines = [next(f).strip() for _ in range(3) for f in (a, b)]
+        self.assertEqual(lines, ["a1", "b1", "a2", "b2", "a3", "b3"])
+        self.assertRaises(StopIteration, next, a)
+        a.close()
+        b.close()
+
+    def test_write_reopen_appends(self):
+        set_max_open_files(1)
+        out1, out2 = [LazyFileType("w")(os.path.join(self.tmpdir.name, name)) for name in ["o1", "o2"]]
+        for i in range(3):
+            out1.write("a%d" % i)
+            out2.write("b%d" % i)
+        out1.close()
+        out2.close()
+        with open(out1.name) as f1, open(out2.name) as f2:
+            self.assertEqual((f1.read(), f2.read()), ("a0a1a2", "b0b1b2"))
+
+    def test_stdin_and_errors(self):
+        self.assertIs(LazyFileType("r")("-"), sys.stdin)
+        self.assertIs(LazyFileType("w")("-"), sys.stdout)
+        with mock.patch("sys.stderr", new_callable=StringIO) as stderr:
+            with self.assertRaises(SystemExit):
+                get_parser_from_function(count_lines).parse_args(["--inputFiles", self.fnames[0], "missing.txt"])
+        self.assertIn("can't open 'missing.txt'", stderr.getvalue())
+
+    def test_mapped_files(self):
+        fname = os.path.join(self.tmpdir.name, "data.bin")
+        with open(fname, "wb") as f:
+            f.write(b"\0" * 1000 + b"MAGIC")
+        args = get_parser_from_function(find_magic).parse_args(["--data", fname, "--view", fname])
+        self.assertIsInstance(args.data, mmap.mmap)
+        self.assertTrue(args.view.readonly)
+        self.assertEqual(find_magic(**vars(args)), (1000, b"\0" * 5))
+        stdin = mock.Mock(buffer=io.BytesIO(b"xxMAGIC"))
+        with mock.patch("sys.stdin", stdin):
+            args = get_parser_from_function(find_magic).parse_args(["--data", "-", "--view", fname])
+        self.assertEqual(args.data.find(b"MAGIC"), 2)
+        empty = os.path.join(self.tmpdir.name, "empty.bin")
+        open(empty, "wb").close()
+        args = get_parser_from_function(find_magic).parse_args(["--data", empty, "--view", empty])
+        self.assertEqual((args.data, bytes(args.view)), (b"", b""))
+
+    def test_file_iterators(self):
+        fname = os.path.join(self.tmpdir.name, "data.bin")
+        with open(fname, "wb") as f:
+            f.write(b"x" * 5000)
+        parser = get_parser_from_function(stream)
+        with mock.patch("sys.stdin", io.StringIO("a\nb\n")):
+            lines, chunks = stream(**vars(parser.parse_args(["--lines", self.fnames[2], "--chunks", fname])))
+            self.assertEqual(list(lines), ["file 2 line %d\n" % i for i in range(3)])
+            self.assertEqual(list(parser.parse_args(["--lines", "-"]).lines), ["a\n", "b\n"])
+        self.assertIsNone(parser.parse_args(["--lines", "-"]).chunks)
+        from argParseFromDoc.fileTypes import FileIteratorType
+        self.assertEqual([len(chunk) for chunk in FileIteratorType("chunks", chunk_size=2048)(fname)],
+                         [2048, 2048, 904])
+        self.assertEqual(len(b"".join(chunks)), 5000)
+
+    def test_compressed_files(self):
+        fnames = []
+        for module, suffix in [(gzip, ".gz"), (bz2, ".bz2"), (lzma, ".xz"), (gzip, ".data")]:
+            fnames.append(os.path.join(self.tmpdir.name, "f" + suffix))
+            with module.open(fnames[-1], "wt") as f:
+                f.write("line\n" * 5)
+        args = get_parser_from_function(count_lines).parse_args(["--inputFiles"] + fnames + self.fnames[:1])
+        self.assertEqual(count_lines(**vars(args)), [5, 5, 5, 5, 1])
+        self.assertEqual(list(get_parser_from_function(stream).parse_args(["--lines", fnames[2]]).lines),
+                         ["line\n"] * 5)
+        self.assertEqual(LazyFileType("rb")(fnames[1]).read(), b"line\n" * 5)
+        self.assertEqual(LazyFileType("rb", decompress=False)(fnames[0]).read(2), b"\x1f\x8b")
+        text_fname = os.path.join(self.tmpdir.name, "text.txt")
+        with open(text_fname, "w") as f:
+            f.write("BZhello world\n")  # Starts like a bz2 file
+        self.assertEqual(LazyFileType("r")(text_fname).read(), "BZhello world\n")
+        self.assertEqual(list(get_parser_from_function(stream).parse_args(["--lines", text_fname]).lines),
+                         ["BZhello world\n"])
+
+    @skipUnless(hasattr(os, "mkfifo"), "os.mkfifo is not available")
+    def test_named_pipes(self):
+        import threading
+        for kind in ["lazy", "iterator"]:
+            fname = os.path.join(self.tmpdir.name, "pipe_" + kind)
+            os.mkfifo(fname)
+            parser = get_parser_from_function(stream if kind == "iterator" else count_lines)
+            args = parser.parse_args(["--lines" if kind == "iterator" else "--inputFiles", fname])
+
+            def write():
+                with open(fname, "w") as f:
+                    f.write("hello\nworld\nline2\n")
+            writer = threading.Thread(target=write)
+            writer.start()
+            if kind == "iterator":
+                self.assertEqual(list(args.lines), ["hello\n", "world\n", "line2\n"])
+            else:
+                self.assertEqual(args.inputFiles[0].read(), "hello\nworld\nline2\n")
+            writer.join()
+
+    def test_compressed_output_and_stdin(self):
+        fname = os.path.join(self.tmpdir.name, "out.txt.gz")
+        out = LazyFileType("w")(fname)
+        out.write("hello\n")
+        out.close()
+        with gzip.open(fname, "rt") as f:
+            self.assertEqual(f.read(), "hello\n")
+        stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(gzip.compress(b"a\nb\n"))))
+        with mock.patch("sys.stdin", stdin):
+            self.assertEqual(LazyFileType("r")("-").readlines(), ["a\n", "b\n"])
+
+    def test_atomic_output_files(self):
+        fname = os.path.join(self.tmpdir.name, "report.txt")
+        with mock.patch("sys.argv", ["prog", "--outFile", fname]):
+            files_during_call = parse_function_and_call(write_report)
+        self.assertEqual(len(files_during_call), len(self.fnames) + 1)
+        self.assertNotIn("report.txt", files_during_call)
+        with open(fname) as f:
+            self.assertEqual(f.read(), "partial\ndone\n")
+        with mock.patch("sys.argv", ["prog", "--outFile", fname, "--fail"]):
+            self.assertRaises(RuntimeError, parse_function_and_call, write_report)
+        with open(fname) as f:
+            self.assertEqual(f.read(), "partial\ndone\n")
+        self.assertEqual(len(os.listdir(self.tmpdir.name)), len(self.fnames) + 1)
+
+    def test_direct_calls_commit_at_exit(self):
+        import subprocess
+        code = ("import sys; sys.path.insert(0, %r)\n"
+                "from test_fileTypes import write_report\n"
+                "from argParseFromDoc import get_parser_from_function\n"
+                "write_report(**vars(get_parser_from_function(write_report).parse_args()))\n"
+                % os.path.dirname(__file__))
+        for name, extra_args, returncode in [("ok.txt", [], 0), ("failed.txt", ["--fail"], 1)]:
+            fname = os.path.join(self.tmpdir.name, name)
+            process = subprocess.run([sys.executable, "-c", code, "--outFile", fname] + extra_args,
+                                     capture_output=True)
+            self.assertEqual(process.returncode, returncode)
+        with open(os.path.join(self.tmpdir.name, "ok.txt")) as f:
+            self.assertEqual(f.read(), "partial\ndone\n")
+        self.assertEqual(len(os.listdir(self.tmpdir.name)), len(self.fnames) + 1)  # No temporary files
+
+    def test_atomic_output_file_types(self):
+        parser = get_parser_from_function(write_bytes)
+        stdout = io.TextIOWrapper(io.BytesIO())
+        with mock.patch("sys.stdout", stdout):
+            self.assertIs(parser.parse_args(["--outFile", "-"]).outFile, stdout.buffer)
+        with mock.patch("sys.stderr", StringIO()):
+            self.assertRaises(SystemExit, parser.parse_args, ["--outFile", os.path.join(self.tmpdir.name, "no", "f")])
+        from argParseFromDoc.fileTypes import AtomicOutputFileType, set_output_buffer_size
+        fname = os.path.join(self.tmpdir.name, "out.bin.gz")
+        set_output_buffer_size(1 << 16)
+        try:
+            with AtomicOutputFileType("wb")(fname) as out:
+                self.assertEqual(out._bufsize, 1 << 16)
+                out.write(b"data" * 10)
+                self.assertFalse(os.path.exists(fname))
+        finally:
+            set_output_buffer_size(1 << 20)
+        with gzip.open(fname) as f:
+            self.assertEqual(f.read(), b"data" * 10)
+        empty = os.path.join(self.tmpdir.name, "empty.txt")
+        AtomicOutputFileType("w")(empty).close()
+        self.assertEqual(os.path.getsize(empty), 0)
+
+    @skipUnless(numpy is not None, "numpy is not installed")
+    def test_numpy_files(self):
+        def fun(data: numpy.ndarray, extra: Optional[numpy.ndarray] = None):
+            '''
+            @param data: a .npy or .npz file
+            @param extra: another one
+            '''
+            return data, extra
+        npy = os.path.join(self.tmpdir.name, "a.npy")
+        npz = os.path.join(self.tmpdir.name, "b.npz")
+        numpy.save(npy, numpy.arange(10))
+        numpy.savez(npz, x=numpy.ones(3), y=numpy.zeros(2))
+        parser = get_parser_from_function(fun)
+        args = parser.parse_args(["--data", npy, "--extra", npz])
+        self.assertIsInstance(args.data, numpy.memmap)
+        self.assertEqual(args.data.sum(), 45)
+        self.assertEqual(sorted(args.extra.keys()), ["x", "y"])
+        self.assertEqual(args.extra["x"].tolist(), [1, 1, 1])
+        args.extra.close()
+        with mock.patch("sys.stderr", StringIO()):
+            self.assertRaises(SystemExit, parser.parse_args, ["--data", self.fnames[0]])
+        from argParseFromDoc.fileTypes import NumpyFileType
+        self.assertNotIsInstance(NumpyFileType(mmap_mode=None)(npy), numpy.memmap)
+        self.assertEqual(repr(NumpyFileType(mmap_mode=None)), "NumpyFileType(mmap_mode=None)")
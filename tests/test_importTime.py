@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+# Cold import budget, in milliseconds. Can be relaxed on slow machines with ARGPARSEFROMDOC_IMPORT_BUDGET_MS
+IMPORT_BUDGET_MS = float(os.environ.get("ARGPARSEFROMDOC_IMPORT_BUDGET_MS", 150))
+
+
+class TestImportTime(TestCase):
+
+    def _run(self, code):
+        wdir = os.path.dirname(os.path.dirname(__file__))
+        return subprocess.check_output([sys.executable, "-c", code], cwd=wdir, text=True).strip()
+
+    def test_lazy_modules(self):
+        out = self._run("import sys, argParseFromDoc; print(sorted(m for m in sys.modules if m.startswith('argParseFromDoc.')))")
+        self.assertEqual(out, "[]")
+        out = self._run("import sys; from argParseFromDoc import parse_function_and_call, get_parser_from_function; "
+                        "print(sorted(m for m in ['docstring_parser', 'inspect', 'argParseFromDoc.commandStrGenerator'] "
+                        "if m in sys.modules))")
+        self.assertEqual(out, "[]")
+        out = self._run("import sys; from argParseFromDoc import parse_function_and_call; "
+                        "from examples.exampleAdd import add; sys.argv = ['add', '--a', '1', '--b', '2']; "
+                        "parse_function_and_call(add); print('argParseFromDoc.fastParser' in sys.modules)")
+        self.assertEqual(out, "False")
+
+    def test_spec_cache_hit_does_not_parse_docstrings(self):
+        out = self._run("import sys, tempfile; from argParseFromDoc import get_parser_from_function; "
+                        "from examples.exampleAdd import add; d = tempfile.mkdtemp(); "
+                        "get_parser_from_function(add, cache_dir=d); "
+                        "[sys.modules.pop(m) for m in list(sys.modules) if m.startswith('docstring_parser')]; "
+                        "from argParseFromDoc.specCache import invalidate_spec; invalidate_spec(); "
+                        "get_parser_from_function(add, cache_dir=d); print('docstring_parser' in sys.modules)")
+        self.assertEqual(out, "False")
+
+    def test_import_time_budget(self):
+        code = "import time; t = time.perf_counter(); from argParseFromDoc import parse_function_and_call; " \
+               "print(time.perf_counter() - t)"
+        elapsed_ms = min(float(self._run(code)) for _ in range(3)) * 1000
+        self.assertLess(elapsed_ms, IMPORT_BUDGET_MS,
+                        "Importing argParseFromDoc took %.1f ms, above the budget of %.1f ms" %
+                        (elapsed_ms, IMPORT_BUDGET_MS))
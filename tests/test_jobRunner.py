@@ -0,0 +1,182 @@
+import json
+import os
+import shlex
+import sys
+import tempfile
+import time
+from io import StringIO
+from unittest import TestCase, mock, skipUnless
+
+from argParseFromDoc import run_jobs
+from argParseFromDoc.__main__ import main
+from argParseFromDoc.commandStrGenerator import CommandGenerator
+from argParseFromDoc.forkServer import ForkServer
+from argParseFromDoc.jobRunner import get_job_key, read_job_file, read_journal
+
+_SCRIPT = '''
+import heavy_module
+
+
+def divide(a: int, b: int = 1, sleep: float = 0.):
+    """
+    @param a: the numerator
+    @param b: the denominator
+    @param sleep: seconds to wait
+    """
+    import time
+    time.sleep(sleep)
+    return a // b
+
+
+if __name__ == "__main__":
+    from argParseFromDoc import parse_function_and_call
+    print(parse_function_and_call(divide), heavy_module.N_IMPORTS)
+'''
+
+
+def divide(a: int, b: int = 1, sleep: float = 0.):
+    """
+    @param a: the numerator
+    @param b: the denominator
+    @param sleep: seconds to wait
+    """
+    pass
+
+
+def python_job(code: str, *args):
+    return [sys.executable, "-c", code] + [str(arg) for arg in args]
+
+
+class TestJobRunner(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.journal = os.path.join(self.tmpdir.name, "journal.jsonl")
+        self.log_dir = os.path.join(self.tmpdir.name, "logs")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_run_and_resume(self):
+        jobs = [python_job("import sys; print(sys.argv[1]); sys.exit(int(sys.argv[1]) == 2)", i) for i in range(5)]
+        progress = StringIO()
+        summary = run_jobs(jobs, n_workers=2, journal=self.journal, log_dir=self.log_dir, progress=progress)
+        self.assertEqual(summary[:3], (4, 1, 0))
+        self.assertIn("5/5 jobs done, 1 failed, 0 skipped", progress.getvalue())
+        with open(os.path.join(self.log_dir, "3.out")) as f:
+            self.assertEqual(f.read().strip(), "3")
+        self.assertEqual(len(read_journal(self.journal)), 4)
+        self.assertIn(get_job_key(jobs[0]), read_journal(self.journal))
+
+        # The failed job is the only one that runs again
+        summary = run_jobs(jobs, n_workers=2, journal=self.journal, progress=None)
+        self.assertEqual(summary[:3], (0, 1, 4))
+        with open(self.journal) as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual([entry["index"] for entry in entries if not entry["ok"]], [2, 2])
+        self.assertEqual(entries[-1]["error"], "exit status 1")
+
+    def test_timeouts_and_retries(self):
+        counter = os.path.join(self.tmpdir.name, "counter")
+        # Fails the first two times it runs
+        flaky = python_job("import os, sys; n = os.path.getsize(sys.argv[1]) if os.path.exists(sys.argv[1]) else 0; "
+                           "open(sys.argv[1], 'a').write('x'); sys.exit(n < 2)", counter)
+        slow = python_job("import time; time.sleep(10)")
+        summary = run_jobs(iter([flaky, slow, ["/non/existent/program"]]), retries=2, backoff=0.01, timeout=0.5,
+                           journal=self.journal, progress=None)
+        self.assertEqual(summary[:3], (1, 2, 0))
+        self.assertLess(summary.duration, 5)
+        with open(self.journal) as f:
+            entries = sorted((json.loads(line) for line in f), key=lambda entry: entry["index"])
+        self.assertEqual([entry["attempts"] for entry in entries], [3, 3, 3])
+        self.assertEqual(entries[1]["error"], "timeout after 0.5s")
+        self.assertTrue(entries[2]["error"].startswith("FileNotFoundError"))
+
+    def test_errors_stop_pending_jobs(self):
+        def jobs():
+            yield python_job("import sys; sys.exit(1)")
+            yield python_job("import time; time.sleep(10)")
+            raise KeyError("broken job source")
+        start = time.perf_counter()
+        with self.assertRaises(KeyError):
+            run_jobs(jobs(), n_workers=1, retries=1, backoff=10, progress=None)
+        self.assertLess(time.perf_counter() - start, 5)
+
+    def test_jobs_are_consumed_lazily(self):
+        n_done_when_consumed = []
+
+        def jobs():
+            for i in range(5):
+                n_done_when_consumed.append(len(read_journal(self.journal)))
+                yield python_job("import time; time.sleep(0.3)", i)
+        summary = run_jobs(jobs(), n_workers=1, journal=self.journal, progress=StringIO(), progress_interval=0.01)
+        self.assertEqual(summary[:3], (5, 0, 0))
+        # At most 2 * n_workers jobs are in flight, even if no job finishes in a progress_interval
+        self.assertEqual(n_done_when_consumed, [0, 0, 0, 1, 2])
+
+    def test_job_files(self):
+        job_file = os.path.join(self.tmpdir.name, "jobs.txt")
+        with open(job_file, "w") as f:
+            f.write("# a comment\n%s -c 'print(1)'\n\n%s\n" % (sys.executable, json.dumps(python_job("print(2)"))))
+        self.assertEqual(list(read_job_file(job_file)), [python_job("print(1)"), python_job("print(2)")])
+        with mock.patch("sys.stderr", StringIO()) as stderr:
+            main(["jobs", job_file, "-j", "2", "--journal", self.journal])
+        self.assertIn("2 jobs succeeded, 0 failed, 0 skipped", stderr.getvalue())
+
+    @skipUnless(hasattr(os, "fork"), "os.fork is not available")
+    def test_fork_server(self):
+        script = os.path.join(self.tmpdir.name, "script.py")
+        with open(script, "w") as f:
+            f.write(_SCRIPT)
+        counter = os.path.join(self.tmpdir.name, "n_imports")
+        with open(os.path.join(self.tmpdir.name, "heavy_module.py"), "w") as f:
+            f.write("with open(%r, 'a') as f:\n    f.write('x')\nN_IMPORTS = 1\n" % counter)
+        generator = CommandGenerator(divide, path=script, python_executable=sys.executable)
+        jobs = [shlex.split(generator.get_command(a=a, b=b)) for a, b in [(6, 2), (1, 0), (9, 3), (8, 2)]]
+        jobs.append([sys.executable, script, "--a", "1", "--sleep", "10"])
+        jobs.append(python_job("print('not preloaded')"))
+        with ForkServer(script) as fork_server:
+            self.assertEqual(fork_server.get_function_args(jobs[0]), ["--a", "6", "--b", "2"])
+            self.assertIsNone(fork_server.get_function_args(jobs[-1]))
+            summary = run_jobs(jobs, n_workers=3, timeout=2, log_dir=self.log_dir, journal=self.journal,
+                               progress=None, fork_server=fork_server)
+        self.assertEqual(summary[:3], (4, 2, 0))
+        outputs = []
+        for index in range(len(jobs)):
+            with open(os.path.join(self.log_dir, "%d.out" % index)) as f:
+                outputs.append(f.read().strip())
+        self.assertEqual(outputs, ["3 1", "", "3 1", "4 1", "", "not preloaded"])
+        with open(os.path.join(self.log_dir, "1.err")) as f:
+            self.assertIn("ZeroDivisionError", f.read())
+        with open(counter) as f:
+            self.assertEqual(f.read(), "x")  # heavy_module was only imported once
+        with open(self.journal) as f:
+            errors = {entry["index"]: entry["error"] for entry in map(json.loads, f)}
+        self.assertEqual(errors[1], "exit status 1")
+        self.assertEqual(errors[4], "timeout after 2s")
+        with mock.patch("sys.stderr", StringIO()):
+            self.assertRaises(RuntimeError, ForkServer, os.path.join(self.tmpdir.name, "missing.py"))
+
+    @skipUnless(hasattr(os, "fork"), "os.fork is not available")
+    def test_fork_server_module(self):
+        os.makedirs(os.path.join(self.tmpdir.name, "pkg"))
+        open(os.path.join(self.tmpdir.name, "pkg", "__init__.py"), "w").close()
+        with open(os.path.join(self.tmpdir.name, "pkg", "tool.py"), "w") as f:
+            f.write(_SCRIPT)
+        counter = os.path.join(self.tmpdir.name, "n_imports")
+        with open(os.path.join(self.tmpdir.name, "heavy_module.py"), "w") as f:
+            f.write("with open(%r, 'a') as f:\n    f.write('x')\nN_IMPORTS = 1\n" % counter)
+        generator = CommandGenerator(divide, path="pkg.tool", use_module=True, python_executable=sys.executable)
+        jobs = [generator.get_argv(a=a, b=2) for a in [4, 6]]
+        with mock.patch.dict(os.environ, PYTHONPATH=self.tmpdir.name):
+            with ForkServer("pkg.tool", use_module=True) as fork_server:
+                self.assertEqual(fork_server.get_function_args(jobs[0]), ["--a", "4", "--b", "2"])
+                summary = run_jobs(jobs, log_dir=self.log_dir, progress=None, fork_server=fork_server)
+        self.assertEqual(summary[:3], (2, 0, 0))
+        for index, expected in enumerate(["2 1", "3 1"]):
+            with open(os.path.join(self.log_dir, "%d.out" % index)) as f:
+                self.assertEqual(f.read().strip(), expected)
+            with open(os.path.join(self.log_dir, "%d.err" % index)) as f:
+                self.assertEqual(f.read(), "")
+        with open(counter) as f:
+            self.assertEqual(f.read(), "x")
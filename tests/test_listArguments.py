@@ -0,0 +1,109 @@
+import argparse
+import os
+import tempfile
+from io import StringIO
+from typing import List
+from unittest import TestCase, mock
+
+from argParseFromDoc import get_parser_from_function
+from argParseFromDoc.AutoArgumentParser import AutoArgumentParser
+from argParseFromDoc.fastParser import get_fast_parser_from_function
+from argParseFromDoc.listArguments import ValueRun, collapse_value_runs
+
+
+def fun(names: List[str], values: List[float] = (0.,), n: int = 1):
+    '''
+    @param names: some names
+    @param values: some values
+    @param n: a number
+    '''
+    return names
+
+
+def get_reference_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--names", type=str, nargs="+", required=True)
+    parser.add_argument("--values", type=float, nargs="+", default=(0.,))
+    parser.add_argument("--n", type=int, default=1)
+    return parser
+
+
+class TestListArguments(TestCase):
+
+    def setUp(self):
+        self.reference_parser = get_reference_parser()
+        self.parsers = [get_parser_from_function(fun), get_fast_parser_from_function(fun)]
+
+    def test_long_runs(self):
+        names = ["name%d" % i for i in range(1000)] + ["", "-", "-1"]
+        values = ["%d.5" % -i for i in range(500)]
+        for argv in [["--names"] + names + ["--values"] + values + ["--n", "3"],
+                     ["--values"] + values + ["--names"] + names,
+                     ["--names"] + names + ["--names", "a", "b"],
+                     ["--n", "2", "--names"] + names]:
+            expected = self.reference_parser.parse_args(argv)
+            for parser in self.parsers:
+                self.assertEqual(parser.parse_args(argv), expected)
+
+    def test_collapse(self):
+        parser = get_parser_from_function(fun)
+        argv = ["--names"] + ["a"] * 100 + ["--n", "2", "--values", "1", "2"]
+        collapsed = collapse_value_runs(parser, argv)
+        self.assertEqual(len(collapsed), 7)
+        self.assertIsInstance(collapsed[1], ValueRun)
+        self.assertEqual(collapse_value_runs(parser, ["--"] + argv), ["--"] + argv)
+        parser.add_argument("positional", nargs="*")
+        self.assertEqual(collapse_value_runs(parser, argv), argv)
+
+    def test_invalid_value_in_long_run(self):
+        argv = ["--names", "a", "--values"] + [str(i) for i in range(1000)] + ["x"]
+        for parser in self.parsers:
+            with mock.patch("sys.stderr", new_callable=StringIO) as stderr:
+                with self.assertRaises(SystemExit):
+                    parser.parse_args(argv)
+            self.assertIn("argument --values: invalid float value: 'x'", stderr.getvalue())
+
+    def test_fromfile(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "args.txt")
+            with open(fname, "w") as f:
+                f.write("\n".join(["--names"] + ["n%d" % i for i in range(200)]))
+            parser = AutoArgumentParser(fromfile_prefix_chars="@")
+            parser.add_args_from_function(fun)
+            self.assertEqual(len(parser.parse_args(["@" + fname, "--n", "4"]).names), 200)
+
+    def test_nested_argument_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            inner = os.path.join(tmpdir, "inner.args")
+            with open(inner, "w") as f:
+                f.write("--values\n" + "".join("%d.5\n" % i for i in range(100000)))
+            outer = os.path.join(tmpdir, "outer.args")
+            with open(outer, "w") as f:
+                f.write("--names\n@user\n\n@%s\n" % inner)
+            parser = AutoArgumentParser(fromfile_prefix_chars="@")
+            parser.add_args_from_function(fun)
+            args = parser.parse_args(["@" + outer, "--n", "2"])
+            self.assertEqual(args.names, ["@user", ""])
+            self.assertEqual(len(args.values), 100000)
+            self.assertEqual(args.values[-1], 99999.5)
+            self.assertEqual(args.n, 2)
+
+    def test_argument_files_by_default(self):
+        from argParseFromDoc.commandStrGenerator import spill_args
+        with tempfile.TemporaryDirectory() as tmpdir:
+            home = os.path.join(tmpdir, "home")
+            with open(home, "w") as f:
+                f.write("secret\n")
+            spill_file = spill_args(["--names", "@" + home, "", "--values"] + ["%d.5" % i for i in range(100000)],
+                                    tmpdir)
+            for parser in self.parsers:
+                self.assertEqual(parser.parse_args(["--names", "@" + home, "--n", "1"]).names, ["@" + home])
+                args = parser.parse_args([spill_file, "--n", "2"])
+                self.assertEqual(args.names, ["@" + home, ""])
+                self.assertEqual(len(args.values), 100000)
+                self.assertEqual(args.values[-1], 99999.5)
+                self.assertEqual(args.n, 2)
+            self.assertIsNone(argparse.ArgumentParser("prog", None, None, None, [], argparse.HelpFormatter, "-",
+                                                      None).fromfile_prefix_chars)
+            self.assertIsNone(AutoArgumentParser("prog", None, None, None, [], argparse.HelpFormatter, "-",
+                                                 None).fromfile_prefix_chars)
@@ -0,0 +1,94 @@
+import os
+import pickle
+from typing import List, TextIO
+from unittest import TestCase
+
+from argParseFromDoc import parse_function_and_call_parallel
+from argParseFromDoc.autoArgparseFunction import get_spec_from_function
+from argParseFromDoc.parallelExecution import get_picklable_spec
+
+
+def add(a: int, b: List[int] = (0,), fail: bool = False):
+    '''
+    @param a: first number
+    @param b: numbers to add
+    @param fail: raise an error
+    '''
+    if fail:
+        raise RuntimeError("asked to fail")
+    return a + sum(b)
+
+
+def get_pid(a: int):
+    '''
+    @param a: a number
+    '''
+    return os.getpid()
+
+
+def make_values(a: int, die: bool = False):
+    '''
+    @param a: the number of values
+    @param die: kill the worker process
+    '''
+    if die:
+        os._exit(1)
+    return (i for i in range(a)) if a == 2 else list(range(a))  # Generators cannot be pickled
+
+
+class LazyValue():
+    def __init__(self, fun):
+        self.fun = fun
+
+    def get(self):
+        return self.fun()
+
+
+def read_lines(inputFile: TextIO, n_lines: int = LazyValue(lambda: 1)):
+    '''
+    @param inputFile: a file
+    @param n_lines: the number of lines to read
+    '''
+    return [inputFile.readline() for _ in range(n_lines)]
+
+
+class TestParallelExecution(TestCase):
+
+    def test_ordered(self):
+        args_list = [["--a", str(i), "--b", "1", "2"] for i in range(20)] + ["--a 1 --fail", {"a": 5}, "--a x"]
+        results = list(parse_function_and_call_parallel(add, args_list, n_workers=2, chunksize=3))
+        self.assertEqual([r.index for r in results], list(range(23)))
+        self.assertEqual([r.result for r in results[:21]], [i + 3 for i in range(20)] + [None])
+        self.assertIn("asked to fail", results[20].error)
+        self.assertEqual(results[21].result, 5)
+        self.assertFalse(results[22].ok)
+
+    def test_unordered(self):
+        results = list(parse_function_and_call_parallel(add, ("--a %d" % i for i in range(50)), n_workers=3,
+                                                        ordered=False))
+        self.assertEqual(sorted((r.index, r.result) for r in results), [(i, i) for i in range(50)])
+
+    def test_workers_are_reused(self):
+        pids = {r.result for r in parse_function_and_call_parallel(get_pid, [["--a", "1"]] * 30, n_workers=2)}
+        self.assertLessEqual(len(pids), 2)
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_picklable_spec(self):
+        spec = get_spec_from_function(read_lines, args_to_ignore=["n_lines"])
+        self.assertEqual(repr(pickle.loads(get_picklable_spec(spec))), repr(spec))
+        self.assertIsNone(get_picklable_spec(get_spec_from_function(read_lines)))
+
+    def test_failed_chunks(self):
+        for ordered in [True, False]:
+            results = list(parse_function_and_call_parallel(make_values, ["--a %d" % i for i in range(5)],
+                                                            n_workers=2, chunksize=2, ordered=ordered))
+            results.sort(key=lambda result: result.index)
+            self.assertEqual([result.ok for result in results], [True, True, False, False, True])
+            self.assertIn("pickle", results[2].error)
+            self.assertEqual(results[4].result, [0, 1, 2, 3])
+        args_list = [["--a", "1"], ["--a", "1", "--die"]] + [["--a", "1"]] * 10
+        results = list(parse_function_and_call_parallel(make_values, args_list, n_workers=2))
+        self.assertEqual([result.index for result in results], list(range(12)))
+        self.assertIn("BrokenProcessPool", results[1].error)
+        self.assertEqual(results[1].args, ["--a", "1", "--die"])
+
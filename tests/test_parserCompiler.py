@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from typing import List, Literal, Optional
+from unittest import TestCase, mock
+
+from argParseFromDoc import get_parser_from_function
+from argParseFromDoc.autoArgparseFunction import get_spec_from_function
+from argParseFromDoc.parserCompiler import compile_spec, get_source_hash, NotCompilableError
+
+
+def fun(a: int, names: List[str] = ("x", "y"), mode: Literal["fast", "slow"] = "fast",
+        ratio: Optional[float] = None, verbose: bool = True):
+    '''
+    @param a: a number
+    @param names: some names
+    @param mode: the mode
+    @param ratio: an optional ratio
+    @param verbose: print more
+    '''
+    return a
+
+
+class TestParserCompiler(TestCase):
+
+    def _get_help(self, parser):
+        with StringIO() as strFile:
+            parser.print_help(strFile)
+            return strFile.getvalue()
+
+    def test_compiled_parser_is_equivalent(self):
+        code = compile_spec(get_spec_from_function(fun), "tests.test_parserCompiler:fun")
+        self.assertNotIn("docstring_parser", code)
+        namespace = {}
+        exec(code, namespace)
+        compiled_parser = namespace["get_parser"](prog="fun")
+        parser = get_parser_from_function(fun, prog="fun")
+        self.assertEqual(self._get_help(compiled_parser), self._get_help(parser))
+        argv = ["--a", "1", "--names", "z", "--mode", "slow", "--NOT_verbose"]
+        self.assertEqual(compiled_parser.parse_args(argv), parser.parse_args(argv))
+        self.assertEqual(namespace["parse_and_call"](["--a", "3"]), 3)
+
+    def test_non_literal_default(self):
+        def fun2(a: int = 1, b: List[int] = None):
+            '''
+            @param a: a number
+            @param b: some numbers
+            '''
+            return a
+        fun2.__defaults__ = (1, object())
+        self.assertRaises(NotCompilableError, compile_spec, get_spec_from_function(fun2), "mod:fun2")
+
+    def test_source_hash(self):
+        spec = get_spec_from_function(fun)
+        code = compile_spec(spec, "mod:fun")
+        self.assertEqual(get_source_hash(code), get_source_hash(compile_spec(spec, "mod:fun")))
+        self.assertNotEqual(get_source_hash(code), get_source_hash(compile_spec(spec, "mod:fun2")))
+        self.assertNotEqual(get_source_hash(code), get_source_hash(compile_spec(spec, "other_mod:fun")))
+        with mock.patch("argParseFromDoc.parserCompiler._CALL_FUNCTION_TEMPLATE",
+                        "\n\ndef parse_and_call(args=None):  # {module} {function_name}\n    pass\n"):
+            self.assertNotEqual(get_source_hash(code), get_source_hash(compile_spec(spec, "mod:fun")))
+
+    def test_compile_and_check_command(self):
+        wdir = os.path.dirname(os.path.dirname(__file__))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "add_parser.py")
+            cmd = [sys.executable, "-m", "argParseFromDoc", "compile", "examples.exampleAdd:add", "-o", fname]
+            self.assertNotEqual(subprocess.run(cmd + ["--check"], cwd=wdir, capture_output=True).returncode, 0)
+            subprocess.check_call(cmd, cwd=wdir)
+            self.assertEqual(subprocess.run(cmd + ["--check"], cwd=wdir).returncode, 0)
+
+            with open(fname) as f:
+                code = f.read()
+            with open(fname, "w") as f:
+                f.write(code.replace("first number", "old description"))
+            self.assertNotEqual(subprocess.run(cmd + ["--check"], cwd=wdir, capture_output=True).returncode, 0)
+            with open(fname, "w") as f:
+                f.write(code.replace('SOURCE_HASH = "', 'SOURCE_HASH = "0'))
+            self.assertNotEqual(subprocess.run(cmd + ["--check"], cwd=wdir, capture_output=True).returncode, 0)
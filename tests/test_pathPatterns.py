@@ -0,0 +1,86 @@
+import glob
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+from typing import Iterator
+from unittest import TestCase, mock
+
+from argParseFromDoc import get_parser_from_function
+from argParseFromDoc.fastParser import get_fast_parser_from_function
+from argParseFromDoc.pathPatterns import PathIterator, PathPatternType, split_pattern
+
+
+def total_size(inputs: Iterator[Path]):
+    '''
+    @param inputs: a glob pattern or a directory
+    '''
+    return sum(path.stat().st_size for path in inputs)
+
+
+class TestPathPatterns(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        for dirname in ["a", "a/b", "a/b/c", "d", ".hidden"]:
+            os.makedirs(os.path.join(self.tmpdir.name, dirname), exist_ok=True)
+        for fname in ["x.txt", "y.dat", ".z.txt", "a/x.txt", "a/b/y.txt", "a/b/c/z.txt", "a/b/c/w.dat",
+                      "d/x.txt", ".hidden/h.txt"]:
+            with open(os.path.join(self.tmpdir.name, fname), "w") as f:
+                f.write(fname)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _glob(self, pattern):
+        return sorted(path for path in glob.glob(os.path.join(self.tmpdir.name, pattern), recursive=True)
+                      if not os.path.isdir(path))
+
+    def test_same_as_glob(self):
+        for pattern in ["*.txt", "*", ".*", "a/*", "a/**", "**/*.txt", "a/**/*.dat", "*/b/*.txt", "*/*/c/*",
+                        "[ad]/x.txt", "a/x.txt", "missing/*"]:
+            paths = PathIterator(os.path.join(self.tmpdir.name, pattern))
+            self.assertEqual(sorted(str(path) for path in paths), self._glob(pattern), pattern)
+
+    def test_directories_sorting_and_filters(self):
+        paths = PathIterator(self.tmpdir.name)
+        self.assertEqual(sorted(path.name for path in paths), ["x.txt", "y.dat"])
+        paths = PathIterator(os.path.join(self.tmpdir.name, "**")).sorted()
+        names = [str(path.relative_to(self.tmpdir.name)) for path in paths]
+        self.assertEqual(names, [os.path.join(*name.split("/")) for name in
+                                 ["a/b/c/w.dat", "a/b/c/z.txt", "a/b/y.txt", "a/x.txt", "d/x.txt", "x.txt",
+                                  "y.dat"]])
+        paths = PathIterator(os.path.join(self.tmpdir.name, "**", "*.txt")).sorted()
+        names = [str(path.relative_to(self.tmpdir.name)) for path in paths]
+        self.assertEqual(names, [os.path.join(*name.split("/")) for name in
+                                 ["a/b/c/z.txt", "a/b/y.txt", "a/x.txt", "d/x.txt", "x.txt"]])
+        paths = PathIterator(os.path.join(self.tmpdir.name, "**")).sorted()
+        paths = paths.filter("*.txt").filter(lambda path: path.parent.name != "d")
+        self.assertEqual([path.name for path in paths], ["z.txt", "y.txt", "x.txt", "x.txt"])
+        self.assertEqual(len(list(paths)), 4)  # It can be iterated again
+        self.assertEqual(split_pattern("data/*/x/*.txt"), ("data", ["*", "x", "*.txt"]))
+        self.assertEqual(split_pattern("*.txt"), (".", ["*.txt"]))
+
+    def test_parser(self):
+        parser = get_parser_from_function(total_size)
+        args = parser.parse_args(["--inputs", os.path.join(self.tmpdir.name, "**", "*.dat")])
+        self.assertIsInstance(args.inputs, PathIterator)
+        self.assertEqual(total_size(**vars(args)), len("y.dat") + len("a/b/c/w.dat"))
+        self.assertEqual(total_size(**vars(parser.parse_args(["--inputs", os.path.join(self.tmpdir.name, "d")]))),
+                         len("d/x.txt"))
+        with mock.patch("sys.stderr", StringIO()):
+            self.assertRaises(SystemExit, parser.parse_args, ["--inputs", os.path.join(self.tmpdir.name, "none")])
+        self.assertEqual(PathPatternType(sort=True), eval(repr(PathPatternType(sort=True))))
+
+    def test_command_line_options(self):
+        pattern = os.path.join(self.tmpdir.name, "**")
+        for parser in [get_parser_from_function(total_size), get_fast_parser_from_function(total_size)]:
+            args = parser.parse_args(["--inputs", pattern, ":sorted", ":filter=*.txt", ":filter=[xy]*"])
+            self.assertEqual([str(path.relative_to(self.tmpdir.name)) for path in args.inputs],
+                             [os.path.join("a", "b", "y.txt"), os.path.join("a", "x.txt"), os.path.join("d", "x.txt"),
+                              "x.txt"])
+            for argv in [["--inputs", pattern, pattern], ["--inputs", ":sorted", pattern]]:
+                with mock.patch("sys.stderr", StringIO()) as stderr:
+                    self.assertRaises(SystemExit, parser.parse_args, argv)
+                self.assertIn("argument --inputs", stderr.getvalue())
+        self.assertIn("--inputs PATTERN [:sorted|:filter=GLOB ...]", get_parser_from_function(total_size).format_help())
@@ -0,0 +1,153 @@
+import gc
+import os
+import shutil
+import tempfile
+from io import StringIO
+from typing import List, Optional
+from unittest import TestCase, mock
+
+from argParseFromDoc import AutoArgumentParser, get_parser_from_function
+from argParseFromDoc.specCache import get_spec_key, clear_spec_cache, CACHE_DIR_ENV_VAR, invalidate_spec, \
+    set_spec_memo_size, _SPEC_MEMO, DEFAULT_MEMO_SIZE
+
+
+def add(a: int, b: List[int] = (1, 2), c: Optional[str] = None, d: bool = False):
+    '''
+    @param a: first number
+    @param b: numbers to add
+    @param c: optional message
+    @param d: a flag
+    '''
+    return a + sum(b)
+
+
+class TestSpecCache(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        invalidate_spec()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def _get_help(self, parser):
+        with StringIO() as strFile:
+            parser.print_help(strFile)
+            return strFile.getvalue()
+
+    def test_warm_launch_skips_introspection(self):
+        cold_parser = get_parser_from_function(add, cache_dir=self.cache_dir)
+        self.assertEqual(len([f for f in os.listdir(self.cache_dir) if f.endswith(".pkl")]), 1)
+
+        with mock.patch("argParseFromDoc.autoArgparseFunction._extract_spec_from_function",
+                        side_effect=AssertionError("introspection should be skipped")):
+            invalidate_spec(add)
+            warm_parser = get_parser_from_function(add, cache_dir=self.cache_dir)
+
+        self.assertEqual(self._get_help(cold_parser), self._get_help(warm_parser))
+        args = warm_parser.parse_args(["--a", "1", "--b", "2", "3", "--d"])
+        self.assertEqual(vars(args), dict(a=1, b=[2, 3], c=None, d=True))
+
+    def test_defaults_with_memory_addresses_are_not_cached(self):
+        class Value():
+            pass
+
+        def fun(a: int, value: str = Value()):
+            '''
+            @param a: a number
+            @param value: a value
+            '''
+            return a
+        self.assertIsNone(get_spec_key(fun))
+        get_parser_from_function(fun, cache_dir=self.cache_dir)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_env_var(self):
+        with mock.patch.dict(os.environ, {CACHE_DIR_ENV_VAR: self.cache_dir}):
+            get_parser_from_function(add)
+        self.assertEqual(len(clear_spec_cache(self.cache_dir)), 1)
+
+    def test_key_changes_with_docstring_and_options(self):
+        def fun(a: int):
+            '''
+            @param a: first number
+            '''
+            return a
+        key = get_spec_key(fun)
+        self.assertEqual(key, get_spec_key(fun))
+        self.assertNotEqual(key, get_spec_key(fun, ("a",)))
+        fun.__doc__ = "@param a: other description"
+        self.assertNotEqual(key, get_spec_key(fun))
+
+    def test_corrupted_entry_is_a_miss(self):
+        get_parser_from_function(add, cache_dir=self.cache_dir)
+        invalidate_spec(add)
+        for fname in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, fname), "wb") as f:
+                f.write(b"not a pickle")
+        parser = get_parser_from_function(add, cache_dir=self.cache_dir)
+        self.assertEqual(parser.parse_args(["--a", "1"]).b, (1, 2))
+
+    def test_only_own_regular_files_are_loaded(self):
+        from argParseFromDoc.specCache import load_spec, save_spec
+        from argParseFromDoc.autoArgparseFunction import get_spec_from_function
+
+        def other(z: int):
+            '''
+            @param z: a number
+            '''
+            return z
+        cache_dir = os.path.join(self.cache_dir, "cache")
+        key = get_spec_key(add)
+        save_spec(cache_dir, key, get_spec_from_function(other))  # A planted entry
+        self.assertEqual(os.stat(cache_dir).st_mode & 0o777, 0o700)
+        fname = os.path.join(cache_dir, key + ".pkl")
+        self.assertIsNotNone(load_spec(cache_dir, key))
+        os.rename(fname, fname + ".planted")
+        os.symlink(fname + ".planted", fname)
+        self.assertIsNone(load_spec(cache_dir, key))
+        if hasattr(os, "getuid") and os.getuid() == 0:
+            os.remove(fname)
+            os.rename(fname + ".planted", fname)
+            os.chown(fname, 12345, 12345)
+            self.assertIsNone(load_spec(cache_dir, key))
+
+
+class TestSpecMemo(TestCase):
+    def setUp(self):
+        invalidate_spec()
+
+    def tearDown(self):
+        set_spec_memo_size(DEFAULT_MEMO_SIZE)
+
+    def test_repeated_calls_reuse_spec(self):
+        get_parser_from_function(add)
+        with mock.patch("argParseFromDoc.autoArgparseFunction._extract_spec_from_function",
+                        side_effect=AssertionError("introspection should be skipped")):
+            parser = AutoArgumentParser()
+            parser.add_args_from_function(add)
+        self.assertEqual(parser.parse_args(["--a", "1"]).b, (1, 2))
+
+        invalidate_spec(add)
+        self.assertEqual(len(_SPEC_MEMO), 0)
+
+    def test_options_are_part_of_the_key(self):
+        parser = get_parser_from_function(add)
+        self.assertEqual(len(_SPEC_MEMO), 1)
+        parser_ignore = get_parser_from_function(add, args_to_ignore=["c"])
+        self.assertEqual(len(_SPEC_MEMO), 2)
+        self.assertIn("c", vars(parser.parse_args(["--a", "1"])))
+        self.assertNotIn("c", vars(parser_ignore.parse_args(["--a", "1"])))
+
+    def test_weak_reference_and_size_limit(self):
+        set_spec_memo_size(2)
+        for i in range(3):
+            def fun(a: int):
+                '''
+                @param a: first number
+                '''
+                return a
+            get_parser_from_function(fun)
+            self.assertLessEqual(len(_SPEC_MEMO), 2)
+        del fun
+        gc.collect()
+        self.assertEqual(len(_SPEC_MEMO), 0)
@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+
+from argParseFromDoc.autoArgparseFunction import get_spec_from_function
+from argParseFromDoc.staticSpec import get_spec_from_source, import_target, parse_source_function_and_call, \
+    StaticSpecError
+
+HEAVY_MODULE = '''
+import typing as t
+from typing import List, Optional, TextIO, Literal
+import this_module_does_not_exist
+
+def process(a: int, names: List[str], mode: Literal["fast", "slow"] = "fast", ratio: t.Optional[float] = None,
+            infile: TextIO = None, verbose: bool = True, *args, **kwargs):
+    """
+    Process things
+
+    :param a: a number
+    :param names: some names
+    :param mode: the mode
+    :param ratio: an optional ratio
+    :param infile: an input file
+    :param verbose: print more
+    """
+    return a
+
+class Worker():
+    def run(self, n: int = -1):
+        """
+        @param n: number of iterations
+        """
+        return n
+
+def with_computed_default(a: int = 2 ** 10 + len("x")):
+    """
+    @param a: a number
+    """
+    return a
+'''
+
+LIGHT_MODULE = '''
+from typing import List
+
+def add(a: int, b: List[int] = (1, 2)):
+    """
+    @param a: first number
+    @param b: numbers to add
+    """
+    return a + sum(b)
+'''
+
+
+class TestStaticSpec(TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.heavy_path = os.path.join(self.tempdir, "heavy.py")
+        with open(self.heavy_path, "w") as f:
+            f.write(HEAVY_MODULE)
+        self.light_path = os.path.join(self.tempdir, "light.py")
+        with open(self.light_path, "w") as f:
+            f.write(LIGHT_MODULE)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tempdir)
+        for name in [name for name in sys.modules if name.startswith("_argParseFromDoc_script_")]:
+            del sys.modules[name]
+
+    def test_module_is_not_executed(self):
+        spec = get_spec_from_source(self.heavy_path + ":process")
+        self.assertEqual([arg.name for arg in spec], ["a", "names", "mode", "ratio", "infile", "verbose"])
+        self.assertEqual(spec[2].typeFun, ("fast", "slow"))
+        self.assertFalse(spec[3].required)
+        self.assertEqual(get_spec_from_source(self.heavy_path + ":Worker.run")[0].default, -1)
+
+    def test_same_spec_as_imported_function(self):
+        static_spec = get_spec_from_source(self.light_path + ":add")
+        self.assertEqual(static_spec, get_spec_from_function(import_target(self.light_path + ":add")))
+
+    def test_script_does_not_shadow_modules(self):
+        import json
+        json_path = os.path.join(self.tempdir, "json.py")
+        with open(json_path, "w") as f:
+            f.write(LIGHT_MODULE)
+        self.assertEqual(import_target(json_path + ":add")(1), 4)
+        self.assertIs(sys.modules["json"], json)
+
+    def test_non_literal_default(self):
+        self.assertRaises(StaticSpecError, get_spec_from_source, self.heavy_path + ":with_computed_default")
+
+    def test_parse_before_import(self):
+        with self.assertRaises(SystemExit):
+            parse_source_function_and_call(self.heavy_path + ":process", args=["--names", "x"])  # --a missing
+        self.assertEqual(parse_source_function_and_call(self.light_path + ":add", args=["--a", "1"]), 4)
+
+    def test_run_command(self):
+        out = subprocess.run([sys.executable, "-m", "argParseFromDoc", "run", self.heavy_path + ":process", "--help"],
+                             capture_output=True, text=True)
+        self.assertEqual(out.returncode, 0, out.stderr)
+        self.assertIn("--NOT_verbose", out.stdout)
+        out = subprocess.check_output([sys.executable, "-m", "argParseFromDoc", "run", self.light_path + ":add",
+                                       "--a", "1", "--b", "5"], text=True)
+        self.assertEqual(out.strip(), "6")